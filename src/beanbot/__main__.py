@@ -1,8 +1,6 @@
 from __future__ import annotations
 
-import asyncio
-
-from beanbot.app import run
+from beanbot.app import main
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    main()
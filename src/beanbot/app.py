@@ -1,18 +1,90 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import importlib
 import logging
+import signal
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
-from beanbot.core.config import Settings
-from beanbot.core.logging import configure_logging
-from beanbot.discord.bot import create_bot
+from beanbot.discord.startup import StartupTimeline
+
+if TYPE_CHECKING:
+    from beanbot.core.config import Settings
+    from beanbot.discord.bot import BeanBot
 
 log = logging.getLogger(__name__)
 
+LoopFactory = Callable[[], asyncio.AbstractEventLoop]
+
+
+def select_loop_factory(name: str) -> tuple[LoopFactory | None, str]:
+    """Pick the event loop implementation, falling back to asyncio when uvloop is unavailable."""
+    if name == "asyncio":
+        return None, "asyncio"
+    try:
+        uvloop = importlib.import_module("uvloop")
+    except ImportError:
+        if name == "uvloop":
+            log.warning("uvloop is not installed; using the default asyncio event loop")
+        return None, "asyncio"
+    factory: LoopFactory = uvloop.new_event_loop
+    return factory, "uvloop"
+
+
+def close_on_sigterm(bot: BeanBot) -> list[asyncio.Task[None]]:
+    """Close the bot on SIGTERM, as Ctrl+C does, so restarts flush buffered writes.
+
+    Returns the list that will hold the closing task once the signal arrives.
+    """
+    closing: list[asyncio.Task[None]] = []
+
+    def terminate() -> None:
+        log.info("Received SIGTERM; closing the bot")
+        if not closing:
+            closing.append(asyncio.create_task(bot.close()))
+
+    # Windows event loops do not support signal handlers.
+    with contextlib.suppress(NotImplementedError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, terminate)
+    return closing
+
+
+async def run(settings: Settings, timeline: StartupTimeline) -> None:
+    # discord.py, aiohttp, and pymongo are imported here, after the first log line.
+    with timeline.phase("import bot"):
+        from beanbot.discord.bot import create_bot
+
+    bot = create_bot(settings, timeline)
+    # Leaving the block closes the bot, which unloads extensions so they flush queued work.
+    async with bot:
+        closing = close_on_sigterm(bot)
+        await bot.start(settings.discord_token)
+        # start() returns as soon as the connection closes; let close() finish its cleanup.
+        await asyncio.gather(*closing)
+
+
+def main() -> None:
+    timeline = StartupTimeline()
+    with timeline.phase("settings"):
+        from beanbot.core.config import Settings
 
-async def run() -> None:
-    settings = Settings()  # type: ignore[call-arg]  # Values load from the environment.
-    configure_logging(settings.log_level)
+        settings = Settings()  # type: ignore[call-arg]  # Values load from the environment.
+    with timeline.phase("logging"):
+        from beanbot.core.logging import configure_logging
 
-    bot = create_bot(settings)
-    log.info("Starting BeanBot")
-    await bot.start(settings.discord_token)
+        listener = configure_logging(
+            settings.log_level,
+            log_format=settings.log_format,
+            async_output=settings.log_async,
+            rate_limit=settings.log_rate_limit_per_minute,
+        )
+    loop_factory, loop_name = select_loop_factory(settings.event_loop)
+    log.info("Starting BeanBot with the %s event loop", loop_name)
+    try:
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(run(settings, timeline))
+    finally:
+        if listener is not None:
+            listener.stop()
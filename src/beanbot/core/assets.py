@@ -0,0 +1,115 @@
+"""Indexed, memory-resident access to packaged static assets."""
+
+from __future__ import annotations
+
+import io
+import logging
+import mmap
+from importlib import resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from typing import Final
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MMAP_THRESHOLD: Final[int] = 1024 * 1024
+
+
+class _MappedReader(io.RawIOBase):
+    """Seekable reader over a shared memory map; every reader keeps its own position."""
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        chunk = self._view[self._position : self._position + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+class PackagedAsset:
+    """One packaged file whose bytes are loaded once and shared by every reader."""
+
+    def __init__(self, entry: Traversable, size: int, *, mmap_threshold: int) -> None:
+        self.name = entry.name
+        self.size = size
+        self._entry = entry
+        self._mmap_threshold = mmap_threshold
+        self._data: bytes | None = None
+        self._mapped: mmap.mmap | None = None
+
+    def load(self) -> None:
+        if self._data is not None or self._mapped is not None:
+            return
+        if self.size >= self._mmap_threshold and isinstance(self._entry, Path):
+            with self._entry.open("rb") as file:
+                self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = self._entry.read_bytes()
+
+    def open(self) -> io.BufferedIOBase:
+        """Return a fresh file object over the shared bytes without re-reading the file."""
+        self.load()
+        if self._mapped is not None:
+            return io.BufferedReader(_MappedReader(memoryview(self._mapped)))
+        assert self._data is not None
+        return io.BytesIO(self._data)
+
+
+class AssetRegistry:
+    """Index of one resource package, built on first use."""
+
+    def __init__(self, package: str, *, mmap_threshold: int = DEFAULT_MMAP_THRESHOLD) -> None:
+        self.package = package
+        self.mmap_threshold = mmap_threshold
+        self._assets: dict[str, PackagedAsset] | None = None
+        self._selections: dict[tuple[str, str], tuple[PackagedAsset, ...]] = {}
+
+    def _index(self) -> dict[str, PackagedAsset]:
+        if self._assets is None:
+            assets: dict[str, PackagedAsset] = {}
+            for entry in resources.files(self.package).iterdir():
+                if not entry.is_file() or entry.name.endswith((".py", ".pyc")):
+                    continue
+                size = entry.stat().st_size if isinstance(entry, Path) else len(entry.read_bytes())
+                assets[entry.name] = PackagedAsset(entry, size, mmap_threshold=self.mmap_threshold)
+            self._assets = dict(sorted(assets.items()))
+            log.info("Indexed %s packaged assets in %s", len(assets), self.package)
+        return self._assets
+
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._index())
+
+    def get(self, name: str) -> PackagedAsset:
+        return self._index()[name]
+
+    def select(self, *, prefix: str = "", suffix: str = "") -> tuple[PackagedAsset, ...]:
+        """Return assets whose name starts with ``prefix`` and ends with ``suffix`` (any case)."""
+        key = (prefix, suffix.lower())
+        selection = self._selections.get(key)
+        if selection is None:
+            selection = self._selections[key] = tuple(
+                asset
+                for name, asset in self._index().items()
+                if name.startswith(prefix) and name.lower().endswith(key[1])
+            )
+        return selection
+
+
+packaged_assets: Final[AssetRegistry] = AssetRegistry("beanbot.resources")
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Literal
+
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,8 +19,28 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("discord_token", "BEANBOT_BOT_TOKEN", "botToken")
     )
     dev_guild_id: int = 0
+    command_sync_mode: Literal["auto", "dev_guild", "global", "off"] = "auto"
+    command_sync_force: bool = False
+    state_dir: Path = Path(".beanbot")
     prefix: str = "%"
     log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_async: bool = False
+    log_rate_limit_per_minute: int = 0
+    event_loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    shard_mode: Literal["off", "auto", "explicit"] = "off"
+    shard_count: int = 0
+    shard_ids: str = ""
+    memory_profile: Literal["default", "lean"] = "default"
+    metrics_enabled: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9108
+    profile_enabled: bool = False
+    profile_sample_rate: float = 0.01
+    profile_keep_slowest: int = 10
+    loop_monitor_enabled: bool = True
+    loop_lag_interval_seconds: float = 0.05
+    loop_slow_callback_seconds: float = 0.25
     lead_dev_user_id: int = 0
     general_channel_id: int = Field(
         default=0,
@@ -39,6 +62,16 @@ class Settings(BaseSettings):
             "yoshimaruUrl",
         ),
     )
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 10.0
+    http_total_timeout: float = 15.0
+    http_limit_per_host: int = 8
+    http_retries: int = 2
+    http_breaker_failures: int = 5
+    http_breaker_reset_seconds: float = 30.0
+    image_cache_max_bytes: int = 32 * 1024 * 1024
+    meme_prefetch_size: int = 20
+    meme_prefetch_ttl_seconds: float = 900.0
     mongo_connection_string: str | None = Field(
         default=None,
         validation_alias=AliasChoices(
@@ -49,3 +82,11 @@ class Settings(BaseSettings):
     )
     mongo_database_name: str = "BeanBotPythonDB"
     mongo_role_menu_collection: str = "roleMenus"
+    role_menu_touch_flush_seconds: float = 30.0
+    role_menu_restore_concurrency: int = 4
+    role_menu_cache_size: int = 1024
+    role_menu_watch_changes: bool = False
+    role_menu_poll_seconds: float = 60.0
+    role_menu_update_window_seconds: float = 0.25
+    role_menu_update_queue_limit: int = 1000
+    role_menu_update_concurrency: int = 4
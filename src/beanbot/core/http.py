@@ -0,0 +1,225 @@
+"""Outbound HTTP with per-host connection limits, circuit breaking, and jittered retries."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import aiohttp
+from yarl import URL
+
+from beanbot.core.metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Raised without touching the network while a host's circuit is open."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"Circuit open for {host}; retry in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True, slots=True)
+class BreakerSnapshot:
+    state: BreakerState
+    consecutive_failures: int
+    retry_after: float
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, then allow one half-open probe once the reset delay passes."""
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state: BreakerState = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_seconds - self._clock())
+
+    def before_request(self) -> None:
+        if self.state == "open":
+            retry_after = self._retry_after()
+            if retry_after > 0:
+                raise CircuitOpenError(self.host, retry_after)
+            self.state = "half_open"
+            log.info("Circuit half-open; probing host=%s", self.host)
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.host, self.reset_seconds)
+            self._probe_in_flight = True
+
+    def release_probe(self) -> None:
+        """Let another request probe after one ended without a verdict on the host's health."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            log.info("Circuit closed for host=%s", self.host)
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                log.warning(
+                    "Circuit opened for host=%s after %s consecutive failures",
+                    self.host,
+                    self.consecutive_failures,
+                )
+            self.state = "open"
+            self._opened_at = self._clock()
+
+    def snapshot(self) -> BreakerSnapshot:
+        retry_after = self._retry_after() if self.state == "open" else 0.0
+        return BreakerSnapshot(self.state, self.consecutive_failures, retry_after)
+
+
+class OutboundHttp:
+    """Shared entry point for every outbound HTTP call made by the bot."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        retries: int = 2,
+        backoff_seconds: float = 0.25,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        timings: Histogram | None = None,
+    ) -> None:
+        self.session = session
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self.timings = timings
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        connect_timeout: float,
+        read_timeout: float,
+        total_timeout: float,
+        limit_per_host: int,
+        retries: int,
+        failure_threshold: int,
+        reset_seconds: float,
+        timings: Histogram | None = None,
+    ) -> OutboundHttp:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=limit_per_host),
+            timeout=aiohttp.ClientTimeout(
+                total=total_timeout,
+                sock_connect=connect_timeout,
+                sock_read=read_timeout,
+            ),
+        )
+        return cls(
+            session,
+            retries=retries,
+            failure_threshold=failure_threshold,
+            reset_seconds=reset_seconds,
+            timings=timings,
+        )
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                host,
+                failure_threshold=self.failure_threshold,
+                reset_seconds=self.reset_seconds,
+                clock=self._clock,
+            )
+        return breaker
+
+    def snapshot(self) -> dict[str, BreakerSnapshot]:
+        return {host: breaker.snapshot() for host, breaker in sorted(self._breakers.items())}
+
+    def _observe(self, host: str, outcome: str, started: float) -> None:
+        if self.timings is not None:
+            self.timings.observe(self._clock() - started, host, outcome)
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_seconds * (2.0**attempt) * random.uniform(0.5, 1.5)
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """GET ``url``, retrying connection failures and 5xx responses with jittered backoff.
+
+        The final 5xx response is still yielded so callers keep their own status handling.
+        """
+        host = URL(url).host or ""
+        breaker = self.breaker(host)
+        response: aiohttp.ClientResponse | None = None
+        for attempt in range(self.retries + 1):
+            breaker.before_request()
+            started = self._clock()
+            try:
+                response = await self.session.get(url, **kwargs)
+            except (aiohttp.ClientConnectionError, TimeoutError):
+                self._observe(host, "error", started)
+                breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+            except BaseException:
+                # Cancellation or a request error such as InvalidURL says nothing about the
+                # host, but a half-open probe must not stay claimed forever.
+                breaker.release_probe()
+                raise
+            else:
+                self._observe(host, f"{response.status // 100}xx", started)
+                if response.status < 500:
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                if attempt == self.retries:
+                    break
+                response.release()
+            await self._sleep(self._backoff(attempt))
+
+        assert response is not None
+        try:
+            yield response
+        except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, TimeoutError):
+            breaker.record_failure()
+            raise
+        finally:
+            response.release()
+
+    async def close(self) -> None:
+        if not self.session.closed:
+            await self.session.close()
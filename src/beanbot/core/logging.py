@@ -1,12 +1,234 @@
 from __future__ import annotations
 
+import json
 import logging
+import queue
 import sys
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
+from typing import Any, Final, Literal
 
+LogFormat = Literal["text", "json"]
+
+TEXT_FORMAT: Final = "%(asctime)s %(levelname)s %(name)s - %(message)s"
+LOG_CONTEXT_FIELDS: Final = ("guild_id", "channel_id", "message_id", "user_id", "command")
+LOG_QUEUE_SIZE: Final = 10_000
+RATE_LIMIT_WINDOW_SECONDS: Final = 60.0
+
+_EMPTY_CONTEXT: Final[Mapping[str, Any]] = MappingProxyType({})
+_log_context: ContextVar[Mapping[str, Any]] = ContextVar(
+    "beanbot_log_context", default=_EMPTY_CONTEXT
+)
+
+
+def bind_log_context(**fields: Any) -> Token[Mapping[str, Any]]:
+    """Add fields to every record logged later in the current task."""
+    unknown = set(fields) - set(LOG_CONTEXT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown log context fields: {sorted(unknown)}")
+    current = _log_context.get()
+    return _log_context.set(
+        {**current, **{name: value for name, value in fields.items() if value is not None}}
+    )
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the caller's log context onto the record before it leaves the caller's task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "log_context"):
+            record.log_context = dict(_log_context.get())
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Allow at most ``per_window`` records per call site and level in each window.
+
+    The first record let through after a suppressed burst carries the number of records dropped
+    in ``suppressed``, so repetition stays visible without flooding the output. Windows are
+    forgotten once a full window has passed since they ended, so call sites that log distinct
+    messages do not accumulate; a suppressed count is only reported if the call site logs again
+    before then.
+    """
+
+    def __init__(
+        self,
+        per_window: int,
+        window_seconds: float = RATE_LIMIT_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.per_window = per_window
+        self.window_seconds = window_seconds
+        self._clock = clock
+        # key -> [window start, records allowed, records suppressed]
+        self._windows: dict[tuple[str, int, object], list[float]] = {}
+        self._swept_at = clock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.per_window <= 0:
+            return True
+        now = self._clock()
+        if now - self._swept_at >= self.window_seconds:
+            self._sweep(now)
+        key = (record.name, record.levelno, record.msg)
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.window_seconds:
+            suppressed = int(window[2]) if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if window[1] < self.per_window:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+    def _sweep(self, now: float) -> None:
+        self._swept_at = now
+        expired = now - 2 * self.window_seconds
+        self._windows = {
+            key: window for key, window in self._windows.items() if window[0] > expired
+        }
+
+
+class TextFormatter(logging.Formatter):
+    """``TEXT_FORMAT`` lines with the record's log context and suppressed count appended."""
+
+    def __init__(self) -> None:
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:  # noqa: N802 - logging API name
+        fields = dict(getattr(record, "log_context", {}))
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+        line = super().formatMessage(record)
+        if not fields:
+            return line
+        return line + " " + " ".join(f"{name}={value}" for name, value in fields.items())
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's log context as top-level fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "log_context", {}))
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to a bounded queue and drop them, counted, instead of blocking when full."""
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve arguments and tracebacks now, but leave formatting to the output handler so
+        # JSON output keeps the message and the exception in separate fields.
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = record.exc_text or self._formatter.formatException(record.exc_info)
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogQueueListener(QueueListener):
+    """Queue listener that reports, once stopped, how many records its queue handler dropped."""
+
+    def __init__(self, entry: NonBlockingQueueHandler, *handlers: logging.Handler) -> None:
+        super().__init__(entry.queue, *handlers, respect_handler_level=True)
+        self.entry = entry
+
+    def stop(self) -> None:
+        super().stop()
+        if self.entry.dropped:
+            # The queue is no longer drained, so write straight to the output handlers.
+            self.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "Dropped %s log records because the log queue was full",
+                        "args": (self.entry.dropped,),
+                    }
+                )
+            )
+
+
+def configure_logging(
+    level: str,
+    *,
+    log_format: LogFormat = "text",
+    async_output: bool = False,
+    rate_limit: int = 0,
+) -> LogQueueListener | None:
+    """Configure the root logger; return the queue listener to stop at shutdown, if any.
+
+    With ``async_output`` the event loop only enqueues records and a background thread does the
+    blocking writes to stdout, so a slow log sink cannot stall the gateway. Stopping the listener
+    logs how many records were dropped while the queue was full.
+    """
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+    listener: LogQueueListener | None = None
+    entry: logging.Handler = output
+    if async_output:
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        listener = LogQueueListener(queue_handler, output)
+        entry = queue_handler
+    entry.addFilter(ContextFilter())
+    if rate_limit > 0:
+        entry.addFilter(RateLimitFilter(rate_limit))
 
-def configure_logging(level: str) -> None:
     logging.basicConfig(
         level=getattr(logging, level.upper(), logging.INFO),
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
+        handlers=[entry],
+        force=True,
     )
+    if listener is not None:
+        listener.start()
+    return listener
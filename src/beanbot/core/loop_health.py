@@ -0,0 +1,134 @@
+"""Event-loop scheduling lag and blocked-loop detection."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Final
+
+from beanbot.core.metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+# How far back the reported maximum lag looks.
+LAG_WINDOW_SECONDS: Final = 60.0
+
+
+@dataclass(frozen=True, slots=True)
+class LoopStall:
+    seconds: float
+    detected_at: float
+    stack: str
+
+
+@dataclass(frozen=True, slots=True)
+class LoopHealth:
+    lag_seconds: float
+    max_lag_seconds: float
+    stalls: int
+    last_stall: LoopStall | None
+
+
+class LoopMonitor:
+    """Measure how late the event loop runs timers and catch callbacks that block it.
+
+    A probe task sleeps for ``interval_seconds`` and records how much later than requested it
+    woke up. A watchdog thread checks the probe's heartbeat every interval; when the loop has not
+    reached the probe for ``slow_callback_seconds`` beyond the interval, it logs the loop thread's
+    current stack, which shows the callback that is blocking it. A block can start just after a
+    heartbeat and end just after a check, so only blocks longer than ``slow_callback_seconds``
+    plus two intervals are certain to be caught; the interval must therefore be at most half the
+    threshold.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: float = 0.05,
+        slow_callback_seconds: float = 0.25,
+        lag_histogram: Histogram | None = None,
+    ) -> None:
+        if not 0 < interval_seconds <= slow_callback_seconds / 2:
+            raise ValueError(
+                f"loop lag interval {interval_seconds}s must be positive and at most half the "
+                f"slow-callback threshold {slow_callback_seconds}s"
+            )
+        self.interval_seconds = interval_seconds
+        self.slow_callback_seconds = slow_callback_seconds
+        self.lag_histogram = lag_histogram
+        self.stalls = 0
+        self.last_stall: LoopStall | None = None
+        self._lags: deque[float] = deque(
+            maxlen=max(1, round(LAG_WINDOW_SECONDS / interval_seconds))
+        )
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="beanbot-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def record_lag(self, lag: float) -> None:
+        self._lags.append(lag)
+        if self.lag_histogram is not None:
+            self.lag_histogram.observe(lag)
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            self.record_lag(max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        reported_heartbeat: float | None = None
+        while not self._stopped.wait(self.interval_seconds):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked >= self.slow_callback_seconds and heartbeat != reported_heartbeat:
+                reported_heartbeat = heartbeat
+                self._report_stall(blocked)
+
+    def _report_stall(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        self.stalls += 1
+        self.last_stall = LoopStall(blocked, time.monotonic(), stack)
+        log.warning("Event loop blocked for at least %.3fs; loop thread stack:\n%s", blocked, stack)
+
+    def health(self) -> LoopHealth:
+        lags = list(self._lags)
+        return LoopHealth(
+            lag_seconds=lags[-1] if lags else 0.0,
+            max_lag_seconds=max(lags, default=0.0),
+            stalls=self.stalls,
+            last_stall=self.last_stall,
+        )
@@ -0,0 +1,256 @@
+"""In-process latency metrics rendered in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Final, Literal, TypeVar
+
+from pymongo import monitoring
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+# Prometheus client defaults, extended to cover slow Discord REST calls.
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+CONTENT_TYPE: Final = "text/plain; version=0.0.4; charset=utf-8"
+
+Collector = Callable[[], None]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative latency buckets per label combination."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, seconds: float, *labelvalues: str) -> None:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        total[0] += seconds
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series is not None else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labelvalues, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                labels = _labels(self.labelnames, labelvalues, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_number(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge:
+    """Latest value per label combination, usually refreshed by a collector before rendering."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        kind: Literal["gauge", "counter"] = "gauge",
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        self._values[labelvalues] = value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labelvalues, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+Metric = TypeVar("Metric", "Histogram", "Gauge")
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Histogram | Gauge] = {}
+        self._collectors: list[Collector] = []
+
+    def _existing(self, name: str, kind: type[Metric], labelnames: Sequence[str]) -> Metric | None:
+        """Return an identical metric so reloaded extensions can re-declare theirs."""
+        existing = self._metrics.get(name)
+        if existing is None:
+            return None
+        if not isinstance(existing, kind) or existing.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric already registered with another shape: {name}")
+        return existing
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = self._existing(name, Histogram, labelnames)
+        if histogram is None:
+            histogram = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+        return histogram
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        kind: Literal["gauge", "counter"] = "gauge",
+    ) -> Gauge:
+        gauge = self._existing(name, Gauge, labelnames)
+        if gauge is None:
+            gauge = self._metrics[name] = Gauge(name, documentation, labelnames, kind=kind)
+        return gauge
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                log.exception("Metrics collector failed: %r", collector)
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Record the server-reported duration of every MongoDB command."""
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        return None
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.histogram.observe(event.duration_micros / 1_000_000, event.command_name, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.histogram.observe(event.duration_micros / 1_000_000, event.command_name, "error")
+
+
+class MetricsServer:
+    """Serve ``GET /metrics`` for a registry on a local address."""
+
+    def __init__(self, registry: MetricsRegistry, *, host: str, port: int) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        from aiohttp import web
+
+        return web.Response(
+            body=self.registry.render().encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    async def start(self) -> None:
+        # aiohttp's server side is only imported when the endpoint is enabled.
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, self.port)
+        await site.start()
+        self._runner = runner
+        log.info("Serving metrics on http://%s:%s/metrics", self.host, self.port)
+
+    @property
+    def bound_port(self) -> int | None:
+        """The listening port, useful when the server was started on port 0."""
+        if self._runner is None:
+            return None
+        for address in self._runner.addresses:
+            return int(address[1])
+        return None
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
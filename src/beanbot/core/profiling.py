@@ -0,0 +1,224 @@
+"""Sampled per-invocation profiling of coroutines, with cProfile and collapsed-stack export."""
+
+from __future__ import annotations
+
+import cProfile
+import heapq
+import itertools
+import os
+import pstats
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Coroutine, Generator, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Final, TypeVar
+
+T = TypeVar("T")
+
+RECENT_INVOCATIONS: Final = 100
+_MAX_STACK_DEPTH: Final = 64
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# pstats keys a function as (filename, line number, function name).
+FunctionKey = tuple[str, int, str]
+
+
+@dataclass(frozen=True, slots=True)
+class InvocationTiming:
+    name: str
+    wall_seconds: float
+    cpu_seconds: float
+    await_seconds: float
+    profiled: bool
+
+
+@dataclass(order=True, slots=True)
+class _Slow:
+    wall_seconds: float
+    sequence: int
+    timing: InvocationTiming = field(compare=False)
+    profile: cProfile.Profile | None = field(compare=False)
+
+
+class _Measured:
+    """Drive a coroutine step by step, timing only the steps where it actually runs.
+
+    Time between steps is time the coroutine spent awaiting, during which other tasks run, so
+    the CPU clock and the optional profiler are only active inside this coroutine's own steps.
+    """
+
+    def __init__(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        profile: cProfile.Profile | None,
+    ) -> None:
+        self.coro = coro
+        self.profile = profile
+        self.active_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        send_value: Any = None
+        error: BaseException | None = None
+        while True:
+            started, cpu_started = time.perf_counter(), time.thread_time()
+            if self.profile is not None:
+                self.profile.enable()
+            try:
+                yielded = self.coro.send(send_value) if error is None else self.coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if self.profile is not None:
+                    self.profile.disable()
+                self.active_seconds += time.perf_counter() - started
+                self.cpu_seconds += time.thread_time() - cpu_started
+            try:
+                send_value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coro.close()
+                raise
+            except BaseException as exc:
+                send_value, error = None, exc
+
+
+class CommandProfiler:
+    """Time a sampled fraction of invocations and keep cProfile data for the slowest ones.
+
+    Only one invocation is under cProfile at a time because the interpreter has a single
+    profiling hook per thread; other sampled invocations still record their timings. Profiled
+    and timing-only invocations are ranked separately, so a burst of slow concurrent calls
+    cannot push the profiles out before they are dumped.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        sample_rate: float = 0.01,
+        keep_slowest: int = 10,
+        enabled: bool = False,
+        sample: Callable[[], float] = random.random,
+    ) -> None:
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep_slowest = keep_slowest
+        self.enabled = enabled
+        self._sample = sample
+        self._profiling = False
+        self._sequence = itertools.count()
+        self._slowest_profiled: list[_Slow] = []
+        self._slowest_timed: list[_Slow] = []
+        self.recent: deque[InvocationTiming] = deque(maxlen=RECENT_INVOCATIONS)
+        self.sampled = 0
+
+    def configure(self, *, enabled: bool, sample_rate: float | None = None) -> None:
+        self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, sample_rate))
+
+    async def run(self, name: str, coro: Coroutine[Any, Any, T]) -> T:
+        if not self.enabled or self._sample() >= self.sample_rate:
+            return await coro
+        profile = None if self._profiling else cProfile.Profile()
+        if profile is not None:
+            self._profiling = True
+        measured = _Measured(coro, profile)
+        started = time.perf_counter()
+        try:
+            result: T = await measured
+            return result
+        finally:
+            if profile is not None:
+                self._profiling = False
+            wall = time.perf_counter() - started
+            self._record(
+                InvocationTiming(
+                    name,
+                    wall,
+                    measured.cpu_seconds,
+                    max(0.0, wall - measured.active_seconds),
+                    profile is not None,
+                ),
+                profile,
+            )
+
+    def _record(self, timing: InvocationTiming, profile: cProfile.Profile | None) -> None:
+        self.sampled += 1
+        self.recent.append(timing)
+        entry = _Slow(timing.wall_seconds, next(self._sequence), timing, profile)
+        slowest = self._slowest_timed if profile is None else self._slowest_profiled
+        if len(slowest) < self.keep_slowest:
+            heapq.heappush(slowest, entry)
+        elif slowest and entry > slowest[0]:
+            heapq.heapreplace(slowest, entry)
+
+    def slowest(self) -> list[InvocationTiming]:
+        ranked = heapq.nlargest(
+            self.keep_slowest, itertools.chain(self._slowest_profiled, self._slowest_timed)
+        )
+        return [entry.timing for entry in ranked]
+
+    def dump(self) -> list[Path]:
+        """Write ``.pstats`` and collapsed-stack files for the slowest profiled invocations.
+
+        This does blocking file I/O; call it from a worker thread.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        written: list[Path] = []
+        ranked = sorted(self._slowest_profiled, reverse=True)
+        for rank, entry in enumerate(ranked, start=1):
+            if entry.profile is None:
+                continue
+            name = _UNSAFE_FILENAME.sub("_", entry.timing.name)
+            stem = f"{stamp}-{rank:02d}-{name}-{round(entry.wall_seconds * 1000)}ms"
+            stats_path = self.directory / f"{stem}.pstats"
+            entry.profile.dump_stats(stats_path)
+            collapsed_path = self.directory / f"{stem}.collapsed"
+            collapsed_path.write_text(
+                "".join(f"{line}\n" for line in collapsed_stacks(pstats.Stats(entry.profile))),
+                encoding="utf-8",
+            )
+            written.extend((stats_path, collapsed_path))
+        return written
+
+
+def _frame(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Iterator[str]:
+    """Approximate flame-graph stacks (``frame;frame;frame microseconds``) from cProfile data.
+
+    cProfile only records caller/callee pairs, so a function's time is split among its callers in
+    proportion to each call edge. This is the usual cProfile-to-flamegraph reconstruction.
+    """
+    entries: dict[FunctionKey, Any] = stats.stats  # type: ignore[attr-defined]
+    callees: dict[FunctionKey, list[tuple[FunctionKey, float]]] = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, edge_cumulative))
+    roots = [function for function, entry in entries.items() if not entry[4]]
+
+    def walk(function: FunctionKey, share: float, stack: tuple[str, ...]) -> Iterator[str]:
+        _, _, own, cumulative, _ = entries[function]
+        stack = (*stack, _frame(function))
+        scale = share / cumulative if cumulative else 0.0
+        own_micros = round(own * scale * 1_000_000)
+        if own_micros > 0:
+            yield f"{';'.join(stack)} {own_micros}"
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+        for callee, edge in callees.get(function, ()):
+            if _frame(callee) not in stack:
+                yield from walk(callee, edge * scale, stack)
+
+    for root in roots:
+        yield from walk(root, entries[root][3], ())
@@ -1,69 +1,306 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import aiohttp
 import discord
+from discord import app_commands
 from discord.ext import commands
+from discord.utils import MISSING
 from pymongo import AsyncMongoClient
 
 from beanbot.core.config import Settings
-from beanbot.features.registry import FEATURE_EXTENSIONS
+from beanbot.core.http import OutboundHttp
+from beanbot.core.logging import bind_log_context, log_context
+from beanbot.core.loop_health import LoopMonitor
+from beanbot.core.metrics import MetricsServer
+from beanbot.core.profiling import CommandProfiler
+from beanbot.discord.command_sync import CommandSyncState, sync_command_tree
+from beanbot.discord.instrumentation import BotMetrics, Listener
+from beanbot.discord.memory import cache_policy, feature_cache_needs
+from beanbot.discord.sharding import ShardTracker, parse_shard_ids, shard_for_guild
+from beanbot.discord.startup import StartupTimeline, load_feature_extensions
+from beanbot.features.registry import (
+    FEATURE_CACHE_NEEDS,
+    FEATURE_EXTENSIONS,
+    FEATURE_REQUIREMENTS,
+)
 
 log = logging.getLogger(__name__)
 
 
-class BeanBot(commands.Bot):
-    def __init__(self, settings: Settings) -> None:
-        intents = discord.Intents.default()
-        intents.message_content = True
+class BeanCommandTree(app_commands.CommandTree["BeanBot"]):
+    async def interaction_check(self, interaction: discord.Interaction[BeanBot], /) -> bool:
+        # Runs inside the interaction's own task, so the context covers the whole command.
+        bind_log_context(
+            command=interaction.command.qualified_name if interaction.command else None,
+            guild_id=interaction.guild_id,
+            channel_id=interaction.channel_id,
+            user_id=interaction.user.id,
+        )
+        if interaction.type is discord.InteractionType.application_command:
+            self.client.metrics.app_command_started(interaction)
+        return True
+
+    async def on_error(
+        self,
+        interaction: discord.Interaction[BeanBot],
+        error: app_commands.AppCommandError,
+        /,
+    ) -> None:
+        self.client.metrics.app_command_finished(interaction, "error")
+        await super().on_error(interaction, error)
 
+
+class BeanBot(commands.Bot):
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        startup_timeline: StartupTimeline | None = None,
+        **options: Any,
+    ) -> None:
+        # Listeners are wrapped with timers as cogs add them, so metrics must exist first.
+        self.metrics = BotMetrics()
+        self._timed_listeners: dict[tuple[str, Listener], Listener] = {}
+        self.cache_policy = cache_policy(
+            settings.memory_profile,
+            feature_cache_needs(FEATURE_EXTENSIONS, FEATURE_CACHE_NEEDS),
+        )
         super().__init__(
             command_prefix=commands.when_mentioned_or(settings.prefix),
-            intents=intents,
             help_command=None,
+            tree_cls=BeanCommandTree,
+            **self.cache_policy.client_options(),
+            **options,
         )
 
         self.settings = settings
         self.http_session: aiohttp.ClientSession | None = None
+        self.outbound_http: OutboundHttp | None = None
         self.mongo_client: AsyncMongoClient[dict[str, Any]] | None = None
+        self.startup_timeline = startup_timeline or StartupTimeline()
+        self.shard_tracker = ShardTracker()
+        self.metrics_server: MetricsServer | None = None
+        self.profiler = CommandProfiler(
+            settings.state_dir / "profiles",
+            sample_rate=settings.profile_sample_rate,
+            keep_slowest=settings.profile_keep_slowest,
+            enabled=settings.profile_enabled,
+        )
+        self.loop_monitor = LoopMonitor(
+            interval_seconds=settings.loop_lag_interval_seconds,
+            slow_callback_seconds=settings.loop_slow_callback_seconds,
+            lag_histogram=self.metrics.loop_lag,
+        )
+        self.metrics.registry.add_collector(self._collect_gateway_metrics)
+
+    def local_shard_ids(self) -> tuple[int, ...]:
+        """Shards whose gateway connections this process owns."""
+        return (self.shard_id or 0,)
+
+    def shard_latencies(self) -> dict[int, float]:
+        return {self.shard_id or 0: self.latency}
+
+    def shard_for_guild(self, guild_id: int) -> int:
+        return shard_for_guild(guild_id, self.shard_count or 1)
+
+    def ready_shards(self) -> AsyncIterator[int]:
+        """Yield each local shard ID once, as soon as that shard is ready."""
+        return self.shard_tracker.ready_shards(self.local_shard_ids)
+
+    def _collect_gateway_metrics(self) -> None:
+        self.metrics.record_gateway_latencies(self.shard_latencies())
+        self.metrics.loop_stalls.set(self.loop_monitor.stalls)
+
+    def add_listener(self, func: Listener, /, name: str = MISSING) -> None:
+        event = func.__name__ if name is MISSING else name
+        timed = self.metrics.wrap_listener(func, event)
+        self._timed_listeners[(event, func)] = timed
+        super().add_listener(timed, event)
+
+    def remove_listener(self, func: Listener, /, name: str = MISSING) -> None:
+        event = func.__name__ if name is MISSING else name
+        super().remove_listener(self._timed_listeners.pop((event, func), func), event)
+
+    async def invoke(self, ctx: commands.Context[Any], /) -> None:
+        with log_context(
+            command=ctx.command.qualified_name if ctx.command else None,
+            guild_id=ctx.guild.id if ctx.guild else None,
+            channel_id=ctx.channel.id,
+            user_id=ctx.author.id,
+        ):
+            if ctx.command is None:
+                await super().invoke(ctx)
+                return
+            name = ctx.command.qualified_name
+            started = time.perf_counter()
+            try:
+                await self.profiler.run(name, super().invoke(ctx))
+            finally:
+                # Command errors are dispatched to on_command_error rather than raised.
+                self.metrics.command_finished(
+                    name, time.perf_counter() - started, failed=ctx.command_failed
+                )
+
+    async def on_command_error(
+        self,
+        context: commands.Context[Any],
+        exception: commands.CommandError,
+        /,
+    ) -> None:
+        # Hybrid commands used as slash commands report their errors here, not to the tree.
+        if context.interaction is not None:
+            self.metrics.app_command_finished(context.interaction, "error")
+        await super().on_command_error(context, exception)
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command[Any, ..., Any] | app_commands.ContextMenu,
+    ) -> None:
+        self.metrics.app_command_finished(interaction, "ok")
 
     async def setup_hook(self) -> None:
-        timeout = aiohttp.ClientTimeout(total=15)
-        self.http_session = aiohttp.ClientSession(timeout=timeout)
-        if self.settings.mongo_connection_string:
-            self.mongo_client = AsyncMongoClient(self.settings.mongo_connection_string)
-            await self.mongo_client.admin.command("ping")
-            log.info("Connected to MongoDB database: %s", self.settings.mongo_database_name)
+        timeline = self.startup_timeline
+        if self.settings.loop_monitor_enabled:
+            self.loop_monitor.start()
+        if self.settings.metrics_enabled:
+            with timeline.phase("metrics server"):
+                self.metrics_server = MetricsServer(
+                    self.metrics.registry,
+                    host=self.settings.metrics_host,
+                    port=self.settings.metrics_port,
+                )
+                await self.metrics_server.start()
+        resources = {
+            "http_session": asyncio.create_task(self._open_http_session()),
+            "mongo": asyncio.create_task(self._connect_mongo()),
+        }
+        try:
+            with timeline.phase("extensions"):
+                await load_feature_extensions(
+                    self.load_extension,
+                    FEATURE_EXTENSIONS,
+                    FEATURE_REQUIREMENTS,
+                    resources,
+                    timeline,
+                )
+        finally:
+            # Surface resource failures even when no extension waited on that resource.
+            outcomes = await asyncio.gather(*resources.values(), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
 
-        for ext in FEATURE_EXTENSIONS:
-            await self.load_extension(ext)
-            log.info("Loaded extension: %s", ext)
+        with timeline.phase("command sync"):
+            await sync_command_tree(
+                self.tree,
+                mode=self.settings.command_sync_mode,
+                dev_guild_id=self.settings.dev_guild_id,
+                application_id=self.application_id,
+                state=CommandSyncState(self.settings.state_dir / "command-sync.json"),
+                force=self.settings.command_sync_force,
+            )
 
-        if self.settings.dev_guild_id:
-            guild = discord.Object(id=self.settings.dev_guild_id)
-            self.tree.copy_global_to(guild=guild)
-            await self.tree.sync(guild=guild)
-            log.info("Synced app commands to DEV guild: %s", self.settings.dev_guild_id)
-        else:
-            log.info("DEV_GUILD_ID not set; skipping slash command sync (prefix commands work)")
+    async def _open_http_session(self) -> None:
+        with self.startup_timeline.phase("http session"):
+            settings = self.settings
+            self.outbound_http = OutboundHttp.create(
+                connect_timeout=settings.http_connect_timeout,
+                read_timeout=settings.http_read_timeout,
+                total_timeout=settings.http_total_timeout,
+                limit_per_host=settings.http_limit_per_host,
+                retries=settings.http_retries,
+                failure_threshold=settings.http_breaker_failures,
+                reset_seconds=settings.http_breaker_reset_seconds,
+                timings=self.metrics.http,
+            )
+            self.http_session = self.outbound_http.session
+
+    async def _connect_mongo(self) -> None:
+        if not self.settings.mongo_connection_string:
+            return
+        with self.startup_timeline.phase("mongo"):
+            self.mongo_client = AsyncMongoClient(
+                self.settings.mongo_connection_string,
+                event_listeners=[self.metrics.mongo_listener()],
+            )
+            await self.mongo_client.admin.command("ping")
+        log.info("Connected to MongoDB database: %s", self.settings.mongo_database_name)
 
     async def close(self) -> None:
+        # Unload extensions first so cogs can flush buffered MongoDB writes before the client closes.
         try:
+            await super().close()
+        finally:
             if self.http_session and not self.http_session.closed:
                 await self.http_session.close()
             if self.mongo_client is not None:
                 await self.mongo_client.close()
-        finally:
-            await super().close()
+            if self.metrics_server is not None:
+                await self.metrics_server.close()
+            await self.loop_monitor.close()
 
 
-def create_bot(settings: Settings) -> BeanBot:
-    bot = BeanBot(settings)
+class ShardedBeanBot(BeanBot, commands.AutoShardedBot):
+    """BeanBot over several gateway shards, readying and reporting each one separately."""
+
+    def local_shard_ids(self) -> tuple[int, ...]:
+        if self.shard_ids is not None:
+            return tuple(self.shard_ids)
+        return tuple(range(self.shard_count or 1))
+
+    def shard_latencies(self) -> dict[int, float]:
+        return dict(self.latencies)
+
+    async def on_shard_connect(self, shard_id: int) -> None:
+        self.shard_tracker.connected(shard_id)
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self.shard_tracker.disconnected(shard_id)
+        log.warning("Gateway shard %s disconnected", shard_id)
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        if self.shard_tracker.ready(shard_id):
+            self.startup_timeline.mark(f"shard {shard_id} ready")
+            log.info("Gateway shard %s is ready", shard_id)
+
+
+def create_bot(settings: Settings, startup_timeline: StartupTimeline | None = None) -> BeanBot:
+    bot: BeanBot
+    if settings.shard_mode == "off":
+        bot = BeanBot(settings, startup_timeline=startup_timeline)
+    elif settings.shard_mode == "auto":
+        bot = ShardedBeanBot(
+            settings,
+            startup_timeline=startup_timeline,
+            shard_count=settings.shard_count or None,
+        )
+    else:
+        shard_ids = parse_shard_ids(settings.shard_ids)
+        if settings.shard_count < 1 or not shard_ids:
+            raise ValueError("shard_mode=explicit requires shard_count and shard_ids")
+        if shard_ids[-1] >= settings.shard_count:
+            raise ValueError(
+                f"shard_ids {settings.shard_ids!r} exceed shard_count {settings.shard_count}"
+            )
+        bot = ShardedBeanBot(
+            settings,
+            startup_timeline=startup_timeline,
+            shard_count=settings.shard_count,
+            shard_ids=list(shard_ids),
+        )
 
     @bot.event
     async def on_ready() -> None:
         log.info("Logged in as %s (id=%s)", bot.user, bot.user.id if bot.user else "unknown")
+        if not isinstance(bot, ShardedBeanBot):
+            bot.shard_tracker.ready(0)
+        bot.startup_timeline.complete()
 
     return bot
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Literal
+
+import discord
+from discord import app_commands
+
+log = logging.getLogger(__name__)
+
+CommandSyncMode = Literal["auto", "dev_guild", "global", "off"]
+
+
+async def command_tree_fingerprint(
+    tree: app_commands.CommandTree[Any],
+    guild: discord.abc.Snowflake | None = None,
+) -> str:
+    """Hash the payload ``tree.sync`` would upload for ``guild`` (or globally).
+
+    Like ``tree.sync``, this uses the translated payload when the tree has a translator, so a
+    changed translation is a changed fingerprint.
+    """
+    commands = tree.get_commands(guild=guild)
+    translator = tree.translator
+    if translator is not None:
+        payloads = [await command.get_translated_payload(tree, translator) for command in commands]
+    else:
+        payloads = [command.to_dict(tree) for command in commands]
+    payload = sorted(
+        payloads,
+        key=lambda item: (int(item.get("type", 1)), str(item["name"])),
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CommandSyncState:
+    """Local record of the last command-tree fingerprint synced to each scope."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _read(self) -> dict[str, str]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable command sync state: %s", self.path, exc_info=True)
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {str(scope): str(value) for scope, value in data.items()}
+
+    def get(self, scope: str) -> str | None:
+        return self._read().get(scope)
+
+    def set(self, scope: str, fingerprint: str) -> None:
+        data = self._read()
+        data[scope] = fingerprint
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        except OSError:
+            log.warning("Could not record command sync state: %s", self.path, exc_info=True)
+
+
+async def sync_command_tree(
+    tree: app_commands.CommandTree[Any],
+    *,
+    mode: CommandSyncMode,
+    dev_guild_id: int,
+    application_id: int | None,
+    state: CommandSyncState,
+    force: bool = False,
+) -> bool:
+    """Sync app commands only when their fingerprint differs from the last successful sync."""
+    if mode == "auto":
+        mode = "dev_guild" if dev_guild_id else "off"
+    if mode == "off":
+        log.info("App command sync disabled; prefix commands still work")
+        return False
+
+    guild: discord.Object | None = None
+    if mode == "dev_guild":
+        if not dev_guild_id:
+            log.warning("command_sync_mode=dev_guild requires dev_guild_id; skipping sync")
+            return False
+        guild = discord.Object(id=dev_guild_id)
+        tree.copy_global_to(guild=guild)
+
+    scope = f"{application_id}:global" if guild is None else f"{application_id}:guild:{guild.id}"
+    fingerprint = await command_tree_fingerprint(tree, guild=guild)
+    if not force and state.get(scope) == fingerprint:
+        log.info("App commands unchanged for %s; skipping sync", scope)
+        return False
+
+    await tree.sync(guild=guild)
+    state.set(scope, fingerprint)
+    if guild is None:
+        log.info("Synced app commands globally")
+    else:
+        log.info("Synced app commands to DEV guild: %s", guild.id)
+    return True
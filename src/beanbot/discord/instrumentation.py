@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import functools
+import math
+import time
+from collections.abc import Callable, Coroutine, Mapping
+from typing import Any
+
+import discord
+
+from beanbot.core.metrics import MetricsRegistry, MongoCommandMetrics
+
+Listener = Callable[..., Coroutine[Any, Any, Any]]
+
+# Where an application command interaction keeps the time its handler was entered.
+_STARTED_KEY = "beanbot_command_started"
+
+
+class BotMetrics:
+    """The bot's metric families and the Discord hooks that feed them."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        self.commands = self.registry.histogram(
+            "beanbot_command_seconds",
+            "Prefix, hybrid, and slash command latency.",
+            ("command", "outcome"),
+        )
+        self.listeners = self.registry.histogram(
+            "beanbot_listener_seconds",
+            "Time spent in each gateway event listener.",
+            ("event", "listener"),
+        )
+        self.components = self.registry.histogram(
+            "beanbot_component_seconds",
+            "Time to handle a persistent message component interaction.",
+            ("component",),
+        )
+        self.mongo = self.registry.histogram(
+            "beanbot_mongo_command_seconds",
+            "Server-reported MongoDB command duration.",
+            ("command", "outcome"),
+        )
+        self.http = self.registry.histogram(
+            "beanbot_http_request_seconds",
+            "Outbound HTTP time to response headers, per attempt.",
+            ("host", "outcome"),
+        )
+        self.loop_lag = self.registry.histogram(
+            "beanbot_event_loop_lag_seconds",
+            "How late the event loop ran a periodic timer.",
+        )
+        self.loop_stalls = self.registry.gauge(
+            "beanbot_event_loop_stalls_total",
+            "Callbacks that blocked the event loop longer than the slow-callback threshold.",
+            kind="counter",
+        )
+        self.gateway_latency = self.registry.gauge(
+            "beanbot_gateway_latency_seconds",
+            "Heartbeat latency per gateway shard.",
+            ("shard",),
+        )
+
+    def mongo_listener(self) -> MongoCommandMetrics:
+        return MongoCommandMetrics(self.mongo)
+
+    def command_finished(self, name: str, seconds: float, *, failed: bool) -> None:
+        self.commands.observe(seconds, name, "error" if failed else "ok")
+
+    def app_command_started(self, interaction: discord.Interaction) -> None:
+        interaction.extras[_STARTED_KEY] = time.perf_counter()
+
+    def app_command_finished(self, interaction: discord.Interaction, outcome: str) -> None:
+        started = interaction.extras.pop(_STARTED_KEY, None)
+        if started is None or interaction.command is None:
+            return
+        self.commands.observe(
+            time.perf_counter() - started, interaction.command.qualified_name, outcome
+        )
+
+    def wrap_listener(self, func: Listener, event: str) -> Listener:
+        name = getattr(func, "__qualname__", repr(func))
+
+        @functools.wraps(func)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.listeners.time(event, name):
+                return await func(*args, **kwargs)
+
+        return timed
+
+    def record_gateway_latencies(self, latencies: Mapping[int, float]) -> None:
+        self.gateway_latency.clear()
+        for shard_id, latency in latencies.items():
+            if math.isfinite(latency):
+                self.gateway_latency.set(latency, str(shard_id))
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import sys
+from collections import Counter
+from collections.abc import Collection, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Final, Literal
+
+import discord
+
+MemoryProfile = Literal["default", "lean"]
+
+# Discord client caches a feature can declare in ``FEATURE_CACHE_NEEDS``.
+CACHE_NEEDS: Final[frozenset[str]] = frozenset({"messages", "members", "member_chunking", "voice"})
+DEFAULT_MAX_MESSAGES: Final = 1000
+_SIZE_SAMPLE: Final = 50
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    profile: MemoryProfile
+    intents: discord.Intents
+    max_messages: int | None
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+
+    def client_options(self) -> dict[str, Any]:
+        return {
+            "intents": self.intents,
+            "max_messages": self.max_messages,
+            "member_cache_flags": self.member_cache_flags,
+            "chunk_guilds_at_startup": self.chunk_guilds_at_startup,
+        }
+
+
+def feature_cache_needs(
+    extensions: Iterable[str],
+    needs: Mapping[str, frozenset[str]],
+) -> frozenset[str]:
+    return frozenset().union(*(needs.get(extension, frozenset()) for extension in extensions))
+
+
+def cache_policy(profile: MemoryProfile, needs: Collection[str]) -> CachePolicy:
+    """Choose gateway intents and cache sizes for the loaded features.
+
+    ``default`` keeps discord.py's own caching. ``lean`` caches only what a loaded feature
+    declared it reads: without ``messages`` there is no message cache, without ``members`` or
+    ``voice`` members are kept only while an event or interaction carries them, and guilds are
+    chunked at startup only for ``member_chunking``. Typing events are never subscribed to.
+    """
+    intents = discord.Intents.default()
+    intents.message_content = True
+    if profile == "default":
+        return CachePolicy(
+            profile,
+            intents,
+            DEFAULT_MAX_MESSAGES,
+            discord.MemberCacheFlags.from_intents(intents),
+            intents.members,
+        )
+
+    intents.typing = False
+    intents.voice_states = "voice" in needs
+    # The members intent is privileged, so it is only requested when a feature needs it.
+    intents.members = bool({"members", "member_chunking"} & set(needs))
+    flags = discord.MemberCacheFlags.none()
+    flags.voice = "voice" in needs
+    flags.joined = intents.members
+    return CachePolicy(
+        profile,
+        intents,
+        DEFAULT_MAX_MESSAGES if "messages" in needs else None,
+        flags,
+        "member_chunking" in needs,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class GuildCacheUsage:
+    guild_id: int
+    name: str
+    members: int
+    roles: int
+    channels: int
+    emojis: int
+    messages: int
+    approx_bytes: int
+
+
+def _slot_names(obj: object) -> Iterable[str]:
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        yield from (slots,) if isinstance(slots, str) else slots
+
+
+def _shallow_size(obj: object) -> int:
+    """``sys.getsizeof`` of the object plus each attribute it holds directly."""
+    size = sys.getsizeof(obj)
+    for name in _slot_names(obj):
+        value = getattr(obj, name, None)
+        if value is not None and not isinstance(value, type):
+            size += sys.getsizeof(value)
+    return size
+
+
+def _estimate(items: Sequence[object]) -> int:
+    """Extrapolate the size of a collection from a fixed-size sample."""
+    if not items:
+        return 0
+    sample = list(islice(items, _SIZE_SAMPLE))
+    return sum(_shallow_size(item) for item in sample) * len(items) // len(sample)
+
+
+def guild_cache_report(
+    guilds: Iterable[discord.Guild],
+    messages: Sequence[discord.Message],
+) -> list[GuildCacheUsage]:
+    """Approximate the client cache held for each guild, largest first.
+
+    Sizes are sampled and shallow, so they are for comparing guilds and profiles rather than
+    for exact accounting.
+    """
+    message_counts = Counter(message.guild.id for message in messages if message.guild)
+    message_bytes = _estimate(messages) // len(messages) if messages else 0
+    report = []
+    for guild in guilds:
+        members = guild.members
+        roles = guild.roles
+        channels = guild.channels
+        emojis = guild.emojis
+        message_count = message_counts.get(guild.id, 0)
+        approx_bytes = (
+            _shallow_size(guild)
+            + _estimate(members)
+            + _estimate(roles)
+            + _estimate(channels)
+            + _estimate(emojis)
+            + message_count * message_bytes
+        )
+        report.append(
+            GuildCacheUsage(
+                guild.id,
+                guild.name,
+                len(members),
+                len(roles),
+                len(channels),
+                len(emojis),
+                message_count,
+                approx_bytes,
+            )
+        )
+    report.sort(key=lambda usage: usage.approx_bytes, reverse=True)
+    return report
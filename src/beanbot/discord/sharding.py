@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Callable, Collection
+from dataclasses import dataclass
+
+
+def parse_shard_ids(value: str) -> tuple[int, ...]:
+    """Parse ``"0-3,8"`` style shard lists into sorted, unique shard IDs."""
+    shard_ids: set[int] = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, separator, last = part.partition("-")
+        start = int(first)
+        end = int(last) if separator else start
+        if start < 0 or end < start:
+            raise ValueError(f"Invalid shard range: {part}")
+        shard_ids.update(range(start, end + 1))
+    return tuple(sorted(shard_ids))
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Discord's shard formula: ``(guild_id >> 22) % shard_count``."""
+    return (guild_id >> 22) % max(1, shard_count)
+
+
+def format_latency(seconds: float) -> str:
+    return f"{round(seconds * 1000)}ms" if math.isfinite(seconds) else "n/a"
+
+
+@dataclass(slots=True)
+class ShardStatus:
+    shard_id: int
+    connected: bool = False
+    ready: bool = False
+    ready_at: float | None = None
+    disconnects: int = 0
+
+
+class ShardTracker:
+    """Per-shard gateway state fed from the ``on_shard_*`` events."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._statuses: dict[int, ShardStatus] = {}
+        self._ready_order: list[int] = []
+        self._changed = asyncio.Event()
+
+    def _status(self, shard_id: int) -> ShardStatus:
+        return self._statuses.setdefault(shard_id, ShardStatus(shard_id))
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def connected(self, shard_id: int) -> None:
+        self._status(shard_id).connected = True
+
+    def disconnected(self, shard_id: int) -> None:
+        status = self._status(shard_id)
+        status.connected = False
+        status.disconnects += 1
+
+    def ready(self, shard_id: int) -> bool:
+        """Record readiness; return ``True`` the first time this shard becomes ready."""
+        status = self._status(shard_id)
+        status.connected = True
+        status.ready = True
+        first = status.ready_at is None
+        if first:
+            status.ready_at = self._clock()
+            self._ready_order.append(shard_id)
+            self._notify()
+        return first
+
+    def statuses(self) -> tuple[ShardStatus, ...]:
+        return tuple(self._statuses[shard_id] for shard_id in sorted(self._statuses))
+
+    async def ready_shards(
+        self,
+        expected: Callable[[], Collection[int]],
+    ) -> AsyncIterator[int]:
+        """Yield each shard once as it first becomes ready, until every expected shard has."""
+        yielded: set[int] = set()
+        while True:
+            for shard_id in list(self._ready_order):
+                if shard_id not in yielded:
+                    yielded.add(shard_id)
+                    yield shard_id
+            remaining = set(expected()) - yielded
+            if yielded and not remaining:
+                return
+            await self._changed.wait()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Final
+
+log = logging.getLogger(__name__)
+
+STARTUP_RESOURCES: Final[frozenset[str]] = frozenset({"http_session", "mongo"})
+
+
+@dataclass(frozen=True, slots=True)
+class StartupPhase:
+    name: str
+    started: float
+    finished: float
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+class StartupTimeline:
+    """Per-phase startup timings, measured from one shared origin."""
+
+    def __init__(self, origin: float | None = None) -> None:
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases: list[StartupPhase] = []
+        self.completed = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(StartupPhase(name, started, time.perf_counter()))
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append(StartupPhase(name, now, now))
+
+    def complete(self, name: str = "ready") -> None:
+        """Record the final milestone and log the timeline once."""
+        if self.completed:
+            return
+        self.completed = True
+        self.mark(name)
+        for phase in sorted(self.phases, key=lambda item: item.started):
+            log.info(
+                "Startup phase %s: at=+%.3fs duration=%.3fs",
+                phase.name,
+                phase.started - self.origin,
+                phase.seconds,
+            )
+        log.info("Startup reached %s after %.3fs", name, self.phases[-1].started - self.origin)
+
+
+async def load_feature_extensions(
+    load: Callable[[str], Awaitable[None]],
+    extensions: Sequence[str],
+    requirements: Mapping[str, frozenset[str]],
+    resources: Mapping[str, asyncio.Future[None]],
+    timeline: StartupTimeline,
+) -> None:
+    """Load extensions concurrently, each one starting once its required resources are ready."""
+    unknown = {
+        name
+        for extension in extensions
+        for name in requirements.get(extension, frozenset())
+        if name not in resources
+    }
+    if unknown:
+        raise ValueError(f"Unknown startup resources: {', '.join(sorted(unknown))}")
+
+    async def load_one(extension: str) -> None:
+        needs = sorted(requirements.get(extension, frozenset()))
+        if needs:
+            # Unlike gather, wait leaves the shared resources running if this load is cancelled.
+            await asyncio.wait([resources[name] for name in needs])
+            for name in needs:
+                resources[name].result()
+        with timeline.phase(f"extension {extension}"):
+            await load(extension)
+        log.info("Loaded extension: %s", extension)
+
+    # A failed load cancels the loads still running; re-raise that failure itself.
+    try:
+        async with asyncio.TaskGroup() as loads:
+            for extension in extensions:
+                loads.create_task(load_one(extension))
+    except BaseExceptionGroup as group:
+        raise group.exceptions[0] from None
@@ -0,0 +1 @@
+"""Maintainer-only runtime diagnostics."""
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+from discord.ext import commands
+
+from beanbot.core.profiling import CommandProfiler
+from beanbot.discord.bot import BeanBot
+from beanbot.discord.memory import GuildCacheUsage, guild_cache_report
+
+REPORTED_GUILDS = 10
+
+
+def _mib(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MiB"
+
+
+def format_cache_report(bot: BeanBot, usages: list[GuildCacheUsage]) -> str:
+    policy = bot.cache_policy
+    flags = policy.member_cache_flags
+    lines = [
+        f"Profile: {policy.profile}",
+        f"Message cache: {policy.max_messages or 'off'}",
+        f"Member cache: voice={flags.voice} joined={flags.joined}",
+        f"Chunk at startup: {policy.chunk_guilds_at_startup}",
+        f"Guilds: {len(usages)}  approx total: {_mib(sum(usage.approx_bytes for usage in usages))}",
+    ]
+    for usage in usages[:REPORTED_GUILDS]:
+        lines.append(
+            f"{usage.guild_id} {usage.name[:24]}: {_mib(usage.approx_bytes)} "
+            f"members={usage.members} roles={usage.roles} channels={usage.channels} "
+            f"emojis={usage.emojis} messages={usage.messages}"
+        )
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+def format_profiler_status(profiler: CommandProfiler) -> str:
+    lines = [
+        f"Profiling: {'on' if profiler.enabled else 'off'} at {profiler.sample_rate:.1%}",
+        f"Sampled invocations: {profiler.sampled}",
+    ]
+    for timing in profiler.slowest():
+        lines.append(
+            f"{timing.name}: wall={timing.wall_seconds * 1000:.1f}ms "
+            f"cpu={timing.cpu_seconds * 1000:.1f}ms await={timing.await_seconds * 1000:.1f}ms"
+            + (" (profiled)" if timing.profiled else "")
+        )
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+class DiagnosticsCog(commands.Cog, name="Diagnostics"):
+    def __init__(self, bot: BeanBot) -> None:
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        lead_dev = self.bot.settings.lead_dev_user_id
+        return lead_dev != 0 and ctx.author.id == lead_dev
+
+    @commands.command(
+        name="cachestats",
+        hidden=True,
+        description="Approximate Discord cache memory per guild",
+    )
+    async def cache_stats(self, ctx: commands.Context) -> None:
+        usages = guild_cache_report(self.bot.guilds, self.bot.cached_messages)
+        await ctx.reply(format_cache_report(self.bot, usages))
+
+    @commands.group(
+        name="profile",
+        hidden=True,
+        invoke_without_command=True,
+        description="Show sampled command timings",
+    )
+    async def profile(self, ctx: commands.Context) -> None:
+        await ctx.reply(format_profiler_status(self.bot.profiler))
+
+    @profile.command(name="on", description="Sample a fraction of command invocations")
+    async def profile_on(self, ctx: commands.Context, sample_rate: float | None = None) -> None:
+        self.bot.profiler.configure(enabled=True, sample_rate=sample_rate)
+        await ctx.reply(format_profiler_status(self.bot.profiler))
+
+    @profile.command(name="off", description="Stop sampling command invocations")
+    async def profile_off(self, ctx: commands.Context) -> None:
+        self.bot.profiler.configure(enabled=False)
+        await ctx.reply(format_profiler_status(self.bot.profiler))
+
+    @profile.command(name="dump", description="Write profiles of the slowest invocations")
+    async def profile_dump(self, ctx: commands.Context) -> None:
+        written = await asyncio.to_thread(self.bot.profiler.dump)
+        if not written:
+            await ctx.reply("No profiled invocations to write yet.")
+            return
+        await ctx.reply(
+            f"Wrote {len(written)} files to `{self.bot.profiler.directory}`:\n"
+            + "\n".join(path.name for path in written)
+        )
+
+
+async def setup(bot: BeanBot) -> None:
+    await bot.add_cog(DiagnosticsCog(bot))
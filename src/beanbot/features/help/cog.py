@@ -3,6 +3,18 @@ from __future__ import annotations
 import discord
 from discord.ext import commands
 
+from beanbot.features.registry import FEATURE_EXTENSIONS
+
+
+def _registry_position(cog: commands.Cog) -> int:
+    # Extensions load concurrently, so list cogs in registry order rather than load order.
+    module = type(cog).__module__
+    return (
+        FEATURE_EXTENSIONS.index(module)
+        if module in FEATURE_EXTENSIONS
+        else len(FEATURE_EXTENSIONS)
+    )
+
 
 class HelpCog(commands.Cog, name="Help Commands"):
     def __init__(self, bot: commands.Bot) -> None:
@@ -15,7 +27,9 @@ class HelpCog(commands.Cog, name="Help Commands"):
             description="Use `%<command>` or `/command`.",
         )
 
-        for cog_name, cog in self.bot.cogs.items():
+        for cog_name, cog in sorted(
+            self.bot.cogs.items(), key=lambda item: _registry_position(item[1])
+        ):
             items: list[str] = []
             for cmd in cog.get_commands():
                 if cmd.hidden:
@@ -5,6 +5,8 @@ from typing import Any
 
 import aiohttp
 
+from beanbot.core.http import OutboundHttp
+
 BASE_URL = "https://meme-api.com"
 
 
@@ -41,14 +43,15 @@ def _parse_meme(payload: dict[str, Any]) -> Meme:
 
 
 class MemeApiClient:
-    def __init__(self, session: aiohttp.ClientSession) -> None:
-        self._session = session
+    # meme-api.com caps batch requests at 50 posts.
+    MAX_BATCH_SIZE = 50
 
-    async def get_meme(self, subreddit: str | None = None) -> Meme:
-        url = f"{BASE_URL}/gimme/{subreddit}" if subreddit else f"{BASE_URL}/gimme"
+    def __init__(self, http: OutboundHttp) -> None:
+        self._http = http
 
+    async def _get_payload(self, url: str) -> dict[str, Any]:
         try:
-            async with self._session.get(url) as resp:
+            async with self._http.get(url) as resp:
                 if resp.status >= 400:
                     text = await resp.text()
                     raise MemeApiError(f"Meme API HTTP {resp.status}: {text[:200]}")
@@ -62,4 +65,27 @@ class MemeApiClient:
         if not isinstance(payload, dict):
             raise MemeApiError("Meme API returned non-object JSON")
 
-        return _parse_meme(payload)
+        return payload
+
+    async def get_meme(self, subreddit: str | None = None) -> Meme:
+        url = f"{BASE_URL}/gimme/{subreddit}" if subreddit else f"{BASE_URL}/gimme"
+        return _parse_meme(await self._get_payload(url))
+
+    async def get_memes(self, subreddit: str | None, count: int) -> list[Meme]:
+        """Fetch a batch of memes, skipping any post whose payload is malformed."""
+        count = max(1, min(count, self.MAX_BATCH_SIZE))
+        url = f"{BASE_URL}/gimme/{subreddit}/{count}" if subreddit else f"{BASE_URL}/gimme/{count}"
+        payload = await self._get_payload(url)
+        entries = payload.get("memes")
+        if not isinstance(entries, list):
+            raise MemeApiError("Meme API batch response has no memes array")
+
+        memes: list[Meme] = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                memes.append(_parse_meme(entry))
+            except MemeApiError:
+                continue
+        return memes
@@ -7,7 +7,7 @@ import random
 import re as regular_expression
 from contextlib import suppress
 from dataclasses import dataclass
-from importlib import resources
+from pathlib import Path
 from typing import Final
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
@@ -15,8 +15,11 @@ import aiohttp
 import discord
 from discord.ext import commands, tasks
 
+from beanbot.core.assets import PackagedAsset, packaged_assets
 from beanbot.discord.bot import BeanBot
 from beanbot.features.memes.api import MemeApiClient, MemeApiError
+from beanbot.features.memes.images import ImageCache
+from beanbot.features.memes.pool import MemePool
 from beanbot.features.memes.puns import PunRepository
 
 log = logging.getLogger(__name__)
@@ -87,21 +90,17 @@ def _safe_allowed_mentions() -> discord.AllowedMentions:
     return discord.AllowedMentions(everyone=False, users=True, roles=False, replied_user=False)
 
 
+def _gordon_gifs() -> tuple[PackagedAsset, ...]:
+    return packaged_assets.select(prefix="gordon", suffix=".gif")
+
+
 def _get_random_gordon_gif() -> discord.File | None:
-    gordon_gifs = [
-        entry
-        for entry in resources.files("beanbot.resources").iterdir()
-        if entry.is_file()
-        and entry.name.startswith("gordon")
-        and entry.name.lower().endswith(".gif")
-    ]
+    gordon_gifs = _gordon_gifs()
     if not gordon_gifs:
         return None
 
     chosen = random.choice(gordon_gifs)
-    data = chosen.read_bytes()
-    buffer = io.BytesIO(data)
-    return discord.File(buffer, filename=chosen.name)
+    return discord.File(chosen.open(), filename=chosen.name)
 
 
 def _uwuify(text: str) -> str:
@@ -120,6 +119,10 @@ class MemeConfig:
     toes_url: str | None = None
     yoshimaru_url: str | None = None
     daily_pun_channel_id: int = 0
+    meme_prefetch_size: int = 20
+    meme_prefetch_ttl_seconds: float = 900.0
+    image_cache_dir: Path | None = None
+    image_cache_max_bytes: int = 32 * 1024 * 1024
 
 
 class MemeCog(commands.Cog, name="Meme Commands"):
@@ -151,8 +154,36 @@ class MemeCog(commands.Cog, name="Meme Commands"):
         self.bot = bot
         self.config = config or MemeConfig()
         self.pun_repo = pun_repo or PunRepository()
+        self.meme_pool: MemePool | None = None
+        self.image_cache: ImageCache | None = None
+
+    def _get_meme_pool(self) -> MemePool | None:
+        if self.meme_pool is None and self.bot.outbound_http is not None:
+            self.meme_pool = MemePool(
+                MemeApiClient(self.bot.outbound_http),
+                batch_size=self.config.meme_prefetch_size,
+                low_water=max(1, self.config.meme_prefetch_size // 4),
+                ttl_seconds=self.config.meme_prefetch_ttl_seconds,
+            )
+        return self.meme_pool
+
+    def _get_image_cache(self) -> ImageCache | None:
+        if self.image_cache is None and self.bot.outbound_http is not None:
+            self.image_cache = ImageCache(
+                self.bot.outbound_http,
+                directory=self.config.image_cache_dir,
+                max_bytes=self.config.image_cache_max_bytes,
+            )
+        return self.image_cache
 
     async def cog_load(self) -> None:
+        for gif in _gordon_gifs():
+            gif.load()
+
+        pool = self._get_meme_pool()
+        if pool is not None:
+            pool.prefetch()
+
         if not self.config.daily_pun_channel_id:
             log.info("Daily pun scheduler disabled; no destination channel configured")
             return
@@ -167,6 +198,8 @@ class MemeCog(commands.Cog, name="Meme Commands"):
 
     async def cog_unload(self) -> None:
         self.daily_pun_scheduler.cancel()
+        if self.meme_pool is not None:
+            self.meme_pool.close()
 
     @tasks.loop(time=DAILY_PUN_POST_TIME)
     async def daily_pun_scheduler(self) -> None:
@@ -198,7 +231,7 @@ class MemeCog(commands.Cog, name="Meme Commands"):
         try:
             await send(DAILY_PUN_INTRO, allowed_mentions=_safe_allowed_mentions())
             await send(DAILY_PUN_EMOTE, allowed_mentions=_safe_allowed_mentions())
-            await send(self.pun_repo.get_random_pun(), allowed_mentions=_safe_allowed_mentions())
+            await send(self.pun_repo.get_next_pun(), allowed_mentions=_safe_allowed_mentions())
         except discord.HTTPException:
             log.exception("Could not post daily pun: channel=%s", channel_id)
 
@@ -348,70 +381,44 @@ class MemeCog(commands.Cog, name="Meme Commands"):
     )
     @commands.bot_has_permissions(send_messages=True, embed_links=True)
     async def meme(self, ctx: commands.Context, subreddit: str | None = None) -> None:
-        if not self.bot.http_session:
+        pool = self._get_meme_pool()
+        if pool is None:
             await ctx.reply("HTTP client is not initialized.")
             return
 
-        client = MemeApiClient(self.bot.http_session)
-
         channel_is_nsfw = bool(getattr(ctx.channel, "is_nsfw", lambda: False)())
 
-        attempts = 3 if not channel_is_nsfw else 1
-        last_error: Exception | None = None
-
-        for _ in range(attempts):
-            try:
-                meme = await client.get_meme(subreddit=subreddit.strip() if subreddit else None)
-            except MemeApiError as e:
-                last_error = e
-                break
-
-            if meme.nsfw and not channel_is_nsfw:
-                last_error = MemeApiError("Got NSFW meme in non-NSFW channel; retrying.")
-                continue
-
-            embed = discord.Embed(
-                title=meme.title,
-                description=f"/r/{meme.subreddit}",
-                url=meme.post_link,
-            )
-            embed.set_image(url=meme.url)
-            if meme.author:
-                embed.set_footer(text=f"u/{meme.author} • 👍 {meme.ups}")
-
-            await ctx.reply(embed=embed)
+        try:
+            meme = await pool.get(subreddit, allow_nsfw=channel_is_nsfw)
+        except MemeApiError as e:
+            log.warning("Meme command failed: subreddit=%s error=%s", subreddit, e)
+            await ctx.reply(f"Couldn’t fetch a meme: {e}")
             return
 
-        log.warning("Meme command failed: subreddit=%s error=%s", subreddit, last_error)
-        if last_error:
-            await ctx.reply(f"Couldn’t fetch a meme: {last_error}")
-        else:
-            await ctx.reply("Couldn’t fetch a meme right now.")
+        embed = discord.Embed(
+            title=meme.title,
+            description=f"/r/{meme.subreddit}",
+            url=meme.post_link,
+        )
+        embed.set_image(url=meme.url)
+        if meme.author:
+            embed.set_footer(text=f"u/{meme.author} • 👍 {meme.ups}")
+
+        await ctx.reply(embed=embed)
 
     @commands.hybrid_command(name="uwu", description="Uwuify some text")
     async def uwu(self, ctx: commands.Context, *, text: str) -> None:
         await ctx.reply(_uwuify(text), allowed_mentions=_safe_allowed_mentions())
 
     async def _send_image_from_url(self, ctx: commands.Context, url: str) -> None:
-        if not self.bot.http_session:
+        image_cache = self._get_image_cache()
+        if image_cache is None:
             await ctx.reply("HTTP client is not initialized.")
             return
 
         try:
-            async with self.bot.http_session.get(url) as resp:
-                resp.raise_for_status()
-                content_type = (resp.headers.get("Content-Type") or "").lower()
-                data = await resp.read()
-
-            ext = "png"
-            if "jpeg" in content_type or "jpg" in content_type:
-                ext = "jpg"
-            elif "gif" in content_type:
-                ext = "gif"
-            elif "webp" in content_type:
-                ext = "webp"
-
-            file = discord.File(fp=io.BytesIO(data), filename=f"image.{ext}")
+            image = await image_cache.get(url)
+            file = discord.File(fp=io.BytesIO(image.data), filename=f"image.{image.extension}")
             await ctx.reply(file=file)
 
         except aiohttp.ClientResponseError as e:
@@ -430,5 +437,10 @@ async def setup(bot: BeanBot) -> None:
         toes_url=bot.settings.toes_url,
         yoshimaru_url=bot.settings.yoshimaru_url,
         daily_pun_channel_id=bot.settings.general_channel_id,
+        meme_prefetch_size=bot.settings.meme_prefetch_size,
+        meme_prefetch_ttl_seconds=bot.settings.meme_prefetch_ttl_seconds,
+        image_cache_dir=bot.settings.state_dir / "images",
+        image_cache_max_bytes=bot.settings.image_cache_max_bytes,
     )
-    await bot.add_cog(MemeCog(bot, config=config, pun_repo=PunRepository()))
+    pun_repo = PunRepository(cache_path=bot.settings.state_dir / "puns.bin")
+    await bot.add_cog(MemeCog(bot, config=config, pun_repo=pun_repo))
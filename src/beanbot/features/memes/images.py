@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Final
+
+import aiohttp
+
+from beanbot.core.http import OutboundHttp
+
+log = logging.getLogger(__name__)
+
+_INDEX_NAME: Final[str] = "index.json"
+_CONTENT_TYPE_EXTENSIONS: Final[tuple[tuple[str, str], ...]] = (
+    ("jpeg", "jpg"),
+    ("jpg", "jpg"),
+    ("gif", "gif"),
+    ("webp", "webp"),
+)
+
+
+def sniff_image_extension(data: bytes) -> str | None:
+    """Identify an image format from its magic bytes."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _extension_from_content_type(content_type: str) -> str:
+    lowered = content_type.lower()
+    return next((ext for token, ext in _CONTENT_TYPE_EXTENSIONS if token in lowered), "png")
+
+
+@dataclass(frozen=True, slots=True)
+class CachedImageMetadata:
+    digest: str
+    extension: str
+    size: int
+    validated_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CachedImage:
+    url: str
+    metadata: CachedImageMetadata
+    data: bytes
+
+    @property
+    def extension(self) -> str:
+        return self.metadata.extension
+
+
+class ImageCache:
+    """Bounded URL-keyed image cache with conditional revalidation.
+
+    Bodies are stored by SHA-256 digest, in memory and optionally on disk, so URLs serving the same
+    bytes share storage. Entries are evicted least recently used first once their combined size
+    exceeds ``max_bytes``. A stale entry is revalidated with ``If-None-Match``/``If-Modified-Since``
+    and is still served if the origin cannot be reached.
+    """
+
+    def __init__(
+        self,
+        http: OutboundHttp,
+        *,
+        directory: Path | None = None,
+        max_bytes: int = 32 * 1024 * 1024,
+        revalidate_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._http = http
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, CachedImageMetadata] = OrderedDict()
+        self._bodies: dict[str, bytes] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._index_loaded = directory is None
+
+    async def get(self, url: str) -> CachedImage:
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            return await self._get(url)
+
+    async def _get(self, url: str) -> CachedImage:
+        await self._load_index()
+        metadata = self._entries.get(url)
+        data = await self._body(metadata) if metadata is not None else None
+        if metadata is None or data is None:
+            return await self._fetch(url, None, None)
+
+        self._entries.move_to_end(url)
+        if self._clock() - metadata.validated_at < self.revalidate_seconds:
+            return CachedImage(url, metadata, data)
+
+        try:
+            return await self._fetch(url, metadata, data)
+        except (aiohttp.ClientError, TimeoutError):
+            log.warning("Serving stale cached image after revalidation failed: url=%s", url)
+            return CachedImage(url, metadata, data)
+
+    async def _fetch(
+        self,
+        url: str,
+        cached: CachedImageMetadata | None,
+        cached_data: bytes | None,
+    ) -> CachedImage:
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self._http.get(url, headers=headers) as resp:
+            if resp.status == 304 and cached is not None and cached_data is not None:
+                metadata = replace(cached, validated_at=self._clock())
+                await self._remember(url, metadata, cached_data)
+                return CachedImage(url, metadata, cached_data)
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type") or ""
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            data = await resp.read()
+
+        metadata = CachedImageMetadata(
+            digest=hashlib.sha256(data).hexdigest(),
+            extension=sniff_image_extension(data) or _extension_from_content_type(content_type),
+            size=len(data),
+            validated_at=self._clock(),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        await self._remember(url, metadata, data)
+        return CachedImage(url, metadata, data)
+
+    async def _body(self, metadata: CachedImageMetadata) -> bytes | None:
+        body = self._bodies.get(metadata.digest)
+        if body is not None or self.directory is None:
+            return body
+        try:
+            body = await asyncio.to_thread(self._blob_path(metadata).read_bytes)
+        except OSError:
+            return None
+        if hashlib.sha256(body).hexdigest() != metadata.digest:
+            return None
+        self._bodies[metadata.digest] = body
+        return body
+
+    async def _remember(self, url: str, metadata: CachedImageMetadata, data: bytes) -> None:
+        if metadata.size > self.max_bytes:
+            return
+        previous = self._entries.get(url)
+        self._entries[url] = metadata
+        self._entries.move_to_end(url)
+        self._bodies[metadata.digest] = data
+        if self.directory is not None:
+            try:
+                await asyncio.to_thread(self._store_blob, self._blob_path(metadata), data)
+            except OSError:
+                # The bytes were fetched, so serve them from memory even if the disk copy failed.
+                log.warning("Could not write cached image: url=%s", url, exc_info=True)
+        replaced = [previous] if previous is not None and previous.digest != metadata.digest else []
+        await self._discard([*replaced, *self._evict()])
+        await self._save_index()
+
+    def _evict(self) -> list[CachedImageMetadata]:
+        """Drop least recently used entries until the stored bodies fit in ``max_bytes``."""
+        total = sum(metadata.size for metadata in self._stored_digests().values())
+        evicted: list[CachedImageMetadata] = []
+        while total > self.max_bytes and self._entries:
+            url, metadata = self._entries.popitem(last=False)
+            if metadata.digest in self._stored_digests():
+                continue
+            total -= metadata.size
+            evicted.append(metadata)
+            log.debug("Evicted cached image: url=%s bytes=%s", url, metadata.size)
+        return evicted
+
+    async def _discard(self, candidates: list[CachedImageMetadata]) -> None:
+        """Release the bodies and blobs that no remaining entry refers to."""
+        stored = self._stored_digests()
+        unreferenced = {
+            metadata.digest: metadata for metadata in candidates if metadata.digest not in stored
+        }
+        for digest in unreferenced:
+            self._bodies.pop(digest, None)
+        if self.directory is None or not unreferenced:
+            return
+        paths = [self._blob_path(metadata) for metadata in unreferenced.values()]
+        try:
+            await asyncio.to_thread(_unlink_all, paths)
+        except OSError:
+            log.warning("Could not delete cached images in %s", self.directory, exc_info=True)
+
+    def _stored_digests(self) -> dict[str, CachedImageMetadata]:
+        return {metadata.digest: metadata for metadata in self._entries.values()}
+
+    def _blob_path(self, metadata: CachedImageMetadata) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{metadata.digest}.{metadata.extension}"
+
+    def _store_blob(self, path: Path, data: bytes) -> None:
+        # Blobs are named by digest, so an existing file already holds these bytes.
+        if not path.exists():
+            self._write_blob(path, data)
+
+    def _write_blob(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_bytes(data)
+        temporary.replace(path)
+
+    async def _load_index(self) -> None:
+        if self._index_loaded or self.directory is None:
+            return
+        self._index_loaded = True
+        try:
+            raw = await asyncio.to_thread((self.directory / _INDEX_NAME).read_text, "utf-8")
+            entries: Any = json.loads(raw)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable image cache index in %s", self.directory)
+            return
+        if not isinstance(entries, list):
+            return
+        for entry in entries:
+            try:
+                url = str(entry["url"])
+                self._entries[url] = CachedImageMetadata(
+                    **{key: value for key, value in entry.items() if key != "url"}
+                )
+            except (KeyError, TypeError):
+                continue
+
+    async def _save_index(self) -> None:
+        if self.directory is None:
+            return
+        entries = [{"url": url, **asdict(metadata)} for url, metadata in self._entries.items()]
+        path = self.directory / _INDEX_NAME
+        try:
+            await asyncio.to_thread(
+                self._write_blob, path, json.dumps(entries, indent=2).encode("utf-8")
+            )
+        except OSError:
+            log.warning("Could not write image cache index in %s", self.directory, exc_info=True)
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
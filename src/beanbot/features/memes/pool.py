@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from beanbot.features.memes.api import Meme, MemeApiClient, MemeApiError
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _SubredditBuffer:
+    sfw: deque[tuple[float, Meme]] = field(default_factory=deque)
+    nsfw: deque[tuple[float, Meme]] = field(default_factory=deque)
+    seen: set[str] = field(default_factory=set)
+    refill: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self.sfw) + len(self.nsfw)
+
+
+class MemePool:
+    """Per-subreddit buffers of prefetched memes, split by NSFW flag.
+
+    Memes are taken from the buffer without network I/O. A batch refill is scheduled in the
+    background when a buffer drops below its low-water mark. Entries older than the TTL are
+    discarded, and the least recently used subreddit buffer is evicted when too many are held.
+    """
+
+    def __init__(
+        self,
+        client: MemeApiClient,
+        *,
+        batch_size: int = 20,
+        low_water: int = 5,
+        ttl_seconds: float = 900.0,
+        max_subreddits: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.ttl_seconds = ttl_seconds
+        self.max_subreddits = max_subreddits
+        self._clock = clock
+        self._buffers: OrderedDict[str | None, _SubredditBuffer] = OrderedDict()
+        # Refills a caller is waiting on; their failures reach that caller instead of the log.
+        self._awaited_refills: set[asyncio.Task[None]] = set()
+
+    def _buffer(self, subreddit: str | None) -> _SubredditBuffer:
+        buffer = self._buffers.get(subreddit)
+        if buffer is None:
+            buffer = self._buffers[subreddit] = _SubredditBuffer()
+            while len(self._buffers) > self.max_subreddits:
+                _, evicted = self._buffers.popitem(last=False)
+                if evicted.refill is not None:
+                    evicted.refill.cancel()
+        else:
+            self._buffers.move_to_end(subreddit)
+        return buffer
+
+    def _expire(self, buffer: _SubredditBuffer) -> None:
+        oldest_allowed = self._clock() - self.ttl_seconds
+        for entries in (buffer.sfw, buffer.nsfw):
+            while entries and entries[0][0] < oldest_allowed:
+                buffer.seen.discard(entries.popleft()[1].post_link)
+
+    @staticmethod
+    def _take(buffer: _SubredditBuffer, *, allow_nsfw: bool) -> Meme | None:
+        candidates = [buffer.sfw, buffer.nsfw] if allow_nsfw else [buffer.sfw]
+        available = [entries for entries in candidates if entries]
+        if not available:
+            return None
+        entries = min(available, key=lambda item: item[0][0])
+        meme = entries.popleft()[1]
+        buffer.seen.discard(meme.post_link)
+        return meme
+
+    def prefetch(self, subreddit: str | None = None) -> None:
+        """Schedule a background refill for ``subreddit`` unless one is already running."""
+        key = _normalize(subreddit)
+        self._schedule_refill(key, self._buffer(key))
+
+    def _schedule_refill(
+        self, subreddit: str | None, buffer: _SubredditBuffer
+    ) -> asyncio.Task[None]:
+        if buffer.refill is None or buffer.refill.done():
+            buffer.refill = asyncio.create_task(self._refill(subreddit, buffer))
+            buffer.refill.add_done_callback(self._log_refill_failure)
+        return buffer.refill
+
+    def _log_refill_failure(self, task: asyncio.Task[None]) -> None:
+        if task in self._awaited_refills:
+            self._awaited_refills.discard(task)
+            return
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            log.warning("Meme prefetch failed: %s", error)
+
+    async def _refill(self, subreddit: str | None, buffer: _SubredditBuffer) -> None:
+        memes = await self._client.get_memes(subreddit, self.batch_size)
+        fetched_at = self._clock()
+        for meme in memes:
+            if meme.post_link in buffer.seen:
+                continue
+            buffer.seen.add(meme.post_link)
+            (buffer.nsfw if meme.nsfw else buffer.sfw).append((fetched_at, meme))
+        # Keep at most two batches so an unused NSFW or SFW side cannot grow without bound.
+        for entries in (buffer.sfw, buffer.nsfw):
+            while len(entries) > 2 * self.batch_size:
+                buffer.seen.discard(entries.popleft()[1].post_link)
+
+    async def get(self, subreddit: str | None = None, *, allow_nsfw: bool) -> Meme:
+        key = _normalize(subreddit)
+        buffer = self._buffer(key)
+        self._expire(buffer)
+
+        meme = self._take(buffer, allow_nsfw=allow_nsfw)
+        if meme is None:
+            refill = self._schedule_refill(key, buffer)
+            self._awaited_refills.add(refill)
+            try:
+                await asyncio.shield(refill)
+            except asyncio.CancelledError:
+                self._awaited_refills.discard(refill)
+                raise
+            meme = self._take(buffer, allow_nsfw=allow_nsfw)
+            if meme is None:
+                kind = "meme" if allow_nsfw else "SFW meme"
+                raise MemeApiError(f"No {kind} was available for this channel; try again.")
+
+        if len(buffer) < self.low_water:
+            self._schedule_refill(key, buffer)
+        return meme
+
+    def close(self) -> None:
+        for buffer in self._buffers.values():
+            if buffer.refill is not None:
+                buffer.refill.cancel()
+        self._buffers.clear()
+
+
+def _normalize(subreddit: str | None) -> str | None:
+    if subreddit is None:
+        return None
+    return subreddit.strip().lower() or None
@@ -1,63 +1,213 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import io
 import logging
 import random
+import struct
+import time
+from array import array
+from collections.abc import Callable
 from dataclasses import dataclass
 from importlib import resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
 from typing import Final
 
 log = logging.getLogger(__name__)
 
+# magic, source mtime_ns, source size, source sha256, pun count
+_CACHE_HEADER: Final[struct.Struct] = struct.Struct("<8sqQ32sI")
+_CACHE_MAGIC: Final[bytes] = b"BEANPUN1"
 
-@dataclass(frozen=True)
-class Pun:
-    bad_post: str
 
+@dataclass(frozen=True, slots=True)
+class _SourceStamp:
+    mtime_ns: int
+    size: int
 
-class PunRepository:
-    _RESOURCE_PACKAGE: Final[str] = "beanbot.resources"
-    _RESOURCE_NAME: Final[str] = "puns.csv"
 
-    def __init__(self) -> None:
-        self._puns: list[Pun] | None = None
+class PunCorpus:
+    """Every pun in one UTF-8 blob, addressed through an offset array."""
+
+    __slots__ = ("blob", "offsets", "digest")
+
+    def __init__(self, blob: bytes, offsets: array[int], digest: bytes) -> None:
+        self.blob = blob
+        self.offsets = offsets
+        self.digest = digest
+
+    @classmethod
+    def from_puns(cls, puns: list[str], digest: bytes) -> PunCorpus:
+        offsets = array("I", [0])
+        encoded = bytearray()
+        for pun in puns:
+            encoded += pun.encode("utf-8")
+            offsets.append(len(encoded))
+        return cls(bytes(encoded), offsets, digest)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index] : self.offsets[index + 1]].decode("utf-8")
+
+    def to_bytes(self, stamp: _SourceStamp) -> bytes:
+        header = _CACHE_HEADER.pack(
+            _CACHE_MAGIC, stamp.mtime_ns, stamp.size, self.digest, len(self)
+        )
+        return header + self.offsets.tobytes() + self.blob
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> tuple[PunCorpus, _SourceStamp]:
+        magic, mtime_ns, size, digest, count = _CACHE_HEADER.unpack_from(data)
+        if magic != _CACHE_MAGIC:
+            raise ValueError("Not a compiled pun corpus")
+        offsets = array("I")
+        offsets_end = _CACHE_HEADER.size + (count + 1) * offsets.itemsize
+        offsets.frombytes(data[_CACHE_HEADER.size : offsets_end])
+        blob = data[offsets_end:]
+        if len(offsets) != count + 1 or offsets[-1] != len(blob):
+            raise ValueError("Truncated compiled pun corpus")
+        return cls(blob, offsets, digest), _SourceStamp(mtime_ns, size)
 
-    def _load(self) -> list[Pun]:
-        paths = resources.files(self._RESOURCE_PACKAGE).joinpath(self._RESOURCE_NAME)
 
-        encodings = ["utf-8", "utf-8-sig", "latin-1"]
+def _parse_puns(raw: bytes) -> list[str]:
+    encodings = ["utf-8", "utf-8-sig", "latin-1"]
 
-        last_error: Exception | None = None
+    last_error: Exception | None = None
 
-        for encoding in encodings:
-            try:
-                with paths.open("r", encoding=encoding) as f:
-                    reader = csv.DictReader(f)
-                    puns: list[Pun] = []
+    for encoding in encodings:
+        try:
+            reader = csv.DictReader(io.StringIO(raw.decode(encoding)))
+            puns: list[str] = []
 
-                    for row in reader:
-                        value = (row.get("BadPost") or row.get("bad_post") or "").strip()
-                        if value:
-                            puns.append(Pun(bad_post=value))
+            for row in reader:
+                value = (row.get("BadPost") or row.get("bad_post") or "").strip()
+                if value:
+                    puns.append(value)
 
-                log.info("Loaded %d puns using encoding=%s", len(puns), encoding)
-                return puns
+            log.info("Loaded %d puns using encoding=%s", len(puns), encoding)
+            return puns
 
-            except UnicodeDecodeError as exc:
-                last_error = exc
-                log.warning("Failed decoding puns.csv with encoding=%s", encoding)
-            except Exception:
-                log.exception("Unexpected error reading puns.csv with encoding=%s", encoding)
-                return []
+        except UnicodeDecodeError as exc:
+            last_error = exc
+            log.warning("Failed decoding puns.csv with encoding=%s", encoding)
 
-        log.error("All CSV decoding attempts failed")
-        if last_error:
-            log.error("Last CSV decoding error: %s", last_error)
-        return []
+    log.error("All CSV decoding attempts failed")
+    if last_error:
+        log.error("Last CSV decoding error: %s", last_error)
+    return []
+
+
+class PunRepository:
+    """Compact, hot-reloading pun store.
+
+    The CSV is compiled once into a :class:`PunCorpus` and written to ``cache_path``; later
+    processes reuse that file while the CSV's mtime, size, or SHA-256 still match. The CSV is
+    re-checked at most every ``reload_check_seconds`` and recompiled when it changes.
+    """
+
+    _RESOURCE_PACKAGE: Final[str] = "beanbot.resources"
+    _RESOURCE_NAME: Final[str] = "puns.csv"
+
+    def __init__(
+        self,
+        *,
+        source: Traversable | None = None,
+        cache_path: Path | None = None,
+        reload_check_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._source = source or resources.files(self._RESOURCE_PACKAGE).joinpath(
+            self._RESOURCE_NAME
+        )
+        self._cache_path = cache_path
+        self._reload_check_seconds = reload_check_seconds
+        self._clock = clock
+        self._corpus: PunCorpus | None = None
+        self._stamp: _SourceStamp | None = None
+        self._checked_at = 0.0
+        self._bag: list[int] = []
+
+    def _source_stamp(self) -> _SourceStamp | None:
+        if not isinstance(self._source, Path):
+            return None
+        stat = self._source.stat()
+        return _SourceStamp(stat.st_mtime_ns, stat.st_size)
+
+    def _read_cache(self) -> tuple[PunCorpus, _SourceStamp] | None:
+        if self._cache_path is None:
+            return None
+        try:
+            return PunCorpus.from_bytes(self._cache_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error):
+            log.warning("Ignoring unreadable compiled pun cache: %s", self._cache_path)
+            return None
+
+    def _write_cache(self, corpus: PunCorpus, stamp: _SourceStamp | None) -> None:
+        if self._cache_path is None or stamp is None:
+            return
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self._cache_path.with_suffix(self._cache_path.suffix + ".tmp")
+            temporary.write_bytes(corpus.to_bytes(stamp))
+            temporary.replace(self._cache_path)
+        except OSError:
+            log.warning("Could not write compiled pun cache: %s", self._cache_path, exc_info=True)
+
+    def _load(self) -> PunCorpus:
+        stamp = self._source_stamp()
+        cached = self._read_cache()
+        if cached is not None and stamp is not None and cached[1] == stamp:
+            self._stamp = stamp
+            return cached[0]
+
+        raw = self._source.read_bytes()
+        digest = hashlib.sha256(raw).digest()
+        if cached is not None and cached[0].digest == digest:
+            corpus = cached[0]
+        else:
+            corpus = PunCorpus.from_puns(_parse_puns(raw), digest)
+        self._write_cache(corpus, stamp)
+        self._stamp = stamp
+        return corpus
+
+    def _current(self) -> PunCorpus | None:
+        now = self._clock()
+        if self._corpus is not None and now - self._checked_at < self._reload_check_seconds:
+            return self._corpus
+        self._checked_at = now
+
+        try:
+            if self._corpus is not None and self._source_stamp() == self._stamp:
+                return self._corpus
+            corpus = self._load()
+        except Exception:
+            log.exception("Unexpected error reading puns.csv")
+            return self._corpus
+
+        if self._corpus is not None and corpus.digest != self._corpus.digest:
+            log.info("Reloaded %d puns after puns.csv changed", len(corpus))
+            self._bag.clear()
+        self._corpus = corpus
+        return corpus
 
     def get_random_pun(self) -> str:
-        if self._puns is None:
-            self._puns = self._load()
-        if not self._puns:
+        corpus = self._current()
+        if not corpus:
+            return "Pun list is empty right now. :("
+        return corpus[random.randrange(len(corpus))]
+
+    def get_next_pun(self) -> str:
+        """Draw from a shuffle bag so no pun repeats until every pun has been used."""
+        corpus = self._current()
+        if not corpus:
             return "Pun list is empty right now. :("
-        return random.choice(self._puns).bad_post
+        if not self._bag:
+            self._bag = list(range(len(corpus)))
+            random.shuffle(self._bag)
+        return corpus[self._bag.pop()]
@@ -2,15 +2,41 @@ from __future__ import annotations
 
 from discord.ext import commands
 
+from beanbot.core.loop_health import LoopHealth
+from beanbot.discord.bot import BeanBot
+from beanbot.discord.sharding import format_latency
+
+
+def format_loop_health(health: LoopHealth) -> str:
+    text = (
+        f"Event loop lag: {format_latency(health.lag_seconds)} "
+        f"(max {format_latency(health.max_lag_seconds)} in the last minute)"
+    )
+    if health.stalls:
+        text += f", {health.stalls} blocking callbacks since startup"
+    return text
+
 
 class PingCog(commands.Cog, name="Ping Commands"):
-    def __init__(self, bot: commands.Bot) -> None:
+    def __init__(self, bot: BeanBot) -> None:
         self.bot = bot
 
     @commands.hybrid_command(name="ping", description="Check bot latency")
     async def ping(self, ctx: commands.Context) -> None:
-        await ctx.reply(f"Pong! {round(self.bot.latency * 1000)}ms")
+        latencies = self.bot.shard_latencies()
+        if len(latencies) <= 1:
+            latency = next(iter(latencies.values()), self.bot.latency)
+            lines = [f"Pong! {format_latency(latency)}"]
+        else:
+            current = self.bot.shard_for_guild(ctx.guild.id) if ctx.guild is not None else None
+            lines = ["Pong!"] + [
+                f"Shard {shard_id}: {format_latency(latency)}"
+                + (" (this server)" if shard_id == current else "")
+                for shard_id, latency in sorted(latencies.items())
+            ]
+        lines.append(format_loop_health(self.bot.loop_monitor.health()))
+        await ctx.reply("\n".join(lines))
 
 
-async def setup(bot: commands.Bot) -> None:
+async def setup(bot: BeanBot) -> None:
     await bot.add_cog(PingCog(bot))
@@ -1,11 +1,28 @@
 """Single registry of Discord extensions enabled by the composition root."""
 
+from collections.abc import Mapping
 from typing import Final
 
 FEATURE_EXTENSIONS: Final[tuple[str, ...]] = (
     "beanbot.features.help.cog",
     "beanbot.features.info.cog",
+    "beanbot.features.diagnostics.cog",
     "beanbot.features.memes.cog",
     "beanbot.features.ping.cog",
     "beanbot.features.role_menus.cog",
 )
+
+# Startup resources an extension's setup needs; extensions without an entry load immediately.
+FEATURE_REQUIREMENTS: Final[Mapping[str, frozenset[str]]] = {
+    "beanbot.features.memes.cog": frozenset({"http_session"}),
+    "beanbot.features.role_menus.cog": frozenset({"mongo"}),
+}
+
+# Discord client caches an extension reads beyond what event payloads carry. The lean memory
+# profile keeps only these; extensions without an entry need no client cache at all.
+FEATURE_CACHE_NEEDS: Final[Mapping[str, frozenset[str]]] = {
+    # Replies to its own commands and never looks up earlier messages.
+    "beanbot.features.memes.cog": frozenset(),
+    # Members arrive with interactions and reaction payloads; misses fall back to fetch_member.
+    "beanbot.features.role_menus.cog": frozenset(),
+}
@@ -1,25 +1,43 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections import defaultdict
 from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal
 
 import discord
 from discord.ext import commands
 from pymongo.errors import PyMongoError
 
+from beanbot.core.logging import bind_log_context, log_context
 from beanbot.discord.bot import BeanBot
 from beanbot.features.role_menus.models import RoleMenu, StoredRole
 from beanbot.features.role_menus.repository import RoleMenuRepository
+from beanbot.features.role_menus.scheduler import RoleMutationScheduler
 from beanbot.features.role_menus.service import LegacyReactionRoleService
 from beanbot.features.role_menus.views import (
     RoleMenuBuilderView,
     SelfRoleMenuView,
     message_has_current_role_select,
 )
+from beanbot.features.role_menus.watcher import RoleMenuWatcher
 
 log = logging.getLogger(__name__)
 
 
+def _bind_reaction_context(payload: discord.RawReactionActionEvent) -> None:
+    # Each gateway event runs in its own task, so the binding ends with the event.
+    bind_log_context(
+        guild_id=payload.guild_id,
+        channel_id=payload.channel_id,
+        message_id=payload.message_id,
+        user_id=payload.user_id,
+    )
+
+
 def _safe_allowed_mentions() -> discord.AllowedMentions:
     return discord.AllowedMentions(
         everyone=False,
@@ -29,29 +47,94 @@ def _safe_allowed_mentions() -> discord.AllowedMentions:
     )
 
 
+ReconcileOutcome = Literal["restored", "repaired", "failed"]
+
+
+@dataclass(frozen=True)
+class RoleMenuConfig:
+    touch_flush_seconds: float = 30.0
+    restore_concurrency: int = 4
+    menu_cache_size: int = 1024
+    watch_changes: bool = False
+    poll_seconds: float = 60.0
+    role_update_window_seconds: float = 0.25
+    role_update_queue_limit: int = 1000
+    role_update_concurrency: int = 4
+
+
+@dataclass(slots=True)
+class RestoreSummary:
+    restored: int = 0
+    repaired: int = 0
+    failed: int = 0
+    skipped: int = 0
+    channels: int = 0
+    shards: int = 0
+    seconds: float = 0.0
+
+
 class RoleMenusCog(commands.Cog, name="Administrative Commands"):
-    def __init__(self, bot: BeanBot) -> None:
+    def __init__(self, bot: BeanBot, config: RoleMenuConfig | None = None) -> None:
         self.bot = bot
+        self.config = config or RoleMenuConfig()
         self.repository = (
             RoleMenuRepository(
                 bot.mongo_client,
                 bot.settings.mongo_database_name,
                 bot.settings.mongo_role_menu_collection,
+                touch_flush_seconds=self.config.touch_flush_seconds,
+                menu_cache_size=self.config.menu_cache_size,
             )
             if bot.mongo_client is not None
             else None
         )
+        self.role_scheduler = RoleMutationScheduler(
+            max_pending_per_guild=self.config.role_update_queue_limit,
+            max_active_guilds=self.config.role_update_concurrency,
+            settle_seconds=self.config.role_update_window_seconds,
+            member_cache_is_current=bot.intents.members,
+        )
         self.legacy_reaction_service = (
-            LegacyReactionRoleService(bot, self.repository) if self.repository is not None else None
+            LegacyReactionRoleService(bot, self.repository, self.role_scheduler)
+            if self.repository is not None
+            else None
+        )
+        self.restore_task: asyncio.Task[RestoreSummary] | None = None
+        self.views: dict[int, SelfRoleMenuView] = {}
+        self.watcher: RoleMenuWatcher | None = None
+        registry = bot.metrics.registry
+        self._queued_mutations = registry.gauge(
+            "beanbot_role_mutations_queued",
+            "Member role updates waiting in the per-guild queues.",
+        )
+        self._mutation_outcomes = registry.gauge(
+            "beanbot_role_mutations_total",
+            "Member role updates by outcome since the role-menu cog loaded.",
+            ("outcome",),
+            kind="counter",
+        )
+        self._mutation_max_latency = registry.gauge(
+            "beanbot_role_mutation_max_latency_seconds",
+            "Longest time from submitting a role update to Discord applying it.",
         )
 
     async def cog_load(self) -> None:
+        self.bot.metrics.registry.add_collector(self._collect_metrics)
         if self.repository is None:
             log.warning("MongoDB is not configured; self-role menus are disabled")
             return
+        if self.config.watch_changes:
+            self.watcher = RoleMenuWatcher(
+                self.repository.collection,
+                self._apply_remote_save,
+                self._apply_remote_delete,
+                poll_seconds=self.config.poll_seconds,
+            )
+            # Snapshot before loading, so changes made while the menus load are replayed.
+            await self.watcher.prime()
         await self.repository.initialize()
         menus = await self.repository.get_select_menus()
-        restored = 0
+        registered: list[tuple[RoleMenu, SelfRoleMenuView]] = []
         for menu in menus:
             if not menu.roles:
                 log.error(
@@ -61,15 +144,161 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
                     menu.message_id,
                 )
                 continue
-            if await self._reconcile_select_menu(menu):
-                restored += 1
-        log.info("Restored %s/%s persistent self-role menus", restored, len(menus))
+            view = self._register_view(menu)
+            registered.append((menu, view))
+        log.info("Registered %s/%s persistent self-role menus", len(registered), len(menus))
+        self.restore_task = asyncio.create_task(self._restore_select_menus(registered))
+        if self.watcher is not None:
+            self.watcher.start()
 
-    async def _reconcile_select_menu(self, menu: RoleMenu) -> bool:
+    def _register_view(self, menu: RoleMenu) -> SelfRoleMenuView:
+        if self.repository is None:
+            raise RuntimeError("Self-role views require a repository")
+        previous = self.views.pop(menu.message_id, None)
+        if previous is not None:
+            previous.stop()
+        view = SelfRoleMenuView(
+            self.repository, menu, self.role_scheduler, self.bot.metrics.components
+        )
+        self.bot.add_view(view, message_id=menu.message_id)
+        self.views[menu.message_id] = view
+        return view
+
+    def _collect_metrics(self) -> None:
+        stats = self.role_scheduler.stats()
+        self._queued_mutations.set(stats.queued)
+        for outcome in ("enqueued", "merged", "dropped", "applied", "unchanged", "failed"):
+            self._mutation_outcomes.set(getattr(stats, outcome), outcome)
+        self._mutation_max_latency.set(stats.max_latency_seconds)
+
+    def _apply_remote_save(self, menu: RoleMenu) -> None:
         repository = self.repository
-        if repository is None:
-            return False
+        if repository is None or repository.is_writing(menu.message_id):
+            # This process's own write; save() updates local state when it completes.
+            return
+        current = self.views.get(menu.message_id)
+        wants_view = menu.menu_type == "select" and bool(menu.roles)
+        view_is_current = current.menu == menu if current is not None else not wants_view
+        if view_is_current and repository.holds(menu):
+            return
+        repository.apply_external_save(menu)
+        if not view_is_current:
+            if wants_view:
+                self._register_view(menu)
+            else:
+                self.views.pop(menu.message_id).stop()
+        log.info("Applied role-menu change from another process: message=%s", menu.message_id)
+
+    def _apply_remote_delete(self, message_id: int) -> None:
+        repository = self.repository
+        if repository is not None and repository.is_writing(message_id):
+            return
+        held = repository is not None and repository.apply_external_delete(message_id)
+        if (previous := self.views.pop(message_id, None)) is not None:
+            previous.stop()
+        elif not held:
+            return
+        log.info("Applied role-menu deletion from another process: message=%s", message_id)
+
+    async def cog_unload(self) -> None:
+        self.bot.metrics.registry.remove_collector(self._collect_metrics)
+        if self.watcher is not None:
+            await self.watcher.close()
+        if self.restore_task is not None:
+            self.restore_task.cancel()
+        await self.role_scheduler.close()
+        if self.repository is not None:
+            await self.repository.close()
 
+    async def _restore_select_menus(
+        self,
+        registered: Sequence[tuple[RoleMenu, SelfRoleMenuView]],
+    ) -> RestoreSummary:
+        """Reconcile stored menus per shard, concurrently across channels and serially within one.
+
+        Each shard's menus are reconciled as soon as that shard is ready, so a slow shard does not
+        hold back the others and the work stays off the startup critical path. Menus in guilds
+        served by another process's shards are left to that process. Discord rate-limits message
+        fetches and edits per channel, so each channel is one unit of work and the semaphore
+        bounds how many channel buckets are in use at once.
+        """
+        started = time.perf_counter()
+        by_shard: defaultdict[int, list[tuple[RoleMenu, SelfRoleMenuView]]] | None = None
+        summary = RestoreSummary()
+        semaphore = asyncio.Semaphore(max(1, self.config.restore_concurrency))
+        async with asyncio.TaskGroup() as shards:
+            async for shard_id in self.bot.ready_shards():
+                if by_shard is None:
+                    # With automatic sharding the shard count is only known once shards launch.
+                    by_shard = defaultdict(list)
+                    for menu, view in registered:
+                        by_shard[self.bot.shard_for_guild(menu.guild_id)].append((menu, view))
+                entries = by_shard.pop(shard_id, [])
+                if entries:
+                    shards.create_task(self._restore_shard(entries, semaphore, summary))
+        if by_shard is None:
+            summary.skipped = len(registered)
+        else:
+            summary.skipped = sum(len(entries) for entries in by_shard.values())
+        summary.seconds = time.perf_counter() - started
+        log.info(
+            "Self-role menu restoration finished: restored=%s repaired=%s failed=%s skipped=%s "
+            "channels=%s shards=%s elapsed=%.2fs",
+            summary.restored,
+            summary.repaired,
+            summary.failed,
+            summary.skipped,
+            summary.channels,
+            summary.shards,
+            summary.seconds,
+        )
+        return summary
+
+    async def _restore_shard(
+        self,
+        entries: Sequence[tuple[RoleMenu, SelfRoleMenuView]],
+        semaphore: asyncio.Semaphore,
+        summary: RestoreSummary,
+    ) -> None:
+        by_channel: defaultdict[int, list[tuple[RoleMenu, SelfRoleMenuView]]] = defaultdict(list)
+        for menu, view in entries:
+            by_channel[menu.channel_id].append((menu, view))
+        summary.channels += len(by_channel)
+        summary.shards += 1
+
+        async def restore_channel(entries: list[tuple[RoleMenu, SelfRoleMenuView]]) -> None:
+            async with semaphore:
+                for menu, view in entries:
+                    try:
+                        with log_context(
+                            guild_id=menu.guild_id,
+                            channel_id=menu.channel_id,
+                            message_id=menu.message_id,
+                        ):
+                            outcome = await self._reconcile_select_menu(menu, view)
+                    except Exception:
+                        log.exception(
+                            "Unexpected error restoring self-role menu: guild=%s channel=%s "
+                            "message=%s",
+                            menu.guild_id,
+                            menu.channel_id,
+                            menu.message_id,
+                        )
+                        outcome = "failed"
+                    if outcome == "repaired":
+                        summary.repaired += 1
+                    elif outcome == "failed":
+                        summary.failed += 1
+                    else:
+                        summary.restored += 1
+
+        await asyncio.gather(*(restore_channel(entries) for entries in by_channel.values()))
+
+    async def _reconcile_select_menu(
+        self,
+        menu: RoleMenu,
+        view: SelfRoleMenuView,
+    ) -> ReconcileOutcome:
         channel = self.bot.get_channel(menu.channel_id)
         if channel is None:
             try:
@@ -81,7 +310,7 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
                     menu.channel_id,
                     menu.message_id,
                 )
-                return False
+                return "failed"
 
         fetch_message = getattr(channel, "fetch_message", None)
         if fetch_message is None:
@@ -91,7 +320,7 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
                 menu.channel_id,
                 menu.message_id,
             )
-            return False
+            return "failed"
 
         try:
             message = await fetch_message(menu.message_id)
@@ -102,38 +331,39 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
                 menu.channel_id,
                 menu.message_id,
             )
-            return False
+            return "failed"
 
-        view = SelfRoleMenuView(repository, menu)
-        if not message_has_current_role_select(message, menu):
-            try:
-                await message.edit(view=view)
-            except (discord.Forbidden, discord.NotFound, discord.HTTPException):
-                log.exception(
-                    "Cannot repair stored self-role menu: guild=%s channel=%s message=%s",
-                    menu.guild_id,
-                    menu.channel_id,
-                    menu.message_id,
-                )
-                return False
-            log.info(
-                "Repaired stored self-role menu component: guild=%s channel=%s message=%s",
+        if message_has_current_role_select(message, menu):
+            return "restored"
+
+        try:
+            await message.edit(view=view)
+        except (discord.Forbidden, discord.NotFound, discord.HTTPException):
+            log.exception(
+                "Cannot repair stored self-role menu: guild=%s channel=%s message=%s",
                 menu.guild_id,
                 menu.channel_id,
                 menu.message_id,
             )
-
-        self.bot.add_view(view, message_id=menu.message_id)
-        return True
+            return "failed"
+        log.info(
+            "Repaired stored self-role menu component: guild=%s channel=%s message=%s",
+            menu.guild_id,
+            menu.channel_id,
+            menu.message_id,
+        )
+        return "repaired"
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:
         if self.legacy_reaction_service is not None:
+            _bind_reaction_context(payload)
             await self.legacy_reaction_service.handle(payload, add=True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent) -> None:
         if self.legacy_reaction_service is not None:
+            _bind_reaction_context(payload)
             await self.legacy_reaction_service.handle(payload, add=False)
 
     @commands.hybrid_command(
@@ -269,10 +499,17 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
         menu: RoleMenu,
         guild_id: int,
     ) -> bool:
+        view = SelfRoleMenuView(repository, menu, self.role_scheduler, self.bot.metrics.components)
+        # Register first: the change watcher may report this insert while the awaits below run,
+        # and it only registers views for menus that do not already have a current one.
+        self.views[menu.message_id] = view
         try:
             await repository.save(menu)
-            await role_message.edit(view=SelfRoleMenuView(repository, menu))
+            await role_message.edit(view=view)
         except (discord.HTTPException, PyMongoError):
+            if self.views.get(menu.message_id) is view:
+                del self.views[menu.message_id]
+            view.stop()
             log.exception(
                 "Could not create self-role menu: guild=%s message=%s",
                 guild_id,
@@ -311,4 +548,14 @@ class RoleMenusCog(commands.Cog, name="Administrative Commands"):
 
 
 async def setup(bot: BeanBot) -> None:
-    await bot.add_cog(RoleMenusCog(bot))
+    config = RoleMenuConfig(
+        touch_flush_seconds=bot.settings.role_menu_touch_flush_seconds,
+        restore_concurrency=bot.settings.role_menu_restore_concurrency,
+        menu_cache_size=bot.settings.role_menu_cache_size,
+        watch_changes=bot.settings.role_menu_watch_changes,
+        poll_seconds=bot.settings.role_menu_poll_seconds,
+        role_update_window_seconds=bot.settings.role_menu_update_window_seconds,
+        role_update_queue_limit=bot.settings.role_menu_update_queue_limit,
+        role_update_concurrency=bot.settings.role_menu_update_concurrency,
+    )
+    await bot.add_cog(RoleMenusCog(bot, config=config))
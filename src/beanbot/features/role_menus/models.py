@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any, Literal, Protocol, cast
@@ -33,6 +33,36 @@ class RoleMenu:
     menu_type: MenuType = "select"
 
 
+@dataclass(frozen=True, slots=True)
+class CachedRoleMenu:
+    """A parsed menu with the lookups that reaction and select events need precomputed."""
+
+    menu: RoleMenu
+    emoji_roles: Mapping[str, tuple[int, int]]
+    role_ids: frozenset[int]
+
+    @classmethod
+    def from_menu(cls, menu: RoleMenu) -> CachedRoleMenu:
+        emoji_roles: dict[str, tuple[int, int]] = {}
+        for index, role in enumerate(menu.roles):
+            if role.emoji_key is not None:
+                # The first role listed for a repeated key wins, as it always has.
+                emoji_roles.setdefault(role.emoji_key, (index, role.role_id))
+        return cls(
+            menu=menu,
+            emoji_roles=emoji_roles,
+            role_ids=frozenset(role.role_id for role in menu.roles),
+        )
+
+    def role_for_emoji(self, emoji_keys: Iterable[str]) -> int | None:
+        """Return the earliest listed role matching any of the reaction's emoji keys."""
+        match = min(
+            (self.emoji_roles[key] for key in emoji_keys if key in self.emoji_roles),
+            default=None,
+        )
+        return None if match is None else match[1]
+
+
 def menu_to_document(menu: RoleMenu) -> dict[str, Any]:
     now = datetime.now(UTC)
     return {
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+from collections import OrderedDict
 from datetime import UTC, datetime
 from typing import Any, Final
 
-from pymongo import ASCENDING, AsyncMongoClient
+from pymongo import ASCENDING, AsyncMongoClient, UpdateOne
 from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.errors import PyMongoError
 
-from beanbot.features.role_menus.models import RoleMenu, menu_from_document, menu_to_document
+from beanbot.features.role_menus.models import (
+    CachedRoleMenu,
+    RoleMenu,
+    menu_from_document,
+    menu_to_document,
+)
 
 log = logging.getLogger(__name__)
 
@@ -65,54 +73,167 @@ class RoleMenuRepository:
         client: AsyncMongoClient[dict[str, Any]],
         database_name: str,
         collection_name: str,
+        *,
+        touch_flush_seconds: float = 30.0,
+        menu_cache_size: int = 1024,
     ) -> None:
         self.collection = client[database_name][collection_name]
+        self.touch_flush_seconds = touch_flush_seconds
+        self.menu_cache_size = menu_cache_size
+        self._menu_cache: OrderedDict[int, CachedRoleMenu] = OrderedDict()
+        self._reaction_message_ids: set[int] | None = None
+        self._pending_touches: dict[int, datetime] = {}
+        self._touch_flush_task: asyncio.Task[None] | None = None
+        self._flush_now = asyncio.Event()
+        self._writing: set[int] = set()
 
     async def initialize(self) -> None:
         await ensure_role_menu_indexes(self.collection)
+        await self.load_reaction_index()
+
+    async def load_reaction_index(self) -> None:
+        """Warm the reaction-message index so ordinary messages never reach MongoDB."""
+        cursor = self.collection.find({"menu_type": "reaction"})
+        documents = await cursor.to_list(None)
+        message_ids: set[int] = set()
+        for document in documents:
+            menu = menu_from_document(document)
+            message_ids.add(menu.message_id)
+            self._cache_menu(menu)
+        self._reaction_message_ids = message_ids
+        log.info("Indexed %s migrated reaction-role messages", len(message_ids))
+
+    def _cache_menu(self, menu: RoleMenu) -> CachedRoleMenu:
+        cached = CachedRoleMenu.from_menu(menu)
+        if self.menu_cache_size > 0:
+            self._menu_cache[menu.message_id] = cached
+            self._menu_cache.move_to_end(menu.message_id)
+            while len(self._menu_cache) > self.menu_cache_size:
+                self._menu_cache.popitem(last=False)
+        return cached
+
+    async def get_menu(self, message_id: int) -> CachedRoleMenu | None:
+        """Return a parsed menu from the LRU cache, reading through to MongoDB on a miss."""
+        cached = self._menu_cache.get(message_id)
+        if cached is not None:
+            self._menu_cache.move_to_end(message_id)
+            return cached
+        document = await self.collection.find_one({"message_id": message_id})
+        if document is None:
+            return None
+        return self._cache_menu(menu_from_document(document))
 
     async def save(self, menu: RoleMenu) -> None:
-        await self.collection.replace_one(
-            {"message_id": menu.message_id},
-            menu_to_document(menu),
-            upsert=True,
-        )
+        self._writing.add(menu.message_id)
+        try:
+            await self.collection.replace_one(
+                {"message_id": menu.message_id},
+                menu_to_document(menu),
+                upsert=True,
+            )
+            self.apply_external_save(menu)
+        finally:
+            self._writing.discard(menu.message_id)
+
+    def is_writing(self, message_id: int) -> bool:
+        """Whether this process has a save or delete of the menu in flight."""
+        return message_id in self._writing
+
+    def holds(self, menu: RoleMenu) -> bool:
+        """Whether the cache already has exactly this menu."""
+        cached = self._menu_cache.get(menu.message_id)
+        return cached is not None and cached.menu == menu
+
+    def apply_external_save(self, menu: RoleMenu) -> None:
+        """Update in-memory state for a menu another process saved."""
+        self._cache_menu(menu)
+        if self._reaction_message_ids is not None:
+            if menu.menu_type == "reaction":
+                self._reaction_message_ids.add(menu.message_id)
+            else:
+                self._reaction_message_ids.discard(menu.message_id)
+
+    def apply_external_delete(self, message_id: int) -> bool:
+        """Drop in-memory state for a menu another process deleted; return whether any was held."""
+        held = self._menu_cache.pop(message_id, None) is not None
+        if self._reaction_message_ids is not None and message_id in self._reaction_message_ids:
+            self._reaction_message_ids.discard(message_id)
+            held = True
+        return held
 
     async def get_select_menus(self) -> tuple[RoleMenu, ...]:
         cursor = self.collection.find({"menu_type": "select"}).sort("message_id", ASCENDING)
         documents = await cursor.to_list(None)
-        return tuple(menu_from_document(document) for document in documents)
+        menus = tuple(menu_from_document(document) for document in documents)
+        for menu in menus:
+            self._cache_menu(menu)
+        return menus
 
     async def get_reaction_role_id(
         self,
         message_id: int,
         emoji_keys: frozenset[str],
     ) -> int | None:
-        document = await self.collection.find_one(
-            {"message_id": message_id, "menu_type": "reaction"}
-        )
-        if document is None:
+        if self._reaction_message_ids is not None and message_id not in self._reaction_message_ids:
             return None
-        menu = menu_from_document(document)
-        match = next((role for role in menu.roles if role.emoji_key in emoji_keys), None)
-        if match is None:
+        cached = await self.get_menu(message_id)
+        if cached is None or cached.menu.menu_type != "reaction":
             return None
-        await self.touch(message_id)
-        return match.role_id
+        role_id = cached.role_for_emoji(emoji_keys)
+        if role_id is not None:
+            await self.touch(message_id)
+        return role_id
 
     async def touch(self, message_id: int) -> None:
-        """Update operational metadata without interrupting role assignment."""
+        """Buffer operational metadata so role assignment never waits on the write."""
+        self._pending_touches[message_id] = datetime.now(UTC)
+        if self.touch_flush_seconds <= 0:
+            await self.flush_touches()
+        elif self._touch_flush_task is None:
+            self._touch_flush_task = asyncio.create_task(self._flush_touches_later())
+
+    async def _flush_touches_later(self) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._flush_now.wait(), self.touch_flush_seconds)
         try:
-            await self.collection.update_one(
-                {"message_id": message_id},
-                {"$set": {"last_accessed": datetime.now(UTC)}},
+            await self.flush_touches()
+        finally:
+            # The task stays registered until its write finishes so close() can wait for it.
+            self._touch_flush_task = None
+            if self._pending_touches and not self._flush_now.is_set():
+                self._touch_flush_task = asyncio.create_task(self._flush_touches_later())
+
+    async def flush_touches(self) -> None:
+        """Write every buffered access time in one unordered bulk write."""
+        pending, self._pending_touches = self._pending_touches, {}
+        if not pending:
+            return
+        try:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne({"message_id": message_id}, {"$set": {"last_accessed": accessed}})
+                    for message_id, accessed in pending.items()
+                ],
+                ordered=False,
             )
         except PyMongoError:
             log.warning(
-                "Could not update role-menu access metadata: message=%s",
-                message_id,
+                "Could not update role-menu access metadata: messages=%s",
+                len(pending),
                 exc_info=True,
             )
 
+    async def close(self) -> None:
+        """Run the scheduled flush now, wait for it, and write anything still buffered."""
+        self._flush_now.set()
+        if self._touch_flush_task is not None:
+            await self._touch_flush_task
+        await self.flush_touches()
+
     async def delete(self, message_id: int) -> None:
-        await self.collection.delete_one({"message_id": message_id})
+        self._writing.add(message_id)
+        try:
+            await self.collection.delete_one({"message_id": message_id})
+            self.apply_external_delete(message_id)
+        finally:
+            self._writing.discard(message_id)
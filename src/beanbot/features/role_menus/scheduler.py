@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import discord
+
+from beanbot.features.role_menus.service import (
+    RoleAction,
+    RoleToggleResult,
+    current_member,
+    edit_may_need_fresh_member,
+    edit_member_roles,
+    net_role_changes,
+)
+
+log = logging.getLogger(__name__)
+
+RoleMutationCallback = Callable[[asyncio.Future[RoleToggleResult]], Coroutine[Any, Any, None]]
+
+
+@dataclass(slots=True)
+class _PendingMutation:
+    member: discord.Member
+    enqueued_at: float
+    actions: list[tuple[discord.Role, RoleAction]] = field(default_factory=list)
+    reasons: dict[str, None] = field(default_factory=dict)
+    waiters: list[tuple[asyncio.Future[RoleToggleResult], RoleMutationCallback | None]] = field(
+        default_factory=list
+    )
+
+
+@dataclass(slots=True)
+class _GuildBucket:
+    pending: dict[int, _PendingMutation] = field(default_factory=dict)
+    worker: asyncio.Task[None] | None = None
+    dropping: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class RoleMutationStats:
+    queued: int
+    max_queued: int
+    enqueued: int
+    merged: int
+    dropped: int
+    applied: int
+    unchanged: int
+    failed: int
+    average_latency_seconds: float
+    max_latency_seconds: float
+
+
+class RoleMutationScheduler:
+    """Queue member role changes per guild and apply them off the event handlers.
+
+    Each guild has a bounded queue of members with pending changes and at most one worker, and
+    ``max_active_guilds`` limits how many guild workers edit at once, so a burst of reactions
+    in one guild cannot monopolize the REST rate limiter. Changes for a member already in the
+    queue are merged into that member's entry; add-then-remove flapping folds to no request at
+    all. When a guild's queue is full, new members are dropped and counted instead of letting
+    handlers pile up. Each member's entry is held for ``settle_seconds`` after its first change
+    arrives so a burst from that member can merge; closing the scheduler cuts the wait short.
+    The edit starts from the member delivered with the latest queued event, or from the member
+    cache when ``member_cache_is_current`` says the bot receives member updates. If Discord
+    rejects the edit, the member is fetched once and the edit is rebuilt from those roles.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pending_per_guild: int = 1000,
+        max_active_guilds: int = 4,
+        settle_seconds: float = 0.25,
+        member_cache_is_current: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_pending_per_guild = max_pending_per_guild
+        self.settle_seconds = settle_seconds
+        self.member_cache_is_current = member_cache_is_current
+        self._clock = clock
+        self._slots = asyncio.Semaphore(max(1, max_active_guilds))
+        self._buckets: dict[int, _GuildBucket] = {}
+        self._callbacks: set[asyncio.Task[None]] = set()
+        self._closing = False
+        self._flush_now = asyncio.Event()
+        self._queued = 0
+        self._max_queued = 0
+        self._enqueued = 0
+        self._merged = 0
+        self._dropped = 0
+        self._applied = 0
+        self._unchanged = 0
+        self._failed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def submit(
+        self,
+        member: discord.Member,
+        roles: Iterable[discord.Role],
+        action: RoleAction,
+        *,
+        reason: str,
+        on_done: RoleMutationCallback | None = None,
+    ) -> asyncio.Future[RoleToggleResult] | None:
+        """Queue a change and return its future, or ``None`` when the guild's queue is full."""
+        guild_id = member.guild.id
+        bucket = self._buckets.setdefault(guild_id, _GuildBucket())
+        pending = bucket.pending.get(member.id)
+        if pending is None:
+            if self._closing or len(bucket.pending) >= self.max_pending_per_guild:
+                self._dropped += 1
+                if not bucket.dropping:
+                    bucket.dropping = True
+                    log.warning(
+                        "Role mutation queue is full; dropping new changes: guild=%s pending=%s",
+                        guild_id,
+                        len(bucket.pending),
+                    )
+                return None
+            pending = bucket.pending[member.id] = _PendingMutation(member, self._clock())
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        else:
+            self._merged += 1
+        self._enqueued += 1
+
+        pending.member = member
+        pending.actions.extend((role, action) for role in roles)
+        pending.reasons[reason] = None
+        future: asyncio.Future[RoleToggleResult] = asyncio.get_running_loop().create_future()
+        pending.waiters.append((future, on_done))
+        if bucket.worker is None:
+            bucket.worker = asyncio.create_task(self._drain(guild_id, bucket))
+        return future
+
+    async def _drain(self, guild_id: int, bucket: _GuildBucket) -> None:
+        try:
+            while bucket.pending:
+                # Entries keep their first-change order, so the front member is due first.
+                member_id, front = next(iter(bucket.pending.items()))
+                delay = front.enqueued_at + self.settle_seconds - self._clock()
+                if delay > 0:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._flush_now.wait(), delay)
+                async with self._slots:
+                    pending = bucket.pending.pop(member_id)
+                    self._queued -= 1
+                    await self._apply(pending)
+                if not bucket.pending:
+                    bucket.dropping = False
+        finally:
+            bucket.worker = None
+            if not bucket.pending:
+                self._buckets.pop(guild_id, None)
+
+    async def _apply(self, pending: _PendingMutation) -> None:
+        member = pending.member
+        changes = RoleToggleResult(added=(), removed=())
+        error: Exception | None = None
+        try:
+            member = current_member(member, cache_is_current=self.member_cache_is_current)
+            try:
+                changes = await self._edit(member, pending)
+            except discord.HTTPException as rejected:
+                if not edit_may_need_fresh_member(rejected):
+                    raise
+                # The roles the edit was built from may be out of date.
+                member = await member.guild.fetch_member(member.id)
+                changes = await self._edit(member, pending)
+        except Exception as caught:
+            error = caught
+            self._failed += 1
+        else:
+            if changes.added or changes.removed:
+                self._applied += 1
+            else:
+                self._unchanged += 1
+
+        latency = self._clock() - pending.enqueued_at
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        for future, on_done in pending.waiters:
+            if not future.done():
+                if error is None:
+                    future.set_result(changes)
+                else:
+                    future.set_exception(error)
+            if on_done is not None:
+                task = asyncio.create_task(on_done(future))
+                self._callbacks.add(task)
+                task.add_done_callback(self._callbacks.discard)
+            elif error is not None:
+                # Nobody else observes this future; retrieve the error so it is not reported
+                # as unhandled, and log it here instead.
+                future.exception()
+                log.error(
+                    "Role mutation failed: guild=%s member=%s",
+                    member.guild.id,
+                    member.id,
+                    exc_info=error,
+                )
+
+    async def _edit(self, member: discord.Member, pending: _PendingMutation) -> RoleToggleResult:
+        changes = net_role_changes({role.id for role in member.roles}, pending.actions)
+        await edit_member_roles(member, changes, "; ".join(pending.reasons))
+        return changes
+
+    def stats(self) -> RoleMutationStats:
+        completed = self._applied + self._unchanged + self._failed
+        return RoleMutationStats(
+            queued=self._queued,
+            max_queued=self._max_queued,
+            enqueued=self._enqueued,
+            merged=self._merged,
+            dropped=self._dropped,
+            applied=self._applied,
+            unchanged=self._unchanged,
+            failed=self._failed,
+            average_latency_seconds=self._latency_total / completed if completed else 0.0,
+            max_latency_seconds=self._latency_max,
+        )
+
+    async def close(self) -> None:
+        """Stop accepting new members, drain every queue, and wait for completion callbacks."""
+        self._closing = True
+        self._flush_now.set()
+        workers = [bucket.worker for bucket in self._buckets.values() if bucket.worker is not None]
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        if self._callbacks:
+            await asyncio.gather(*self._callbacks, return_exceptions=True)
+        stats = self.stats()
+        log.info(
+            "Role mutation scheduler closed: enqueued=%s merged=%s dropped=%s applied=%s "
+            "unchanged=%s failed=%s max_queued=%s avg_latency=%.3fs max_latency=%.3fs",
+            stats.enqueued,
+            stats.merged,
+            stats.dropped,
+            stats.applied,
+            stats.unchanged,
+            stats.failed,
+            stats.max_queued,
+            stats.average_latency_seconds,
+            stats.max_latency_seconds,
+        )
@@ -3,6 +3,8 @@ from __future__ import annotations
 import logging
 from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Literal
 
 import discord
 from discord.ext import commands
@@ -10,6 +12,11 @@ from discord.ext import commands
 from beanbot.features.role_menus.models import reaction_emoji_keys
 from beanbot.features.role_menus.repository import RoleMenuRepository
 
+if TYPE_CHECKING:
+    import asyncio
+
+    from beanbot.features.role_menus.scheduler import RoleMutationScheduler
+
 log = logging.getLogger(__name__)
 
 
@@ -19,10 +26,75 @@ class RoleToggleResult:
     removed: tuple[discord.Role, ...]
 
 
+RoleAction = Literal["add", "remove", "toggle"]
+SELF_ROLE_REASON = "Self-role menu selection"
+
+
+def net_role_changes(
+    current_role_ids: set[int],
+    actions: Iterable[tuple[discord.Role, RoleAction]],
+) -> RoleToggleResult:
+    """Fold queued actions over the member's roles and return what actually changes."""
+    desired: dict[int, tuple[discord.Role, bool]] = {}
+    for role, action in actions:
+        present = desired[role.id][1] if role.id in desired else role.id in current_role_ids
+        desired[role.id] = (role, action == "add" or (action == "toggle" and not present))
+    return RoleToggleResult(
+        added=tuple(
+            role
+            for role, present in desired.values()
+            if present and role.id not in current_role_ids
+        ),
+        removed=tuple(
+            role
+            for role, present in desired.values()
+            if not present and role.id in current_role_ids
+        ),
+    )
+
+
+def current_member(member: discord.Member, *, cache_is_current: bool) -> discord.Member:
+    """Return the freshest copy of ``member`` available without a request.
+
+    The cached copy is only trusted when member updates are streamed to the bot; otherwise the
+    member delivered with the latest queued event is used.
+    """
+    if cache_is_current:
+        cached = member.guild.get_member(member.id)
+        if cached is not None:
+            return cached
+    return member
+
+
+def edit_may_need_fresh_member(error: discord.HTTPException) -> bool:
+    """Whether a rejected role edit may succeed when rebuilt from Discord's copy of the member."""
+    # Missing permissions will not change with fresher roles.
+    return 400 <= error.status < 500 and error.status != 403
+
+
+async def edit_member_roles(
+    member: discord.Member,
+    changes: RoleToggleResult,
+    reason: str,
+) -> None:
+    if not changes.added and not changes.removed:
+        return
+    removed_ids = {role.id for role in changes.removed}
+    roles = [role for role in member.roles if not role.is_default() and role.id not in removed_ids]
+    roles.extend(changes.added)
+    await member.edit(roles=roles, reason=reason)
+
+
 class LegacyReactionRoleService:
-    def __init__(self, bot: commands.Bot, repository: RoleMenuRepository) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        repository: RoleMenuRepository,
+        scheduler: RoleMutationScheduler | None = None,
+    ) -> None:
         self.bot = bot
         self.repository = repository
+        self.scheduler = scheduler
 
     async def handle(
         self,
@@ -62,11 +134,24 @@ class LegacyReactionRoleService:
             except (discord.Forbidden, discord.NotFound, discord.HTTPException):
                 return False
 
+        reason = "Migrated reaction role added" if add else "Migrated reaction role removed"
+        if self.scheduler is not None:
+            queued = self.scheduler.submit(
+                member,
+                (role,),
+                "add" if add else "remove",
+                reason=reason,
+                on_done=partial(
+                    _log_scheduled_failure, payload.guild_id, payload.user_id, role_id, add
+                ),
+            )
+            return queued is not None
+
         try:
             if add:
-                await member.add_roles(role, reason="Migrated reaction role added")
+                await member.add_roles(role, reason=reason)
             else:
-                await member.remove_roles(role, reason="Migrated reaction role removed")
+                await member.remove_roles(role, reason=reason)
         except (discord.Forbidden, discord.HTTPException):
             log.exception(
                 "Could not update migrated reaction role: guild=%s user=%s role=%s add=%s",
@@ -79,18 +164,32 @@ class LegacyReactionRoleService:
         return True
 
 
+async def _log_scheduled_failure(
+    guild_id: int,
+    user_id: int,
+    role_id: int,
+    add: bool,
+    result: asyncio.Future[RoleToggleResult],
+) -> None:
+    error = result.exception()
+    if error is not None:
+        log.error(
+            "Could not update migrated reaction role: guild=%s user=%s role=%s add=%s",
+            guild_id,
+            user_id,
+            role_id,
+            add,
+            exc_info=error,
+        )
+
+
 async def toggle_member_roles(
     member: discord.Member,
     roles: Iterable[discord.Role],
 ) -> RoleToggleResult:
-    selected = tuple(roles)
-    current_role_ids = {role.id for role in member.roles}
-    to_add = tuple(role for role in selected if role.id not in current_role_ids)
-    to_remove = tuple(role for role in selected if role.id in current_role_ids)
-
-    if to_add:
-        await member.add_roles(*to_add, reason="Self-role menu selection")
-    if to_remove:
-        await member.remove_roles(*to_remove, reason="Self-role menu selection")
-
-    return RoleToggleResult(added=to_add, removed=to_remove)
+    changes = net_role_changes(
+        {role.id for role in member.roles},
+        ((role, "toggle") for role in roles),
+    )
+    await edit_member_roles(member, changes, SELF_ROLE_REASON)
+    return changes
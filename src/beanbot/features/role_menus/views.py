@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import partial
 from typing import TYPE_CHECKING
 
 import discord
 
-from beanbot.features.role_menus.models import RoleMenu
+from beanbot.core.logging import log_context
+from beanbot.features.role_menus.models import CachedRoleMenu, RoleMenu
 from beanbot.features.role_menus.repository import RoleMenuRepository
-from beanbot.features.role_menus.service import toggle_member_roles
+from beanbot.features.role_menus.service import (
+    SELF_ROLE_REASON,
+    RoleToggleResult,
+    toggle_member_roles,
+)
 
 if TYPE_CHECKING:
+    from beanbot.core.metrics import Histogram
     from beanbot.features.role_menus.cog import RoleMenusCog
+    from beanbot.features.role_menus.scheduler import RoleMutationScheduler
 
 log = logging.getLogger(__name__)
 
 SELF_ROLE_CUSTOM_ID_PREFIX = "beanbot:self-role-menu:"
+ROLE_UPDATE_FAILED_MESSAGE = (
+    "I could not update those roles. Check my role hierarchy and permissions."
+)
 
 
 def self_role_custom_id(message_id: int) -> str:
@@ -72,16 +84,38 @@ class SelfRoleMenuView(discord.ui.View):
         self,
         repository: RoleMenuRepository,
         menu: RoleMenu,
+        scheduler: RoleMutationScheduler | None = None,
+        timings: Histogram | None = None,
     ) -> None:
         super().__init__(timeout=None)
         self.repository = repository
         self.menu = menu
+        # Saves and remote changes replace the view, so the registered menu is always current.
+        self.role_ids = CachedRoleMenu.from_menu(menu).role_ids
+        self.scheduler = scheduler
+        self.timings = timings
         self.add_item(SelfRoleSelect(menu))
 
     async def apply_selection(
         self,
         interaction: discord.Interaction,
         selected_role_ids: set[int],
+    ) -> None:
+        with log_context(
+            guild_id=self.menu.guild_id,
+            message_id=self.menu.message_id,
+            user_id=interaction.user.id,
+        ):
+            if self.timings is None:
+                await self._apply_selection(interaction, selected_role_ids)
+                return
+            with self.timings.time("self_role_menu"):
+                await self._apply_selection(interaction, selected_role_ids)
+
+    async def _apply_selection(
+        self,
+        interaction: discord.Interaction,
+        selected_role_ids: set[int],
     ) -> None:
         if interaction.guild is None or not isinstance(interaction.user, discord.Member):
             await interaction.response.send_message(
@@ -90,10 +124,10 @@ class SelfRoleMenuView(discord.ui.View):
             )
             return
 
-        configured_ids = {role.role_id for role in self.menu.roles}
+        # No awaits before the response: a database stall here would miss Discord's deadline.
         roles = [
             role
-            for role_id in selected_role_ids & configured_ids
+            for role_id in selected_role_ids & self.role_ids
             if (role := interaction.guild.get_role(role_id)) is not None
         ]
         if not roles:
@@ -103,28 +137,75 @@ class SelfRoleMenuView(discord.ui.View):
             )
             return
 
+        if self.scheduler is not None:
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            queued = self.scheduler.submit(
+                interaction.user,
+                roles,
+                "toggle",
+                reason=SELF_ROLE_REASON,
+                on_done=partial(self._report_scheduled_selection, interaction),
+            )
+            if queued is None:
+                await interaction.followup.send(
+                    "Role updates are busy right now. Try again in a moment.",
+                    ephemeral=True,
+                )
+            return
+
         try:
             result = await toggle_member_roles(interaction.user, roles)
         except (discord.Forbidden, discord.HTTPException):
-            log.exception(
-                "Could not toggle self roles: guild=%s user=%s menu=%s",
-                interaction.guild.id,
+            self._log_toggle_failure(interaction)
+            await interaction.response.send_message(ROLE_UPDATE_FAILED_MESSAGE, ephemeral=True)
+            return
+
+        await self.repository.touch(self.menu.message_id)
+        await interaction.response.send_message(_selection_message(result), ephemeral=True)
+
+    async def _report_scheduled_selection(
+        self,
+        interaction: discord.Interaction,
+        result: asyncio.Future[RoleToggleResult],
+    ) -> None:
+        error = result.exception()
+        if error is None:
+            await self.repository.touch(self.menu.message_id)
+            content = _selection_message(result.result())
+        else:
+            self._log_toggle_failure(interaction, error)
+            content = ROLE_UPDATE_FAILED_MESSAGE
+        try:
+            await interaction.followup.send(content, ephemeral=True)
+        except discord.HTTPException:
+            log.warning(
+                "Could not report self-role update: guild=%s user=%s menu=%s",
+                self.menu.guild_id,
                 interaction.user.id,
                 self.menu.message_id,
             )
-            await interaction.response.send_message(
-                "I could not update those roles. Check my role hierarchy and permissions.",
-                ephemeral=True,
-            )
-            return
 
-        await self.repository.touch(self.menu.message_id)
-        changes: list[str] = []
-        if result.added:
-            changes.append("Added: " + ", ".join(role.name for role in result.added))
-        if result.removed:
-            changes.append("Removed: " + ", ".join(role.name for role in result.removed))
-        await interaction.response.send_message("\n".join(changes), ephemeral=True)
+    def _log_toggle_failure(
+        self,
+        interaction: discord.Interaction,
+        error: BaseException | None = None,
+    ) -> None:
+        log.error(
+            "Could not toggle self roles: guild=%s user=%s menu=%s",
+            self.menu.guild_id,
+            interaction.user.id,
+            self.menu.message_id,
+            exc_info=error or True,
+        )
+
+
+def _selection_message(result: RoleToggleResult) -> str:
+    changes: list[str] = []
+    if result.added:
+        changes.append("Added: " + ", ".join(role.name for role in result.added))
+    if result.removed:
+        changes.append("Removed: " + ", ".join(role.name for role in result.removed))
+    return "\n".join(changes) or "Your roles already match that selection."
 
 
 class RoleMenuBuilderView(discord.ui.View):
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Mapping
+from typing import Any, Final
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from beanbot.features.role_menus.models import RoleMenu, menu_from_document
+
+log = logging.getLogger(__name__)
+
+# Server error codes meaning change streams cannot be used on this deployment at all.
+CHANGE_STREAMS_UNSUPPORTED: Final = frozenset({40573, 40324})
+# The stored resume token points at history the oplog no longer has.
+CHANGE_STREAM_HISTORY_LOST: Final = 286
+_TOUCH_ONLY_FIELDS: Final = frozenset({"last_accessed"})
+
+MenuUpsertHandler = Callable[[RoleMenu], None]
+MenuDeleteHandler = Callable[[int], None]
+
+
+class RoleMenuWatcher:
+    """Push role-menu changes made by other processes into this process's caches and views.
+
+    A change stream on the role-menu collection reports inserts, replacements, updates, and
+    deletes; access-time touches are ignored. ``prime`` snapshots the collection and records
+    the cluster time first, and the stream opens at that time, so nothing written after the
+    snapshot is missed; call it before the owner loads its own copy of the menus. The latest
+    resume token is kept so a dropped stream reopens exactly where it stopped. When the
+    deployment has no change streams (a standalone server), the watcher polls the collection
+    every ``poll_seconds`` instead and diffs it against the last snapshot. The snapshot keeps
+    only each document's message id and a hash of its menu, and handlers only run for menus
+    that actually changed.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncCollection[dict[str, Any]],
+        on_upsert: MenuUpsertHandler,
+        on_delete: MenuDeleteHandler,
+        *,
+        poll_seconds: float = 60.0,
+        retry_seconds: float = 5.0,
+    ) -> None:
+        self.collection = collection
+        self.on_upsert = on_upsert
+        self.on_delete = on_delete
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self.mode: str = "starting"
+        self._resume_token: Mapping[str, Any] | None = None
+        self._start_at: Any = None
+        self._primed = False
+        # Document id -> (message id, hash of the parsed menu).
+        self._menus: dict[Any, tuple[int, int]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def prime(self) -> None:
+        """Snapshot the collection and remember the cluster time the stream starts from."""
+        self._primed = True
+        try:
+            self._start_at = await self._cluster_time()
+            await self._resync(notify=False)
+        except PyMongoError:
+            log.warning("Could not snapshot role menus before watching", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        if not self._primed:
+            await self.prime()
+        while True:
+            try:
+                await self._watch()
+            except OperationFailure as error:
+                if error.code in CHANGE_STREAMS_UNSUPPORTED:
+                    log.info("Change streams are unavailable; polling role menus instead")
+                    await self._poll_forever()
+                    return
+                if error.code == CHANGE_STREAM_HISTORY_LOST:
+                    log.warning("Role-menu change stream history was lost; resynchronizing")
+                    self._resume_token = None
+                    try:
+                        self._start_at = await self._cluster_time()
+                        await self._resync()
+                    except PyMongoError:
+                        log.warning("Could not resynchronize role menus", exc_info=True)
+                    continue
+                log.warning("Role-menu change stream failed; retrying", exc_info=True)
+            except PyMongoError:
+                log.warning("Role-menu change stream failed; retrying", exc_info=True)
+            await asyncio.sleep(self.retry_seconds)
+
+    async def _watch(self) -> None:
+        async with await self.collection.watch(
+            full_document="updateLookup",
+            resume_after=self._resume_token,
+            start_at_operation_time=None if self._resume_token else self._start_at,
+        ) as stream:
+            self.mode = "change_stream"
+            if stream.resume_token is not None:
+                # Reopen from here even if no change arrives before the stream drops.
+                self._resume_token = stream.resume_token
+            async for change in stream:
+                self._apply_change(change)
+                self._resume_token = stream.resume_token
+
+    def _apply_change(self, change: Mapping[str, Any]) -> None:
+        operation = change.get("operationType")
+        document_id = change.get("documentKey", {}).get("_id")
+        if operation in {"insert", "replace", "update"}:
+            description = change.get("updateDescription") or {}
+            if (
+                operation == "update"
+                and set(description.get("updatedFields", {})) <= _TOUCH_ONLY_FIELDS
+                and not description.get("removedFields")
+            ):
+                return
+            document = change.get("fullDocument")
+            if document is None:
+                # The document was deleted before the update could be looked up.
+                self._forget(document_id)
+            else:
+                self._remember(document_id, document)
+        elif operation == "delete":
+            self._forget(document_id)
+        elif operation in {"drop", "rename", "invalidate"}:
+            self._resume_token = None
+            self._start_at = change.get("clusterTime")
+            for document_id in list(self._menus):
+                self._forget(document_id)
+
+    def _remember(self, document_id: Any, document: Mapping[str, Any]) -> None:
+        try:
+            menu = menu_from_document(document)
+        except (KeyError, TypeError, ValueError):
+            log.warning(
+                "Ignoring invalid role-menu document from another process: id=%s", document_id
+            )
+            return
+        entry = (menu.message_id, hash(menu))
+        previous = self._menus.get(document_id)
+        self._menus[document_id] = entry
+        if previous is not None and previous[0] != menu.message_id:
+            self.on_delete(previous[0])
+        if previous != entry:
+            self.on_upsert(menu)
+
+    def _forget(self, document_id: Any) -> None:
+        entry = self._menus.pop(document_id, None)
+        if entry is not None:
+            self.on_delete(entry[0])
+
+    async def _cluster_time(self) -> Any:
+        """Return the deployment's current operation time, or ``None`` on a standalone server."""
+        reply = await self.collection.database.command("ping")
+        return reply.get("operationTime")
+
+    async def _resync(self, *, notify: bool = True) -> None:
+        """Diff the whole collection against the last snapshot."""
+        documents = await self.collection.find({}).to_list(None)
+        seen: set[Any] = set()
+        for document in documents:
+            document_id = document.get("_id")
+            seen.add(document_id)
+            if notify:
+                self._remember(document_id, document)
+            else:
+                try:
+                    menu = menu_from_document(document)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._menus[document_id] = (menu.message_id, hash(menu))
+        for document_id in set(self._menus) - seen:
+            self._forget(document_id)
+
+    async def _resync_safely(self) -> None:
+        try:
+            await self._resync()
+        except PyMongoError:
+            log.warning("Could not resynchronize role menus", exc_info=True)
+
+    async def _poll_forever(self) -> None:
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await self._resync_safely()
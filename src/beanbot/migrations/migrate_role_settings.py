@@ -3,8 +3,10 @@ from __future__ import annotations
 import argparse
 import asyncio
 import os
-from collections.abc import Mapping, Sequence
-from dataclasses import dataclass
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any
 
@@ -12,7 +14,13 @@ from dotenv import load_dotenv
 from pymongo import AsyncMongoClient
 from pymongo.asynchronous.client_session import AsyncClientSession
 from pymongo.asynchronous.collection import AsyncCollection
-from pymongo.errors import ConfigurationError, DuplicateKeyError, OperationFailure, PyMongoError
+from pymongo.errors import (
+    BulkWriteError,
+    ConfigurationError,
+    DuplicateKeyError,
+    OperationFailure,
+    PyMongoError,
+)
 
 from beanbot.features.role_menus.models import normalize_emoji_key
 from beanbot.features.role_menus.repository import ensure_role_menu_indexes
@@ -21,6 +29,13 @@ LEGACY_DATABASE = "BeanBotDB"
 LEGACY_COLLECTION = "roleSettings"
 DEFAULT_TARGET_DATABASE = "BeanBotPythonDB"
 DEFAULT_TARGET_COLLECTION = "roleMenus"
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+CHECKPOINT_COLLECTION = "migrationCheckpoints"
+DUPLICATE_KEY_CODE = 11000
+MIGRATION_PHASES = ("discovery", "transform", "lookup", "insert")
+# Workers run these phases concurrently, so their times add up overlapping work.
+WORKER_PHASES = frozenset({"transform", "lookup"})
 
 
 @dataclass(slots=True)
@@ -35,6 +50,14 @@ class MigrationSummary:
     write_failures: int = 0
     transactions_unavailable: bool = False
     failure_reason: str | None = None
+    chunks_committed: int = 0
+    resumed_after: Any = None
+    phase_seconds: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(MIGRATION_PHASES, 0.0)
+    )
+
+    def add_phase_time(self, phase: str, started: float) -> None:
+        self.phase_seconds[phase] += time.perf_counter() - started
 
 
 def transform_legacy_role_setting(document: Mapping[str, Any]) -> dict[str, Any]:
@@ -92,8 +115,8 @@ def transform_legacy_role_setting(document: Mapping[str, Any]) -> dict[str, Any]
 def _migration_identity(
     source_database: str,
     source_collection: str,
-    legacy_id: str,
-) -> dict[str, str]:
+    legacy_id: Any,
+) -> dict[str, Any]:
     return {
         "migration.source_database": source_database,
         "migration.source_collection": source_collection,
@@ -101,6 +124,11 @@ def _migration_identity(
     }
 
 
+def _checkpoint_id(source_database: str, source_collection: str, target_collection: str) -> str:
+    # Checkpoints live in the target database, so the target collection completes the key.
+    return f"role_settings:{source_database}.{source_collection}->{target_collection}"
+
+
 def _transactions_are_unavailable(error: PyMongoError) -> bool:
     if isinstance(error, ConfigurationError):
         return True
@@ -113,16 +141,394 @@ async def _insert_candidates_atomically(
     client: AsyncMongoClient[dict[str, Any]],
     target: AsyncCollection[dict[str, Any]],
     candidates: Sequence[dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> None:
     async with client.start_session() as session:
 
         async def insert_all(active_session: AsyncClientSession) -> None:
-            for transformed in candidates:
-                await target.insert_one(transformed, session=active_session)
+            for start in range(0, len(candidates), batch_size):
+                await target.insert_many(
+                    candidates[start : start + batch_size],
+                    ordered=False,
+                    session=active_session,
+                )
 
         await session.with_transaction(insert_all)
 
 
+async def _commit_chunk(
+    client: AsyncMongoClient[dict[str, Any]],
+    target: AsyncCollection[dict[str, Any]],
+    checkpoints: AsyncCollection[dict[str, Any]],
+    checkpoint_id: str,
+    candidates: Sequence[dict[str, Any]],
+    last_source_id: Any,
+) -> None:
+    """Insert one chunk and advance its checkpoint in the same transaction."""
+    async with client.start_session() as session:
+
+        async def write_chunk(active_session: AsyncClientSession) -> None:
+            if candidates:
+                await target.insert_many(list(candidates), ordered=False, session=active_session)
+            await checkpoints.update_one(
+                {"_id": checkpoint_id},
+                {
+                    "$set": {"last_source_id": last_source_id, "updated_at": datetime.now(UTC)},
+                    "$inc": {"inserted": len(candidates)},
+                },
+                upsert=True,
+                session=active_session,
+            )
+
+        await session.with_transaction(write_chunk)
+
+
+def _duplicate_key_errors(error: PyMongoError) -> int:
+    # insert_many reports duplicates inside a BulkWriteError rather than as DuplicateKeyError.
+    if isinstance(error, DuplicateKeyError):
+        return 1
+    if isinstance(error, BulkWriteError):
+        return sum(
+            1
+            for write_error in error.details.get("writeErrors", ())
+            if write_error.get("code") == DUPLICATE_KEY_CODE
+        )
+    return 0
+
+
+def _record_write_error(summary: MigrationSummary, error: PyMongoError) -> None:
+    summary.failure_reason = str(error)
+    duplicates = _duplicate_key_errors(error)
+    if duplicates:
+        summary.conflicts += duplicates
+    elif _transactions_are_unavailable(error):
+        summary.transactions_unavailable = True
+    else:
+        summary.write_failures += 1
+
+
+async def _source_chunks(
+    source: AsyncCollection[dict[str, Any]],
+    batch_size: int,
+    summary: MigrationSummary,
+    *,
+    start_after: Any = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    query = {} if start_after is None else {"_id": {"$gt": start_after}}
+    cursor = source.find(query, sort=[("_id", 1)], batch_size=batch_size)
+    chunk: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    async for legacy_document in cursor:
+        chunk.append(legacy_document)
+        if len(chunk) >= batch_size:
+            summary.add_phase_time("discovery", started)
+            yield chunk
+            chunk = []
+            started = time.perf_counter()
+    summary.add_phase_time("discovery", started)
+    if chunk:
+        yield chunk
+
+
+@dataclass(slots=True)
+class _PreparedChunk:
+    sequence: int
+    last_source_id: Any
+    discovered: int
+    invalid: int = 0
+    already_migrated: int = 0
+    conflicts: int = 0
+    eligible: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.invalid and not self.conflicts
+
+    def record(self, summary: MigrationSummary) -> None:
+        summary.discovered += self.discovered
+        summary.valid += self.discovered - self.invalid
+        summary.invalid += self.invalid
+        summary.already_migrated += self.already_migrated
+        summary.conflicts += self.conflicts
+        summary.eligible += len(self.eligible)
+
+
+@dataclass(frozen=True, slots=True)
+class MigrationProgress:
+    processed: int
+    total: int
+    elapsed_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> float | None:
+        if not self.rate or self.processed >= self.total:
+            return None
+        return (self.total - self.processed) / self.rate
+
+
+ProgressCallback = Callable[[MigrationProgress], None]
+ChunkHandler = Callable[[_PreparedChunk], Awaitable[bool]]
+
+
+def _transform_chunk(
+    chunk: Sequence[Mapping[str, Any]],
+    source_database: str,
+    source_collection: str,
+    prepared: _PreparedChunk,
+    summary: MigrationSummary,
+) -> list[dict[str, Any]]:
+    started = time.perf_counter()
+    transformed_chunk: list[dict[str, Any]] = []
+    for legacy_document in chunk:
+        try:
+            transformed = transform_legacy_role_setting(legacy_document)
+        except (KeyError, TypeError, ValueError):
+            prepared.invalid += 1
+            continue
+
+        transformed["migration"]["source_database"] = source_database
+        transformed["migration"]["source_collection"] = source_collection
+        transformed_chunk.append(transformed)
+    summary.add_phase_time("transform", started)
+    return transformed_chunk
+
+
+async def _eligible_candidates(
+    target: AsyncCollection[dict[str, Any]],
+    transformed_chunk: Sequence[dict[str, Any]],
+    source_database: str,
+    source_collection: str,
+    prepared: _PreparedChunk,
+    summary: MigrationSummary,
+) -> list[dict[str, Any]]:
+    """Drop already-migrated and conflicting documents using one ``$in`` query for each check."""
+    if not transformed_chunk:
+        return []
+    started = time.perf_counter()
+    legacy_ids = [transformed["migration"]["legacy_id"] for transformed in transformed_chunk]
+    migrated_ids = {
+        document["migration"]["legacy_id"]
+        async for document in target.find(
+            {
+                **_migration_identity(source_database, source_collection, {"$in": legacy_ids}),
+            },
+            {"migration.legacy_id": 1},
+        )
+    }
+    remaining = [
+        transformed
+        for transformed in transformed_chunk
+        if transformed["migration"]["legacy_id"] not in migrated_ids
+    ]
+    prepared.already_migrated += len(transformed_chunk) - len(remaining)
+
+    conflicting_message_ids: set[int] = set()
+    if remaining:
+        conflicting_message_ids = {
+            document["message_id"]
+            async for document in target.find(
+                {"message_id": {"$in": [transformed["message_id"] for transformed in remaining]}},
+                {"message_id": 1},
+            )
+        }
+    eligible = [
+        transformed
+        for transformed in remaining
+        if transformed["message_id"] not in conflicting_message_ids
+    ]
+    prepared.conflicts += len(remaining) - len(eligible)
+    summary.add_phase_time("lookup", started)
+    return eligible
+
+
+async def _prepare_chunk(
+    sequence: int,
+    chunk: Sequence[Mapping[str, Any]],
+    target: AsyncCollection[dict[str, Any]],
+    source_database: str,
+    source_collection: str,
+    summary: MigrationSummary,
+) -> _PreparedChunk:
+    prepared = _PreparedChunk(sequence, chunk[-1]["_id"], len(chunk))
+    transformed_chunk = _transform_chunk(
+        chunk, source_database, source_collection, prepared, summary
+    )
+    prepared.eligible = await _eligible_candidates(
+        target, transformed_chunk, source_database, source_collection, prepared, summary
+    )
+    return prepared
+
+
+async def _run_pipeline(
+    source: AsyncCollection[dict[str, Any]],
+    target: AsyncCollection[dict[str, Any]],
+    *,
+    source_database: str,
+    source_collection: str,
+    batch_size: int,
+    workers: int,
+    summary: MigrationSummary,
+    handle_chunk: ChunkHandler,
+    progress: ProgressCallback | None,
+) -> None:
+    """Overlap cursor reads, per-chunk transform and lookups, and ordered chunk handling.
+
+    One reader feeds raw chunks into a bounded queue, ``workers`` tasks transform them and run
+    their conflict lookups, and this coroutine hands prepared chunks to ``handle_chunk`` in
+    source order. Returning ``False`` from ``handle_chunk`` stops the run.
+    """
+    raw_chunks: asyncio.Queue[tuple[int, list[dict[str, Any]]] | None] = asyncio.Queue(
+        maxsize=workers * 2
+    )
+    # A stage that fails hands its exception to the writer, which stops the whole run at once
+    # instead of buffering every later chunk behind the sequence number that never arrives.
+    # Stages only send end markers when they finish normally; awaiting a full queue while
+    # being cancelled would never return.
+    prepared_chunks: asyncio.Queue[_PreparedChunk | Exception | None] = asyncio.Queue(
+        maxsize=workers * 2
+    )
+    total = 0
+    if progress is not None:
+        total = (
+            await source.estimated_document_count()
+            if summary.resumed_after is None
+            else await source.count_documents({"_id": {"$gt": summary.resumed_after}})
+        )
+    started = time.perf_counter()
+
+    async def read() -> None:
+        sequence = 0
+        try:
+            async for chunk in _source_chunks(
+                source, batch_size, summary, start_after=summary.resumed_after
+            ):
+                await raw_chunks.put((sequence, chunk))
+                sequence += 1
+        except Exception as error:
+            await prepared_chunks.put(error)
+            return
+        for _ in range(workers):
+            await raw_chunks.put(None)
+
+    async def transform() -> None:
+        try:
+            while (item := await raw_chunks.get()) is not None:
+                sequence, chunk = item
+                await prepared_chunks.put(
+                    await _prepare_chunk(
+                        sequence, chunk, target, source_database, source_collection, summary
+                    )
+                )
+        except Exception as error:
+            await prepared_chunks.put(error)
+            return
+        await prepared_chunks.put(None)
+
+    tasks = [asyncio.create_task(read())]
+    tasks.extend(asyncio.create_task(transform()) for _ in range(workers))
+    try:
+        waiting: dict[int, _PreparedChunk] = {}
+        next_sequence = 0
+        finished_workers = 0
+        while finished_workers < workers:
+            prepared = await prepared_chunks.get()
+            if prepared is None:
+                finished_workers += 1
+                continue
+            if isinstance(prepared, Exception):
+                raise prepared
+            waiting[prepared.sequence] = prepared
+            while next_sequence in waiting:
+                chunk = waiting.pop(next_sequence)
+                next_sequence += 1
+                chunk.record(summary)
+                if not await handle_chunk(chunk):
+                    return
+                if progress is not None:
+                    progress(
+                        MigrationProgress(
+                            summary.discovered,
+                            max(total, summary.discovered),
+                            time.perf_counter() - started,
+                        )
+                    )
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _migrate_streaming(
+    client: AsyncMongoClient[dict[str, Any]],
+    source: AsyncCollection[dict[str, Any]],
+    target: AsyncCollection[dict[str, Any]],
+    checkpoints: AsyncCollection[dict[str, Any]],
+    *,
+    source_database: str,
+    source_collection: str,
+    target_collection: str,
+    apply: bool,
+    resume: bool,
+    batch_size: int,
+    workers: int,
+    summary: MigrationSummary,
+    progress: ProgressCallback | None,
+) -> None:
+    checkpoint_id = _checkpoint_id(source_database, source_collection, target_collection)
+    if resume:
+        checkpoint = await checkpoints.find_one({"_id": checkpoint_id})
+        if checkpoint is not None:
+            summary.resumed_after = checkpoint["last_source_id"]
+    if apply:
+        await ensure_role_menu_indexes(target)
+
+    async def commit(prepared: _PreparedChunk) -> bool:
+        if not apply:
+            return True
+        if not prepared.clean:
+            summary.failure_reason = (
+                "Stopped before a chunk with invalid or conflicting documents; "
+                "fix them and rerun with --resume"
+            )
+            return False
+
+        started = time.perf_counter()
+        try:
+            await _commit_chunk(
+                client,
+                target,
+                checkpoints,
+                checkpoint_id,
+                prepared.eligible,
+                prepared.last_source_id,
+            )
+        except PyMongoError as error:
+            _record_write_error(summary, error)
+            return False
+        else:
+            summary.inserted += len(prepared.eligible)
+            summary.chunks_committed += 1
+            return True
+        finally:
+            summary.add_phase_time("insert", started)
+
+    await _run_pipeline(
+        source,
+        target,
+        source_database=source_database,
+        source_collection=source_collection,
+        batch_size=batch_size,
+        workers=workers,
+        summary=summary,
+        handle_chunk=commit,
+        progress=progress,
+    )
+
+
 async def migrate(
     *,
     mongo_uri: str,
@@ -131,9 +537,26 @@ async def migrate(
     target_database: str,
     target_collection: str,
     apply: bool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    streaming: bool = False,
+    resume: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    progress: ProgressCallback | None = None,
 ) -> MigrationSummary:
+    """Copy legacy role settings into the new schema.
+
+    The default mode preflights every document and commits all candidates in one transaction.
+    Streaming mode commits each ``_id``-ordered chunk in its own transaction together with a
+    checkpoint, so memory and transaction size stay bounded and ``resume`` continues after the
+    last committed chunk. Resuming implies streaming. In both modes ``workers`` chunks are
+    transformed and checked for conflicts concurrently while the cursor keeps reading.
+    """
     if source_database == target_database:
         raise ValueError("The target database must differ from the legacy source database")
+    if batch_size < 1:
+        raise ValueError("The batch size must be at least 1")
+    if workers < 1:
+        raise ValueError("At least one worker is required")
 
     client: AsyncMongoClient[dict[str, Any]] = AsyncMongoClient(mongo_uri)
     summary = MigrationSummary()
@@ -141,55 +564,52 @@ async def migrate(
         await client.admin.command("ping")
         source = client[source_database][source_collection]
         target = client[target_database][target_collection]
-        candidates: list[dict[str, Any]] = []
-
-        async for legacy_document in source.find({}):
-            summary.discovered += 1
-            try:
-                transformed = transform_legacy_role_setting(legacy_document)
-            except (KeyError, TypeError, ValueError):
-                summary.invalid += 1
-                continue
-
-            transformed["migration"]["source_database"] = source_database
-            transformed["migration"]["source_collection"] = source_collection
-
-            summary.valid += 1
-            legacy_id = transformed["migration"]["legacy_id"]
-            existing = await target.find_one(
-                _migration_identity(source_database, source_collection, legacy_id),
-                {"_id": 1},
+        if streaming or resume:
+            await _migrate_streaming(
+                client,
+                source,
+                target,
+                client[target_database][CHECKPOINT_COLLECTION],
+                source_database=source_database,
+                source_collection=source_collection,
+                target_collection=target_collection,
+                apply=apply,
+                resume=resume,
+                batch_size=batch_size,
+                workers=workers,
+                summary=summary,
+                progress=progress,
             )
-            if existing is not None:
-                summary.already_migrated += 1
-                continue
+            return summary
 
-            message_conflict = await target.find_one(
-                {"message_id": transformed["message_id"]},
-                {"_id": 1},
-            )
-            if message_conflict is not None:
-                summary.conflicts += 1
-                continue
+        candidates: list[dict[str, Any]] = []
 
-            summary.eligible += 1
-            candidates.append(transformed)
+        async def collect(prepared: _PreparedChunk) -> bool:
+            candidates.extend(prepared.eligible)
+            return True
+
+        await _run_pipeline(
+            source,
+            target,
+            source_database=source_database,
+            source_collection=source_collection,
+            batch_size=batch_size,
+            workers=workers,
+            summary=summary,
+            handle_chunk=collect,
+            progress=progress,
+        )
 
         if apply and candidates and not summary.invalid and not summary.conflicts:
             await ensure_role_menu_indexes(target)
+            started = time.perf_counter()
             try:
-                await _insert_candidates_atomically(client, target, candidates)
-            except DuplicateKeyError as error:
-                summary.conflicts += 1
-                summary.failure_reason = str(error)
+                await _insert_candidates_atomically(client, target, candidates, batch_size)
             except PyMongoError as error:
-                summary.failure_reason = str(error)
-                if _transactions_are_unavailable(error):
-                    summary.transactions_unavailable = True
-                else:
-                    summary.write_failures += 1
+                _record_write_error(summary, error)
             else:
                 summary.inserted = len(candidates)
+            summary.add_phase_time("insert", started)
     finally:
         await client.close()
 
@@ -227,6 +647,28 @@ def _parser() -> argparse.ArgumentParser:
     parser.add_argument("--source-collection", default=LEGACY_COLLECTION)
     parser.add_argument("--target-database", default=DEFAULT_TARGET_DATABASE)
     parser.add_argument("--target-collection", default=DEFAULT_TARGET_COLLECTION)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Documents read, checked, and inserted per round trip (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Batches transformed and checked concurrently (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Commit each batch in its own transaction and record a resumable checkpoint",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue a streaming run after its last committed batch (implies --streaming)",
+    )
     parser.add_argument(
         "--apply",
         action="store_true",
@@ -235,6 +677,18 @@ def _parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _print_progress(progress: MigrationProgress) -> None:
+    eta = progress.eta_seconds
+    line = (
+        f"  processed {progress.processed:,}/~{progress.total:,} documents, "
+        f"{progress.rate:,.0f} docs/s, ETA {'-' if eta is None else f'{eta:,.0f}s'}"
+    )
+    if sys.stdout.isatty():
+        print(f"\r{line}", end="", flush=True)
+    else:
+        print(line)
+
+
 async def _run(arguments: argparse.Namespace) -> int:
     summary = await migrate(
         mongo_uri=_mongo_uri(arguments.mongo_uri),
@@ -243,9 +697,20 @@ async def _run(arguments: argparse.Namespace) -> int:
         target_database=arguments.target_database,
         target_collection=arguments.target_collection,
         apply=arguments.apply,
+        batch_size=arguments.batch_size,
+        streaming=arguments.streaming,
+        resume=arguments.resume,
+        workers=arguments.workers,
+        progress=_print_progress,
     )
+    if sys.stdout.isatty():
+        print()
     mode = "APPLY" if arguments.apply else "DRY RUN"
+    if arguments.streaming or arguments.resume:
+        mode += ", STREAMING"
     print(f"Role settings migration ({mode})")
+    if summary.resumed_after is not None:
+        print(f"  resumed after:    {summary.resumed_after}")
     print(f"  discovered:       {summary.discovered}")
     print(f"  valid:            {summary.valid}")
     print(f"  eligible:         {summary.eligible}")
@@ -254,10 +719,19 @@ async def _run(arguments: argparse.Namespace) -> int:
     print(f"  conflicts:        {summary.conflicts}")
     print(f"  invalid:          {summary.invalid}")
     print(f"  write failures:   {summary.write_failures}")
+    if arguments.apply and (arguments.streaming or arguments.resume):
+        print(f"  chunks committed: {summary.chunks_committed}")
     if summary.transactions_unavailable:
         print("  transactions:     unavailable (apply requires a replica set or mongos)")
     if summary.failure_reason:
         print(f"  failure:          {summary.failure_reason}")
+    print("Phase timings (transform and lookup are summed across workers)")
+    for phase in MIGRATION_PHASES:
+        seconds = summary.phase_seconds[phase]
+        documents = summary.inserted if phase == "insert" else summary.discovered
+        unit = "worker-s" if phase in WORKER_PHASES else "s"
+        rate = f"{documents / seconds:,.0f} docs/{unit}" if seconds > 0 and documents else "-"
+        print(f"  {phase + ':':<17} {seconds:8.3f}{unit:<8}  {rate}")
     return (
         1
         if summary.conflicts
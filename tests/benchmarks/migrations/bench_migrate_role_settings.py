@@ -0,0 +1,384 @@
+"""Benchmark ``migrate_role_settings.migrate`` against an in-process MongoDB stand-in.
+
+Run from the project root; results are printed (or written) as JSON::
+
+    python tests/benchmarks/migrations/bench_migrate_role_settings.py --documents 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from pymongo.errors import BulkWriteError
+from synthetic import generate_role_settings
+
+from beanbot.migrations import migrate_role_settings
+
+_IDENTITY_FIELDS = (
+    "migration.source_database",
+    "migration.source_collection",
+    "migration.legacy_id",
+)
+
+
+def _value(document: dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches(document: dict[str, Any], query: dict[str, Any]) -> bool:
+    for path, condition in query.items():
+        value = _value(document, path)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif isinstance(condition, dict) and "$gt" in condition:
+            if value is None or value <= condition["$gt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class MemoryCursor:
+    """Yields documents, paying one simulated round trip per ``batch_size`` documents."""
+
+    def __init__(self, documents: list[dict[str, Any]], batch_size: int, latency: float) -> None:
+        self._documents = documents
+        self._batch_size = max(1, batch_size)
+        self._latency = latency
+        self._position = 0
+
+    def __aiter__(self) -> MemoryCursor:
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        if self._position >= len(self._documents):
+            raise StopAsyncIteration
+        if self._position % self._batch_size == 0:
+            await asyncio.sleep(self._latency)
+        document = self._documents[self._position]
+        self._position += 1
+        return document
+
+
+class MemoryCollection:
+    """The subset of ``AsyncCollection`` the migration uses, with hash indexes for lookups."""
+
+    def __init__(self, latency: float, documents: Iterable[dict[str, Any]] = ()) -> None:
+        self.latency = latency
+        self.documents = list(documents)
+        self.by_message_id: dict[Any, dict[str, Any]] = {}
+        self.by_identity: dict[tuple[Any, ...], dict[str, Any]] = {}
+        self.index_specs: dict[str, dict[str, Any]] = {"_id_": {"key": [("_id", 1)]}}
+        self.round_trips = 0
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+        *,
+        sort: list[tuple[str, int]] | None = None,
+        batch_size: int = 101,
+    ) -> MemoryCursor:
+        self.round_trips += 1
+        message_ids = query.get("message_id", {})
+        legacy_ids = query.get("migration.legacy_id", {})
+        if set(query) == {"message_id"} and "$in" in message_ids:
+            found = [
+                self.by_message_id[key] for key in message_ids["$in"] if key in self.by_message_id
+            ]
+        elif set(query) == set(_IDENTITY_FIELDS) and "$in" in legacy_ids:
+            namespace = (query[_IDENTITY_FIELDS[0]], query[_IDENTITY_FIELDS[1]])
+            found = [
+                self.by_identity[(*namespace, key)]
+                for key in legacy_ids["$in"]
+                if (*namespace, key) in self.by_identity
+            ]
+        else:
+            found = [document for document in self.documents if _matches(document, query)]
+        for path, direction in reversed(sort or []):
+            found.sort(key=lambda document: _value(document, path), reverse=direction < 0)
+        return MemoryCursor(found, batch_size, self.latency)
+
+    async def find_one(self, query: dict[str, Any]) -> dict[str, Any] | None:
+        await self._round_trip()
+        return next((document for document in self.documents if _matches(document, query)), None)
+
+    async def estimated_document_count(self) -> int:
+        await self._round_trip()
+        return len(self.documents)
+
+    async def create_index(self, keys: Any, *, name: str, **options: Any) -> None:
+        await self._round_trip()
+        self.index_specs[name] = {"key": list(keys), **options}
+
+    async def index_information(self) -> dict[str, dict[str, Any]]:
+        await self._round_trip()
+        return dict(self.index_specs)
+
+    async def drop_index(self, name: str) -> None:
+        await self._round_trip()
+        self.index_specs.pop(name, None)
+
+    async def insert_many(
+        self,
+        documents: list[dict[str, Any]],
+        *,
+        ordered: bool,
+        session: MemorySession,
+    ) -> None:
+        await self._round_trip()
+        write_errors: list[dict[str, Any]] = []
+        for index, document in enumerate(documents):
+            message_id = document["message_id"]
+            if message_id in self.by_message_id:
+                write_errors.append(
+                    {
+                        "index": index,
+                        "code": 11000,
+                        "errmsg": f"E11000 duplicate key error dup key: {{ message_id: {message_id} }}",
+                        "keyPattern": {"message_id": 1},
+                        "keyValue": {"message_id": message_id},
+                        "op": document,
+                    }
+                )
+                continue
+            session.pending.append((self, document))
+        if write_errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": write_errors,
+                    "writeConcernErrors": [],
+                    "nInserted": len(documents) - len(write_errors),
+                    "nUpserted": 0,
+                    "nMatched": 0,
+                    "nModified": 0,
+                    "nRemoved": 0,
+                    "upserted": [],
+                }
+            )
+
+    async def update_one(
+        self,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool,
+        session: MemorySession,
+    ) -> None:
+        await self._round_trip()
+        existing = next((document for document in self.documents if _matches(document, query)), {})
+        document = {**query, **existing, **update.get("$set", {})}
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+        session.pending.append((self, document))
+
+    def commit(self, document: dict[str, Any]) -> None:
+        if "_id" in document:
+            self.documents = [
+                existing for existing in self.documents if existing.get("_id") != document["_id"]
+            ]
+        self.documents.append(document)
+        if "message_id" in document:
+            self.by_message_id[document["message_id"]] = document
+        if _value(document, "migration.legacy_id") is not None:
+            identity = tuple(_value(document, path) for path in _IDENTITY_FIELDS)
+            self.by_identity[identity] = document
+
+
+class MemoryDatabase:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.collections: dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.collections.setdefault(name, MemoryCollection(self.latency))
+
+
+class MemoryAdmin:
+    async def command(self, name: str) -> None:
+        return None
+
+
+class MemorySession:
+    def __init__(self) -> None:
+        self.pending: list[tuple[MemoryCollection, dict[str, Any]]] = []
+
+    async def __aenter__(self) -> MemorySession:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.pending.clear()
+
+    async def with_transaction(self, callback: Callable[[MemorySession], Any]) -> None:
+        try:
+            await callback(self)
+        except BaseException:
+            self.pending.clear()
+            raise
+        for collection, document in self.pending:
+            collection.commit(document)
+        self.pending.clear()
+
+
+class MemoryClient:
+    def __init__(self, latency: float) -> None:
+        self.admin = MemoryAdmin()
+        self.latency = latency
+        self.databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.databases.setdefault(name, MemoryDatabase(self.latency))
+
+    def start_session(self) -> MemorySession:
+        return MemorySession()
+
+    async def close(self) -> None:
+        return None
+
+
+async def _run_once(
+    source_documents: list[dict[str, Any]], arguments: argparse.Namespace
+) -> dict[str, Any]:
+    client = MemoryClient(arguments.round_trip_ms / 1000)
+    source = client[migrate_role_settings.LEGACY_DATABASE][migrate_role_settings.LEGACY_COLLECTION]
+    source.documents = source_documents
+
+    started = time.perf_counter()
+    with patch.object(migrate_role_settings, "AsyncMongoClient", lambda uri: client):
+        summary = await migrate_role_settings.migrate(
+            mongo_uri="mongodb://benchmark",
+            source_database=migrate_role_settings.LEGACY_DATABASE,
+            source_collection=migrate_role_settings.LEGACY_COLLECTION,
+            target_database=migrate_role_settings.DEFAULT_TARGET_DATABASE,
+            target_collection=migrate_role_settings.DEFAULT_TARGET_COLLECTION,
+            apply=not arguments.dry_run,
+            batch_size=arguments.batch_size,
+            streaming=arguments.streaming,
+            workers=arguments.workers,
+        )
+    wall_seconds = time.perf_counter() - started
+
+    target = client[migrate_role_settings.DEFAULT_TARGET_DATABASE][
+        migrate_role_settings.DEFAULT_TARGET_COLLECTION
+    ]
+    counts = asdict(summary)
+    phase_seconds = counts.pop("phase_seconds")
+    return {
+        "wall_seconds": wall_seconds,
+        "documents_per_second": summary.discovered / wall_seconds if wall_seconds else None,
+        "phase_seconds": phase_seconds,
+        "target_round_trips": target.round_trips,
+        "summary": counts,
+    }
+
+
+def _expected_counts(
+    source_documents: list[dict[str, Any]], arguments: argparse.Namespace
+) -> dict[str, int]:
+    """What a correct run reports, given the documents generated without a ``messageId``."""
+    invalid = [
+        number for number, document in enumerate(source_documents) if "messageId" not in document
+    ]
+    discovered = len(source_documents)
+    if arguments.dry_run:
+        inserted = 0
+    elif not invalid:
+        inserted = discovered
+    elif arguments.streaming:
+        # Streaming commits every batch before the first one holding an invalid document.
+        inserted = invalid[0] // arguments.batch_size * arguments.batch_size
+        discovered = min(discovered, inserted + arguments.batch_size)
+    else:
+        # The all-or-nothing preflight refuses to insert anything.
+        inserted = 0
+    return {
+        "discovered": discovered,
+        "invalid": sum(1 for number in invalid if number < discovered),
+        "inserted": inserted,
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=migrate_role_settings.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=migrate_role_settings.DEFAULT_WORKERS)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="Benchmark the preflight only")
+    parser.add_argument(
+        "--round-trip-ms",
+        type=float,
+        default=0.0,
+        help="Simulated latency added to every MongoDB round trip (default: 0)",
+    )
+    parser.add_argument("--custom-emoji-ratio", type=float, default=0.35)
+    parser.add_argument("--invalid-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    return parser
+
+
+def main() -> None:
+    arguments = _parser().parse_args()
+    source_documents = list(
+        generate_role_settings(
+            arguments.documents,
+            seed=arguments.seed,
+            custom_emoji_ratio=arguments.custom_emoji_ratio,
+            invalid_ratio=arguments.invalid_ratio,
+        )
+    )
+    runs = [
+        asyncio.run(_run_once(source_documents, arguments)) for _ in range(max(1, arguments.repeat))
+    ]
+    parameters = {
+        key: value for key, value in vars(arguments).items() if key not in {"output", "repeat"}
+    }
+    result = {
+        "benchmark": "migrate_role_settings",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "parameters": parameters,
+        "median_wall_seconds": statistics.median(run["wall_seconds"] for run in runs),
+        "runs": runs,
+    }
+    payload = json.dumps(result, indent=2, default=str)
+    if arguments.output is None:
+        print(payload)
+    else:
+        arguments.output.write_text(payload + "\n", encoding="utf-8")
+
+    last = runs[-1]["summary"]
+    expected = _expected_counts(source_documents, arguments)
+    if {key: last[key] for key in expected} != expected:
+        sys.exit(f"Benchmark run did not produce the expected counts {expected}: {last}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Deterministic synthetic ``BeanBotDB.roleSettings`` documents for migration benchmarks."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from bson import ObjectId
+
+# Most legacy menus offered a handful of roles; a few colour/pronoun menus offered many more.
+PAIR_COUNT_WEIGHTS = {1: 8, 2: 16, 3: 20, 4: 16, 5: 12, 6: 8, 8: 8, 10: 6, 15: 4, 20: 2}
+UNICODE_EMOJI = (
+    "\N{RED APPLE}",
+    "\N{GREEN APPLE}",
+    "\N{BLUE HEART}",
+    "\N{VIDEO GAME}",
+    "\N{MUSICAL NOTE}",
+    "\N{BOOKS}",
+    "\N{DOG FACE}",
+    "\N{CAT FACE}",
+    "\N{PARTY POPPER}",
+    "\N{HOT BEVERAGE}",
+    "\N{ARTIST PALETTE}",
+    "\N{SOCCER BALL}",
+    "\N{FIRE}",
+    "\N{SPARKLES}",
+    "\N{GHOST}",
+    "\N{BREAD}",
+)
+_EPOCH = datetime(2019, 6, 1, tzinfo=UTC)
+_SNOWFLAKE_BASE = 400_000_000_000_000_000
+
+
+def _snowflake(rng: random.Random) -> str:
+    return str(_SNOWFLAKE_BASE + rng.randrange(10**17))
+
+
+def _emoji_field(rng: random.Random, custom_ratio: float) -> dict[str, str]:
+    if rng.random() < custom_ratio:
+        emoji_id = _snowflake(rng)
+        if rng.random() < 0.2:
+            return {"emojiId": f"<:bean{rng.randrange(100)}:{emoji_id}>"}
+        return {"emojiId": emoji_id}
+    emoji = rng.choice(UNICODE_EMOJI)
+    return {"emojiKey": emoji} if rng.random() < 0.3 else {"emojiId": emoji}
+
+
+def generate_role_settings(
+    count: int,
+    *,
+    seed: int = 0,
+    guilds: int = 25,
+    custom_emoji_ratio: float = 0.35,
+    invalid_ratio: float = 0.0,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``count`` legacy documents with realistic role and emoji distributions."""
+    rng = random.Random(seed)
+    guild_ids = [_snowflake(rng) for _ in range(guilds)]
+    # A few busy guilds own most menus.
+    guild_weights = [1 / (rank + 1) for rank in range(guilds)]
+    pair_counts = list(PAIR_COUNT_WEIGHTS)
+    pair_weights = list(PAIR_COUNT_WEIGHTS.values())
+    started = int(_EPOCH.timestamp())
+
+    for number in range(count):
+        pairs = [
+            {"roleId": _snowflake(rng), **_emoji_field(rng, custom_emoji_ratio)}
+            for _ in range(rng.choices(pair_counts, pair_weights)[0])
+        ]
+        document: dict[str, Any] = {
+            "_id": ObjectId(f"{started + number * 60:08x}{number:016x}"),
+            "guildId": rng.choices(guild_ids, guild_weights)[0],
+            "channelId": _snowflake(rng),
+            "messageId": str(_SNOWFLAKE_BASE * 2 + number),
+            "roleEmotePair": pairs,
+        }
+        if rng.random() < 0.7:
+            document["lastAccessed"] = _EPOCH + timedelta(minutes=rng.randrange(2_000_000))
+        if rng.random() < invalid_ratio:
+            del document["messageId"]
+        yield document
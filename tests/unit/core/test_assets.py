@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from importlib import resources
+
+import discord
+
+from beanbot.core.assets import AssetRegistry
+
+
+def test_registry_indexes_packaged_media_once() -> None:
+    registry = AssetRegistry("beanbot.resources")
+
+    gifs = registry.select(prefix="gordon", suffix=".GIF")
+
+    assert [asset.name for asset in gifs] == [f"gordon{number}.gif" for number in range(1, 9)]
+    assert registry.select(prefix="gordon", suffix=".gif") is gifs
+    assert "__init__.py" not in registry.names()
+
+
+def test_memory_and_mapped_assets_hand_out_independent_readers() -> None:
+    expected = resources.files("beanbot.resources").joinpath("PR.png").read_bytes()
+
+    for threshold in (len(expected) + 1, 1):
+        asset = AssetRegistry("beanbot.resources", mmap_threshold=threshold).get("PR.png")
+        first, second = asset.open(), asset.open()
+
+        assert first.read(4) == expected[:4]
+        assert second.read() == expected
+        assert first.read() == expected[4:]
+
+        file = discord.File(asset.open(), filename=asset.name)
+        file.reset()
+        assert file.fp.read() == expected
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, cast
+
+import aiohttp
+import pytest
+
+from beanbot.core.http import CircuitOpenError, OutboundHttp
+from beanbot.core.metrics import Histogram
+
+
+class FakeResponse:
+    def __init__(self, status: int) -> None:
+        self.status = status
+        self.released = False
+
+    def release(self) -> None:
+        self.released = True
+
+
+class FakeSession:
+    def __init__(self, *outcomes: int | BaseException) -> None:
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    async def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
+
+
+def _http(session: FakeSession, clock: FakeClock, **options: Any) -> OutboundHttp:
+    return OutboundHttp(
+        cast(aiohttp.ClientSession, session), clock=clock, sleep=_no_sleep, **options
+    )
+
+
+async def _status(http: OutboundHttp) -> int:
+    async with http.get("https://meme-api.test/gimme") as response:
+        return response.status
+
+
+def test_connection_errors_and_5xx_are_retried() -> None:
+    session = FakeSession(aiohttp.ClientConnectionError(), 503, 200)
+    http = _http(session, FakeClock(), retries=2)
+
+    assert asyncio.run(_status(http)) == 200
+    assert session.requests == 3
+    assert http.snapshot()["meme-api.test"].state == "closed"
+
+
+def test_open_circuit_fails_fast_then_probes_after_reset() -> None:
+    clock = FakeClock()
+    session = FakeSession(500, 500, 200)
+    http = _http(session, clock, retries=0, failure_threshold=2, reset_seconds=30)
+
+    async def exercise() -> None:
+        assert await _status(http) == 500
+        assert await _status(http) == 500
+        with pytest.raises(CircuitOpenError):
+            await _status(http)
+        assert session.requests == 2
+
+        clock.now = 31
+        assert await _status(http) == 200
+
+    asyncio.run(exercise())
+
+    assert http.snapshot()["meme-api.test"].state == "closed"
+
+
+def test_failed_half_open_probe_reopens_the_circuit() -> None:
+    clock = FakeClock()
+    session = FakeSession(TimeoutError(), TimeoutError())
+    http = _http(session, clock, retries=0, failure_threshold=1, reset_seconds=30)
+
+    async def exercise() -> None:
+        with pytest.raises(TimeoutError):
+            await _status(http)
+        clock.now = 31
+        with pytest.raises(TimeoutError):
+            await _status(http)
+        with pytest.raises(CircuitOpenError):
+            await _status(http)
+
+    asyncio.run(exercise())
+
+    assert http.snapshot()["meme-api.test"].state == "open"
+
+
+def test_cancelled_half_open_probe_lets_the_next_request_probe() -> None:
+    clock = FakeClock()
+    session = FakeSession(TimeoutError(), asyncio.CancelledError(), aiohttp.InvalidURL("x"), 200)
+    http = _http(session, clock, retries=0, failure_threshold=1, reset_seconds=30)
+
+    async def exercise() -> None:
+        with pytest.raises(TimeoutError):
+            await _status(http)
+        clock.now = 31
+        with pytest.raises(asyncio.CancelledError):
+            await _status(http)
+        with pytest.raises(aiohttp.InvalidURL):
+            await _status(http)
+        assert await _status(http) == 200
+
+    asyncio.run(exercise())
+
+    assert http.snapshot()["meme-api.test"].state == "closed"
+
+
+def test_each_attempt_is_timed_per_host_and_status_class() -> None:
+    timings = Histogram("http_seconds", "test", ("host", "outcome"))
+    session = FakeSession(aiohttp.ClientConnectionError(), 503, 200)
+    http = _http(session, FakeClock(), retries=2, timings=timings)
+
+    asyncio.run(_status(http))
+
+    assert [timings.count("meme-api.test", outcome) for outcome in ("error", "5xx", "2xx")] == [
+        1,
+        1,
+        1,
+    ]
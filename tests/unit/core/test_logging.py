@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import sys
+from collections.abc import Iterator
+
+import pytest
+
+from beanbot.core.logging import (
+    ContextFilter,
+    JsonFormatter,
+    LogQueueListener,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    TextFormatter,
+    configure_logging,
+    log_context,
+)
+
+
+@pytest.fixture
+def restore_root_logger() -> Iterator[None]:
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _record(message: str, *args: object, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("beanbot.test", level, __file__, 1, message, args, None)
+
+
+def test_json_records_carry_the_callers_log_context() -> None:
+    record = _record("Restored menu %s", 3)
+    with log_context(guild_id=1, message_id=3, command=None):
+        ContextFilter().filter(record)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record.exc_info = sys.exc_info()
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "Restored menu 3"
+    assert (payload["guild_id"], payload["message_id"]) == (1, 3)
+    assert "command" not in payload
+    assert "RuntimeError: boom" in payload["exception"]
+
+
+def test_text_records_append_the_log_context_and_suppressed_count() -> None:
+    record = _record("Restored menu %s", 3)
+    with log_context(guild_id=1, message_id=3):
+        ContextFilter().filter(record)
+    record.suppressed = 4
+    plain = _record("Ready")
+    ContextFilter().filter(plain)
+
+    formatter = TextFormatter()
+
+    assert formatter.format(record).endswith(
+        "INFO beanbot.test - Restored menu 3 guild_id=1 message_id=3 suppressed=4"
+    )
+    assert formatter.format(plain).endswith("INFO beanbot.test - Ready")
+
+
+def test_log_context_rejects_unknown_fields() -> None:
+    with pytest.raises(ValueError), log_context(menu=3):
+        pass
+
+
+def test_rate_limit_suppresses_repeats_and_reports_the_count() -> None:
+    now = [0.0]
+    limiter = RateLimitFilter(2, window_seconds=60, clock=lambda: now[0])
+
+    allowed = [limiter.filter(_record("Menu %s failed", index)) for index in range(5)]
+    other = limiter.filter(_record("Different line"))
+    now[0] = 61
+    resumed = _record("Menu %s failed", 9)
+
+    assert allowed == [True, True, False, False, False]
+    assert other is True
+    assert limiter.filter(resumed) is True
+    assert getattr(resumed, "suppressed", 0) == 3
+
+
+def test_rate_limit_forgets_windows_that_have_ended() -> None:
+    now = [0.0]
+    limiter = RateLimitFilter(1, window_seconds=60, clock=lambda: now[0])
+
+    for index in range(100):
+        limiter.filter(_record(f"Menu {index} failed"))
+    now[0] = 121
+    limiter.filter(_record("Later line"))
+
+    assert len(limiter._windows) == 1
+
+
+def test_queue_handler_drops_instead_of_blocking_when_full() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+
+    handler.handle(_record("first %s", 1))
+    handler.handle(_record("second"))
+
+    queued = log_queue.get_nowait()
+    assert (queued.msg, queued.args) == ("first 1", None)
+    assert handler.dropped == 1
+
+
+@pytest.mark.usefixtures("restore_root_logger")
+def test_async_json_logging_writes_from_the_listener_thread(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    listener = configure_logging("INFO", log_format="json", async_output=True)
+    assert listener is not None
+    with log_context(command="ping"):
+        logging.getLogger("beanbot.test").info("Pong %s", "sent")
+    listener.stop()
+
+    (line,) = capsys.readouterr().out.splitlines()
+    payload = json.loads(line)
+    assert (payload["message"], payload["command"], payload["level"]) == (
+        "Pong sent",
+        "ping",
+        "INFO",
+    )
+
+
+def test_queue_listener_reports_dropped_records_when_stopped(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+    listener = LogQueueListener(handler, logging.StreamHandler(sys.stdout))
+
+    handler.handle(_record("first"))
+    handler.handle(_record("second"))
+    handler.handle(_record("third"))
+    listener.start()
+    listener.stop()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "first",
+        "Dropped 2 log records because the log queue was full",
+    ]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from beanbot.core.config import Settings
+from beanbot.core.loop_health import LoopMonitor
+from beanbot.core.metrics import Histogram
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_blocking_callback_is_reported_with_its_stack() -> None:
+    lag = Histogram("lag_seconds", "test")
+    monitor = LoopMonitor(interval_seconds=0.02, slow_callback_seconds=0.1, lag_histogram=lag)
+
+    async def exercise() -> None:
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _block_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.close()
+
+    asyncio.run(exercise())
+
+    health = monitor.health()
+    assert health.stalls == 1
+    assert health.last_stall is not None
+    assert "_block_loop" in health.last_stall.stack
+    assert health.max_lag_seconds >= 0.25
+    assert lag.count() >= 2
+
+
+def test_idle_loop_reports_no_stalls() -> None:
+    monitor = LoopMonitor(interval_seconds=0.01, slow_callback_seconds=0.2)
+
+    async def exercise() -> None:
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.close()
+
+    asyncio.run(exercise())
+
+    health = monitor.health()
+    assert health.stalls == 0
+    assert health.last_stall is None
+    assert health.max_lag_seconds < 0.2
+
+
+def test_default_settings_catch_every_block_longer_than_the_threshold() -> None:
+    settings = Settings(discord_token="token")
+    monitor = LoopMonitor(
+        interval_seconds=settings.loop_lag_interval_seconds,
+        slow_callback_seconds=settings.loop_slow_callback_seconds,
+    )
+
+    async def exercise() -> None:
+        monitor.start()
+        for pause in (0.1, 0.13, 0.17, 0.21):
+            # Vary where each block starts relative to the probe's heartbeat.
+            await asyncio.sleep(pause)
+            _block_loop(0.4)
+        await asyncio.sleep(0.1)
+        await monitor.close()
+
+    asyncio.run(exercise())
+
+    assert monitor.health().stalls == 4
+
+
+def test_interval_longer_than_half_the_threshold_is_rejected() -> None:
+    with pytest.raises(ValueError, match="at most half"):
+        LoopMonitor(interval_seconds=0.5, slow_callback_seconds=0.25)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Any, cast
+
+import aiohttp
+import pytest
+
+from beanbot.core.metrics import Histogram, MetricsRegistry, MetricsServer, MongoCommandMetrics
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("command_seconds", "Command latency.", ("command",), (0.1, 1.0))
+    histogram.observe(0.05, "meme")
+    histogram.observe(0.5, "meme")
+    histogram.observe(3.0, "meme")
+    histogram.observe(0.1, 'say "hi"')
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == [
+        "# HELP command_seconds Command latency.",
+        "# TYPE command_seconds histogram",
+    ]
+    assert 'command_seconds_bucket{command="meme",le="0.1"} 1' in lines
+    assert 'command_seconds_bucket{command="meme",le="1"} 2' in lines
+    assert 'command_seconds_bucket{command="meme",le="+Inf"} 3' in lines
+    assert 'command_seconds_sum{command="meme"} 3.55' in lines
+    assert 'command_seconds_count{command="meme"} 3' in lines
+    assert 'command_seconds_bucket{command="say \\"hi\\"",le="0.1"} 1' in lines
+
+
+def test_registry_returns_the_same_metric_when_redeclared() -> None:
+    registry = MetricsRegistry()
+    queued = registry.gauge("queued", "Queued work.")
+
+    assert registry.gauge("queued", "Queued work.") is queued
+    with pytest.raises(ValueError):
+        registry.histogram("queued", "Queued work.")
+    with pytest.raises(ValueError):
+        registry.gauge("queued", "Queued work.", ("guild",))
+
+
+def test_collectors_refresh_gauges_and_failures_do_not_break_rendering(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    registry = MetricsRegistry()
+    outcomes = registry.gauge("role_updates_total", "Role updates.", ("outcome",), kind="counter")
+
+    def broken() -> None:
+        raise RuntimeError("stats unavailable")
+
+    registry.add_collector(lambda: outcomes.set(4, "applied"))
+    registry.add_collector(broken)
+
+    with caplog.at_level(logging.ERROR):
+        rendered = registry.render()
+
+    assert "# TYPE role_updates_total counter" in rendered
+    assert 'role_updates_total{outcome="applied"} 4' in rendered
+    assert "Metrics collector failed" in caplog.text
+
+
+def test_mongo_listener_records_server_durations() -> None:
+    histogram = Histogram("mongo_seconds", "test", ("command", "outcome"))
+    listener = MongoCommandMetrics(histogram)
+
+    listener.succeeded(cast(Any, SimpleNamespace(command_name="find", duration_micros=1500)))
+    listener.failed(cast(Any, SimpleNamespace(command_name="insert", duration_micros=20)))
+
+    assert histogram.count("find", "ok") == 1
+    assert histogram.count("insert", "error") == 1
+
+
+def test_metrics_server_serves_the_registry() -> None:
+    registry = MetricsRegistry()
+    registry.gauge("up", "Process is running.").set(1)
+
+    async def exercise() -> tuple[int, str, str]:
+        server = MetricsServer(registry, host="127.0.0.1", port=0)
+        await server.start()
+        try:
+            async with (
+                aiohttp.ClientSession() as session,
+                session.get(f"http://127.0.0.1:{server.bound_port}/metrics") as response,
+            ):
+                return response.status, response.headers["Content-Type"], await response.text()
+        finally:
+            await server.close()
+
+    status, content_type, body = asyncio.run(exercise())
+
+    assert status == 200
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "up 1" in body.splitlines()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+
+from beanbot.core.profiling import CommandProfiler
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _command(busy: float, wait: float) -> str:
+    _busy(busy)
+    await asyncio.sleep(wait)
+    return "done"
+
+
+def _profiler(tmp_path: Path, keep_slowest: int = 10) -> CommandProfiler:
+    return CommandProfiler(tmp_path, enabled=True, sample_rate=1.0, keep_slowest=keep_slowest)
+
+
+def test_sampled_invocations_split_wall_time_into_cpu_and_await(tmp_path: Path) -> None:
+    profiler = _profiler(tmp_path)
+
+    assert asyncio.run(profiler.run("meme", _command(0.02, 0.05))) == "done"
+
+    (timing,) = profiler.recent
+    assert timing.name == "meme"
+    assert timing.profiled is True
+    assert timing.await_seconds >= 0.04
+    # The CPU clock can run slightly ahead of the wall clock, and a loaded machine can run the
+    # busy loop with less CPU than it had wall time, so only bound it by the active time.
+    assert 0 < timing.cpu_seconds <= timing.wall_seconds - timing.await_seconds + 0.005
+
+
+def test_unsampled_and_disabled_invocations_are_not_recorded(tmp_path: Path) -> None:
+    profiler = CommandProfiler(tmp_path, enabled=True, sample_rate=0.5, sample=lambda: 0.9)
+
+    asyncio.run(profiler.run("meme", _command(0, 0)))
+    profiler.configure(enabled=False, sample_rate=1.0)
+    asyncio.run(profiler.run("meme", _command(0, 0)))
+
+    assert profiler.sampled == 0
+
+
+def test_failures_are_recorded_and_reraised(tmp_path: Path) -> None:
+    profiler = _profiler(tmp_path)
+
+    async def failing() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(profiler.run("ping", failing()))
+
+    assert [timing.name for timing in profiler.recent] == ["ping"]
+
+
+def test_only_one_concurrent_invocation_is_under_cprofile(tmp_path: Path) -> None:
+    profiler = _profiler(tmp_path)
+
+    async def exercise() -> None:
+        await asyncio.gather(
+            profiler.run("first", _command(0, 0.01)),
+            profiler.run("second", _command(0, 0.01)),
+        )
+
+    asyncio.run(exercise())
+
+    assert sorted(timing.profiled for timing in profiler.recent) == [False, True]
+
+
+def test_slower_timing_only_invocations_do_not_evict_profiles(tmp_path: Path) -> None:
+    profiler = _profiler(tmp_path, keep_slowest=1)
+
+    async def exercise() -> None:
+        await asyncio.gather(
+            profiler.run("profiled", _command(0, 0.01)),
+            profiler.run("slow", _command(0, 0.05)),
+            profiler.run("slower", _command(0, 0.06)),
+        )
+
+    asyncio.run(exercise())
+
+    assert [timing.name for timing in profiler.slowest()] == ["slower"]
+    written = profiler.dump()
+    assert len(written) == 2
+    assert all("-profiled-" in path.name for path in written)
+
+
+def test_dump_writes_pstats_and_collapsed_stacks_for_the_slowest(tmp_path: Path) -> None:
+    profiler = _profiler(tmp_path, keep_slowest=2)
+
+    async def exercise() -> None:
+        for busy in (0.001, 0.03, 0.01):
+            await profiler.run("meme", _command(busy, 0))
+
+    asyncio.run(exercise())
+
+    slowest, runner_up = profiler.slowest()
+    assert slowest.wall_seconds >= 0.03 > runner_up.wall_seconds >= 0.01
+    written = profiler.dump()
+    assert len(written) == 4
+    slowest_stats = next(path for path in written if "-01-meme-" in path.name)
+    assert pstats.Stats(str(slowest_stats)).get_stats_profile().total_tt > 0
+    collapsed = next(path for path in written if path.suffix == ".collapsed").read_text()
+    stacks = [line.rsplit(" ", 1) for line in collapsed.splitlines()]
+    assert any("_busy (test_profiling.py" in stack for stack, _ in stacks)
+    assert all(int(micros) > 0 for _, micros in stacks)
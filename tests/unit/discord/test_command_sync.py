@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import discord
+from discord import app_commands
+
+from beanbot.discord.command_sync import (
+    CommandSyncState,
+    command_tree_fingerprint,
+    sync_command_tree,
+)
+
+
+class RecordingTree(app_commands.CommandTree[discord.Client]):
+    def __init__(self, client: discord.Client) -> None:
+        super().__init__(client)
+        self.synced: list[Any] = []
+
+    async def sync(self, *, guild: discord.abc.Snowflake | None = None) -> list[Any]:
+        self.synced.append(guild)
+        return []
+
+
+def _tree(description: str = "Check bot latency") -> RecordingTree:
+    tree = RecordingTree(discord.Client(intents=discord.Intents.none()))
+
+    @tree.command(name="ping", description=description)
+    async def ping(interaction: discord.Interaction) -> None:
+        return None
+
+    return tree
+
+
+def _fingerprint(tree: RecordingTree, guild: discord.abc.Snowflake | None = None) -> str:
+    return asyncio.run(command_tree_fingerprint(tree, guild))
+
+
+class FixedTranslator(app_commands.Translator):
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    async def translate(
+        self,
+        string: app_commands.locale_str,
+        locale: discord.Locale,
+        context: app_commands.TranslationContextTypes,
+    ) -> str | None:
+        if locale is discord.Locale.french and string.message == "Check bot latency":
+            return self.text
+        return None
+
+
+def test_fingerprint_changes_only_when_the_command_payload_changes() -> None:
+    assert _fingerprint(_tree()) == _fingerprint(_tree())
+    assert _fingerprint(_tree()) != _fingerprint(_tree("Pong"))
+
+
+def test_fingerprint_covers_translations() -> None:
+    def translated(text: str) -> str:
+        tree = _tree()
+        asyncio.run(tree.set_translator(FixedTranslator(text)))
+        return _fingerprint(tree)
+
+    assert translated("Latence") == translated("Latence")
+    assert translated("Latence") != translated("Latence du bot")
+    assert translated("Latence") != _fingerprint(_tree())
+
+
+def test_unchanged_tree_skips_the_bulk_overwrite(tmp_path: Path) -> None:
+    state = CommandSyncState(tmp_path / "command-sync.json")
+
+    def sync(tree: RecordingTree) -> bool:
+        return asyncio.run(
+            sync_command_tree(
+                tree,
+                mode="dev_guild",
+                dev_guild_id=42,
+                application_id=7,
+                state=state,
+            )
+        )
+
+    first, second, changed = _tree(), _tree(), _tree("Pong")
+
+    assert sync(first) is True
+    assert sync(second) is False
+    assert sync(changed) is True
+    assert [guild.id for guild in first.synced] == [42]
+    assert second.synced == []
+    assert state.get("7:guild:42") == _fingerprint(changed, discord.Object(id=42))
+
+
+def test_auto_mode_without_dev_guild_does_not_sync(tmp_path: Path) -> None:
+    tree = _tree()
+
+    synced = asyncio.run(
+        sync_command_tree(
+            tree,
+            mode="auto",
+            dev_guild_id=0,
+            application_id=7,
+            state=CommandSyncState(tmp_path / "command-sync.json"),
+        )
+    )
+
+    assert synced is False
+    assert tree.synced == []
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from types import SimpleNamespace
+from typing import Any, cast
+
+import discord
+import pytest
+from discord import app_commands
+from discord.ext import commands
+
+from beanbot.core.config import Settings
+from beanbot.discord.bot import create_bot
+from beanbot.discord.instrumentation import BotMetrics
+
+
+def _interaction(name: str | None) -> Any:
+    command = None if name is None else SimpleNamespace(qualified_name=name, name=name)
+    return SimpleNamespace(
+        type=discord.InteractionType.application_command,
+        command=command,
+        extras={},
+        guild_id=1,
+        channel_id=2,
+        user=SimpleNamespace(id=3),
+    )
+
+
+def test_app_commands_are_timed_from_handler_entry_once() -> None:
+    metrics = BotMetrics()
+    meme = _interaction("meme")
+    unknown = _interaction(None)
+
+    metrics.app_command_started(meme)
+    metrics.app_command_finished(meme, "ok")
+    metrics.app_command_finished(meme, "error")
+    metrics.app_command_started(unknown)
+    metrics.app_command_finished(unknown, "error")
+
+    assert metrics.commands.count("meme", "ok") == 1
+    assert metrics.commands.count("meme", "error") == 0
+    assert 'beanbot_command_seconds_count{command="meme",outcome="ok"} 1' in (
+        metrics.registry.render()
+    )
+
+
+def test_failed_slash_commands_are_recorded_as_errors() -> None:
+    async def exercise() -> None:
+        bot = create_bot(Settings(discord_token="token"))
+        interaction = _interaction("ping")
+        interaction.command._has_any_error_handlers = lambda: True
+
+        assert await bot.tree.interaction_check(interaction)
+        await bot.tree.on_error(interaction, app_commands.AppCommandError("boom"))
+
+        assert bot.metrics.commands.count("ping", "error") == 1
+
+    asyncio.run(exercise())
+
+
+def test_prefix_commands_are_timed_inside_invoke(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fail(self: commands.Bot, ctx: Any, /) -> None:
+        # Bot.invoke reports command errors through on_command_error instead of raising.
+        ctx.command_failed = ctx.command.qualified_name == "ping"
+
+    monkeypatch.setattr(commands.Bot, "invoke", fail)
+
+    async def exercise() -> None:
+        bot = create_bot(Settings(discord_token="token"))
+        for name in ("meme", "ping"):
+            ctx = SimpleNamespace(
+                command=SimpleNamespace(qualified_name=name),
+                command_failed=False,
+                guild=None,
+                channel=SimpleNamespace(id=2),
+                author=SimpleNamespace(id=3),
+            )
+            await bot.invoke(cast(Any, ctx))
+
+        assert bot.metrics.commands.count("meme", "ok") == 1
+        assert bot.metrics.commands.count("ping", "error") == 1
+
+    asyncio.run(exercise())
+
+
+def test_cog_listeners_are_timed_and_can_still_be_removed() -> None:
+    async def exercise() -> None:
+        bot = create_bot(Settings(discord_token="token"))
+        calls: list[int] = []
+
+        async def on_raw_reaction_add(payload: int) -> None:
+            calls.append(payload)
+
+        bot.add_listener(on_raw_reaction_add)
+        (listener,) = bot.extra_events["on_raw_reaction_add"]
+        await listener(7)
+
+        assert calls == [7]
+        histogram = bot.metrics.listeners
+        assert histogram.count("on_raw_reaction_add", on_raw_reaction_add.__qualname__) == 1
+
+        bot.remove_listener(on_raw_reaction_add)
+        assert bot.extra_events["on_raw_reaction_add"] == []
+
+    asyncio.run(exercise())
+
+
+def test_gateway_latency_skips_unconnected_shards() -> None:
+    metrics = BotMetrics()
+
+    metrics.record_gateway_latencies({0: 0.05, 1: math.inf})
+    rendered = metrics.registry.render()
+
+    assert 'beanbot_gateway_latency_seconds{shard="0"} 0.05' in rendered
+    assert 'shard="1"' not in rendered
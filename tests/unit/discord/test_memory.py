@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from beanbot.discord.memory import cache_policy, feature_cache_needs, guild_cache_report
+
+
+def test_lean_profile_drops_caches_no_feature_needs() -> None:
+    policy = cache_policy("lean", frozenset())
+
+    assert policy.max_messages is None
+    assert policy.chunk_guilds_at_startup is False
+    assert (policy.member_cache_flags.voice, policy.member_cache_flags.joined) == (False, False)
+    assert policy.intents.message_content is True
+    assert policy.intents.members is False
+    assert policy.intents.typing is False
+
+
+def test_lean_profile_keeps_declared_caches() -> None:
+    policy = cache_policy("lean", {"messages", "voice", "member_chunking"})
+
+    assert policy.max_messages == 1000
+    assert policy.chunk_guilds_at_startup is True
+    assert policy.intents.members is True
+    assert (policy.member_cache_flags.voice, policy.member_cache_flags.joined) == (True, True)
+
+
+def test_default_profile_keeps_discord_py_caching() -> None:
+    policy = cache_policy("default", frozenset())
+
+    assert policy.max_messages == 1000
+    assert policy.member_cache_flags.voice is True
+    assert policy.intents.typing is True
+
+
+def test_feature_cache_needs_unions_loaded_extensions() -> None:
+    needs = {"a": frozenset({"messages"}), "b": frozenset({"voice"}), "c": frozenset({"members"})}
+
+    assert feature_cache_needs(("a", "b", "missing"), needs) == {"messages", "voice"}
+
+
+def test_guild_cache_report_orders_guilds_by_estimated_size() -> None:
+    def guild(guild_id: int, members: int) -> Any:
+        return SimpleNamespace(
+            id=guild_id,
+            name=f"guild {guild_id}",
+            members=[SimpleNamespace(id=index, name="member") for index in range(members)],
+            roles=[SimpleNamespace(id=1)],
+            channels=[],
+            emojis=[],
+        )
+
+    small, large = guild(1, 2), guild(2, 200)
+    messages = [SimpleNamespace(guild=small), SimpleNamespace(guild=None)]
+
+    report = guild_cache_report([small, large], cast(Any, messages))
+
+    assert [usage.guild_id for usage in report] == [2, 1]
+    assert (report[0].members, report[1].members, report[1].messages) == (200, 2, 1)
+    assert report[0].approx_bytes > report[1].approx_bytes
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import math
+
+import pytest
+
+from beanbot.core.config import Settings
+from beanbot.discord.bot import BeanBot, ShardedBeanBot, create_bot
+from beanbot.discord.sharding import (
+    ShardTracker,
+    format_latency,
+    parse_shard_ids,
+    shard_for_guild,
+)
+
+
+def test_parse_shard_ids_expands_ranges() -> None:
+    assert parse_shard_ids("4-6, 0,5") == (0, 4, 5, 6)
+    assert parse_shard_ids("") == ()
+    with pytest.raises(ValueError):
+        parse_shard_ids("3-1")
+
+
+def test_shard_for_guild_uses_discords_formula() -> None:
+    guild_id = (7 << 22) | 12345
+    assert shard_for_guild(guild_id, 4) == 3
+    assert shard_for_guild(guild_id, 0) == 0
+
+
+def test_format_latency_handles_unconnected_shards() -> None:
+    assert format_latency(0.0424) == "42ms"
+    assert format_latency(math.inf) == "n/a"
+    assert format_latency(math.nan) == "n/a"
+
+
+def test_ready_shards_yields_each_shard_once_as_it_becomes_ready() -> None:
+    async def exercise() -> list[int]:
+        tracker = ShardTracker()
+        seen: list[int] = []
+
+        async def collect() -> None:
+            async for shard_id in tracker.ready_shards(lambda: (0, 1, 2)):
+                seen.append(shard_id)
+
+        task = asyncio.create_task(collect())
+        for shard_id in (2, 0, 2, 1):
+            await asyncio.sleep(0)
+            tracker.ready(shard_id)
+        await asyncio.wait_for(task, timeout=1)
+        return seen
+
+    assert asyncio.run(exercise()) == [2, 0, 1]
+
+
+def test_tracker_counts_disconnects() -> None:
+    tracker = ShardTracker(clock=lambda: 5.0)
+    assert tracker.ready(1) is True
+    tracker.disconnected(1)
+    tracker.connected(1)
+    assert tracker.ready(1) is False
+
+    (status,) = tracker.statuses()
+    assert (status.shard_id, status.connected, status.disconnects, status.ready_at) == (
+        1,
+        True,
+        1,
+        5.0,
+    )
+
+
+def test_create_bot_selects_the_sharding_mode() -> None:
+    async def exercise() -> None:
+        plain = create_bot(Settings(discord_token="token"))
+        assert type(plain) is BeanBot
+        assert plain.local_shard_ids() == (0,)
+
+        explicit = create_bot(
+            Settings(discord_token="token", shard_mode="explicit", shard_count=8, shard_ids="2-3")
+        )
+        assert isinstance(explicit, ShardedBeanBot)
+        assert explicit.local_shard_ids() == (2, 3)
+        assert explicit.shard_count == 8
+
+        with pytest.raises(ValueError):
+            create_bot(
+                Settings(discord_token="token", shard_mode="explicit", shard_count=2, shard_ids="2")
+            )
+
+    asyncio.run(exercise())
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from beanbot.discord.startup import StartupTimeline, load_feature_extensions
+
+
+def test_extensions_wait_only_for_their_own_resources() -> None:
+    events: list[str] = []
+
+    async def exercise() -> None:
+        mongo_ready = asyncio.Event()
+
+        async def connect_mongo() -> None:
+            await mongo_ready.wait()
+            events.append("mongo")
+
+        async def load(extension: str) -> None:
+            events.append(extension)
+            if extension == "plain":
+                mongo_ready.set()
+
+        resources = {"mongo": asyncio.ensure_future(connect_mongo())}
+        timeline = StartupTimeline()
+        await load_feature_extensions(
+            load,
+            ("needs_mongo", "plain"),
+            {"needs_mongo": frozenset({"mongo"})},
+            resources,
+            timeline,
+        )
+        assert {phase.name for phase in timeline.phases} == {
+            "extension needs_mongo",
+            "extension plain",
+        }
+
+    asyncio.run(exercise())
+
+    assert events == ["plain", "mongo", "needs_mongo"]
+
+
+def test_unknown_startup_resource_is_rejected() -> None:
+    async def load(extension: str) -> None:
+        raise AssertionError("nothing should load")
+
+    with pytest.raises(ValueError, match="redis"):
+        asyncio.run(
+            load_feature_extensions(
+                load,
+                ("needs_redis",),
+                {"needs_redis": frozenset({"redis"})},
+                {},
+                StartupTimeline(),
+            )
+        )
+
+
+def test_a_failed_extension_cancels_the_loads_still_running() -> None:
+    cancelled: list[str] = []
+
+    async def exercise() -> None:
+        mongo = asyncio.get_running_loop().create_future()
+
+        async def load(extension: str) -> None:
+            if extension == "broken":
+                raise RuntimeError("broken extension")
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(extension)
+                raise
+
+        with pytest.raises(RuntimeError, match="broken extension"):
+            await load_feature_extensions(
+                load,
+                ("slow", "needs_mongo", "broken"),
+                {"needs_mongo": frozenset({"mongo"})},
+                {"mongo": mongo},
+                StartupTimeline(),
+            )
+        assert not mongo.cancelled()
+
+    asyncio.run(exercise())
+
+    assert cancelled == ["slow"]
@@ -22,6 +22,9 @@ class FakePunRepository:
     def get_random_pun(self) -> str:
         return "a migrated pun"
 
+    def get_next_pun(self) -> str:
+        return "a migrated pun"
+
 
 class FakeTextChannel:
     def __init__(self) -> None:
@@ -33,7 +36,7 @@ class FakeTextChannel:
 
 class FakeBot:
     def __init__(self, channel: FakeTextChannel | None = None) -> None:
-        self.http_session = object()
+        self.outbound_http = object()
         self.channel = channel
         self.fetch_count = 0
 
@@ -59,12 +62,12 @@ def test_meme_command_fetches_and_replies_with_embed(monkeypatch: Any) -> None:
     )
 
     class FakeClient:
-        async def get_meme(self, subreddit: str | None = None) -> Meme:
+        async def get_memes(self, subreddit: str | None, count: int) -> list[Meme]:
             assert subreddit == "beans"
-            return result
+            return [result]
 
-    monkeypatch.setattr(meme_cog, "MemeApiClient", lambda session: FakeClient())
-    cog = meme_cog.MemeCog(SimpleNamespace(http_session=object()))
+    monkeypatch.setattr(meme_cog, "MemeApiClient", lambda http: FakeClient())
+    cog = meme_cog.MemeCog(SimpleNamespace(outbound_http=object()))
     context = FakeContext()
 
     asyncio.run(meme_cog.MemeCog.meme.callback(cog, context, "beans"))
@@ -77,7 +80,7 @@ def test_meme_command_fetches_and_replies_with_embed(monkeypatch: Any) -> None:
 
 def test_uwu_command_does_not_run_meme_fetch_logic(monkeypatch: Any) -> None:
     monkeypatch.setattr(meme_cog, "_uwuify", lambda text: f"uwu:{text}")
-    cog = meme_cog.MemeCog(SimpleNamespace(http_session=object()))
+    cog = meme_cog.MemeCog(SimpleNamespace(outbound_http=object()))
     context = FakeContext()
 
     asyncio.run(meme_cog.MemeCog.uwu.callback(cog, context, text="beans"))
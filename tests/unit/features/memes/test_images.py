@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, cast
+
+from beanbot.core.http import OutboundHttp
+from beanbot.features.memes.images import ImageCache, sniff_image_extension
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+GIF = b"GIF89a" + b"\x00" * 10
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    def raise_for_status(self) -> None:
+        assert self.status < 400
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class FakeHttp:
+    def __init__(self, *responses: FakeResponse) -> None:
+        self.responses = list(responses)
+        self.requests: list[tuple[str, dict[str, str]]] = []
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs: Any) -> AsyncIterator[FakeResponse]:
+        self.requests.append((url, kwargs.get("headers", {})))
+        yield self.responses.pop(0)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(http: FakeHttp, clock: FakeClock, **options: Any) -> ImageCache:
+    return ImageCache(cast(OutboundHttp, http), clock=clock, revalidate_seconds=60, **options)
+
+
+def test_magic_bytes_decide_the_extension() -> None:
+    assert sniff_image_extension(PNG) == "png"
+    assert sniff_image_extension(b"\xff\xd8\xff\xe0") == "jpg"
+    assert sniff_image_extension(GIF) == "gif"
+    assert sniff_image_extension(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert sniff_image_extension(b"<html>") is None
+
+
+def test_fresh_entries_are_served_without_a_request_and_stale_ones_revalidate() -> None:
+    clock = FakeClock()
+    http = FakeHttp(
+        FakeResponse(200, GIF, {"Content-Type": "image/png", "ETag": '"v1"'}),
+        FakeResponse(304, b"", {}),
+    )
+    cache = _cache(http, clock)
+
+    async def exercise() -> None:
+        first = await cache.get("https://example.test/toes")
+        second = await cache.get("https://example.test/toes")
+        clock.now = 61
+        third = await cache.get("https://example.test/toes")
+        assert first.extension == "gif"
+        assert second.data == third.data == GIF
+
+    asyncio.run(exercise())
+
+    assert http.requests == [
+        ("https://example.test/toes", {}),
+        ("https://example.test/toes", {"If-None-Match": '"v1"'}),
+    ]
+
+
+def test_least_recently_used_image_is_evicted_over_the_byte_cap() -> None:
+    clock = FakeClock()
+    http = FakeHttp(
+        FakeResponse(200, PNG, {}),
+        FakeResponse(200, GIF, {}),
+        FakeResponse(200, PNG, {}),
+    )
+    cache = _cache(http, clock, max_bytes=len(PNG) + 1)
+
+    async def exercise() -> None:
+        await cache.get("https://example.test/a")
+        await cache.get("https://example.test/b")
+        await cache.get("https://example.test/a")
+
+    asyncio.run(exercise())
+
+    assert [url for url, _ in http.requests] == [
+        "https://example.test/a",
+        "https://example.test/b",
+        "https://example.test/a",
+    ]
+
+
+def test_disk_cache_survives_a_new_instance(tmp_path: Path) -> None:
+    clock = FakeClock()
+    first_http = FakeHttp(FakeResponse(200, PNG, {"Last-Modified": "yesterday"}))
+    second_http = FakeHttp()
+
+    asyncio.run(_cache(first_http, clock, directory=tmp_path).get("https://example.test/a"))
+    image = asyncio.run(
+        _cache(second_http, clock, directory=tmp_path).get("https://example.test/a")
+    )
+
+    assert image.data == PNG
+    assert image.metadata.last_modified == "yesterday"
+    assert second_http.requests == []
+
+
+def test_changed_content_releases_the_previous_body(tmp_path: Path) -> None:
+    clock = FakeClock()
+    http = FakeHttp(FakeResponse(200, PNG, {}), FakeResponse(200, GIF, {}))
+    cache = _cache(http, clock, directory=tmp_path)
+
+    async def exercise() -> None:
+        await cache.get("https://example.test/toes")
+        clock.now = 61
+        image = await cache.get("https://example.test/toes")
+        assert image.data == GIF
+
+    asyncio.run(exercise())
+
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".gif", ".json"]
+    assert list(cache._bodies.values()) == [GIF]
+
+
+def test_image_is_served_when_the_disk_write_fails(tmp_path: Path) -> None:
+    blocked = tmp_path / "not-a-directory"
+    blocked.write_bytes(b"")
+    cache = _cache(FakeHttp(FakeResponse(200, PNG, {})), FakeClock(), directory=blocked)
+
+    image = asyncio.run(cache.get("https://example.test/toes"))
+
+    assert image.data == PNG
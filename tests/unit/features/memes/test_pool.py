@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from typing import cast
+
+import pytest
+
+from beanbot.features.memes.api import Meme, MemeApiClient, MemeApiError
+from beanbot.features.memes.pool import MemePool
+
+
+def _meme(number: int, *, nsfw: bool = False) -> Meme:
+    return Meme(
+        post_link=f"https://example.test/{number}",
+        subreddit="beans",
+        title=f"Bean {number}",
+        url=f"https://example.test/{number}.png",
+        nsfw=nsfw,
+        spoiler=False,
+        author="poster",
+        ups=number,
+    )
+
+
+class FakeClient:
+    def __init__(self, *batches: list[Meme]) -> None:
+        self.batches = list(batches)
+        self.requests: list[tuple[str | None, int]] = []
+
+    async def get_memes(self, subreddit: str | None, count: int) -> list[Meme]:
+        self.requests.append((subreddit, count))
+        return self.batches.pop(0) if self.batches else []
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sfw_channels_only_receive_sfw_memes_from_one_batch() -> None:
+    client = FakeClient([_meme(1, nsfw=True), _meme(2), _meme(3)])
+    pool = MemePool(cast(MemeApiClient, client), batch_size=3, low_water=0)
+
+    async def exercise() -> list[Meme]:
+        return [await pool.get("Beans", allow_nsfw=False) for _ in range(2)]
+
+    memes = asyncio.run(exercise())
+
+    assert [meme.post_link for meme in memes] == [_meme(2).post_link, _meme(3).post_link]
+    assert client.requests == [("beans", 3)]
+
+
+def test_refill_runs_in_background_below_low_water() -> None:
+    client = FakeClient([_meme(1), _meme(2), _meme(3)], [_meme(4), _meme(5)])
+    pool = MemePool(cast(MemeApiClient, client), batch_size=3, low_water=3)
+
+    async def exercise() -> None:
+        await pool.get(None, allow_nsfw=False)
+        assert len(client.requests) == 1
+        await asyncio.sleep(0)
+        assert len(client.requests) == 2
+
+    asyncio.run(exercise())
+
+
+def test_expired_memes_are_discarded() -> None:
+    clock = FakeClock()
+    client = FakeClient([_meme(1), _meme(2)], [_meme(3)])
+    pool = MemePool(
+        cast(MemeApiClient, client), batch_size=2, low_water=0, ttl_seconds=10, clock=clock
+    )
+
+    async def exercise() -> Meme:
+        await pool.get(None, allow_nsfw=False)
+        clock.now = 11
+        return await pool.get(None, allow_nsfw=False)
+
+    assert asyncio.run(exercise()).post_link == _meme(3).post_link
+
+
+def test_least_recently_used_subreddit_is_evicted() -> None:
+    client = FakeClient([_meme(1), _meme(2)], [_meme(3), _meme(4)], [_meme(5), _meme(6)])
+    pool = MemePool(cast(MemeApiClient, client), batch_size=2, low_water=0, max_subreddits=1)
+
+    async def exercise() -> None:
+        await pool.get("a", allow_nsfw=False)
+        await pool.get("b", allow_nsfw=False)
+        await pool.get("a", allow_nsfw=False)
+
+    asyncio.run(exercise())
+
+    assert [subreddit for subreddit, _ in client.requests] == ["a", "b", "a"]
+
+
+def test_only_nsfw_results_fail_in_a_sfw_channel() -> None:
+    client = FakeClient([_meme(1, nsfw=True)])
+    pool = MemePool(cast(MemeApiClient, client), batch_size=1, low_water=0)
+
+    with pytest.raises(MemeApiError, match="No SFW meme"):
+        asyncio.run(pool.get(None, allow_nsfw=False))
+
+
+def test_empty_results_in_an_nsfw_channel_do_not_mention_sfw() -> None:
+    pool = MemePool(cast(MemeApiClient, FakeClient([])), batch_size=1, low_water=0)
+
+    with pytest.raises(MemeApiError, match="No meme was available"):
+        asyncio.run(pool.get(None, allow_nsfw=True))
+
+
+def test_awaited_refill_failure_is_raised_without_being_logged(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    class FailingClient:
+        async def get_memes(self, subreddit: str | None, count: int) -> list[Meme]:
+            raise MemeApiError("meme-api.com is down")
+
+    pool = MemePool(cast(MemeApiClient, FailingClient()), batch_size=1, low_water=0)
+
+    async def exercise() -> None:
+        with pytest.raises(MemeApiError, match="is down"):
+            await pool.get(None, allow_nsfw=False)
+        await asyncio.sleep(0)
+
+    asyncio.run(exercise())
+
+    assert "Meme prefetch failed" not in caplog.text
+
+
+def test_background_refill_failure_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    class FailingClient:
+        async def get_memes(self, subreddit: str | None, count: int) -> list[Meme]:
+            raise MemeApiError("meme-api.com is down")
+
+    pool = MemePool(cast(MemeApiClient, FailingClient()), batch_size=1, low_water=0)
+
+    async def exercise() -> None:
+        pool.prefetch("beans")
+        await asyncio.sleep(0.01)
+
+    asyncio.run(exercise())
+
+    assert "Meme prefetch failed: meme-api.com is down" in caplog.text
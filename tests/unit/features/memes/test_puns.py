@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from pytest import MonkeyPatch
+
+from beanbot.features.memes import puns
+from beanbot.features.memes.puns import PunRepository
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write_csv(path: Path, *rows: str) -> None:
+    path.write_text("BadPost\n" + "".join(f'"{row}"\n' for row in rows), encoding="utf-8")
+
+
+def test_packaged_puns_load_into_the_compact_corpus() -> None:
+    repository = PunRepository()
+
+    assert repository.get_random_pun() != "Pun list is empty right now. :("
+
+
+def test_compiled_cache_is_reused_without_parsing_the_csv(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    source = tmp_path / "puns.csv"
+    cache = tmp_path / "state" / "puns.bin"
+    _write_csv(source, "Bean there, done that")
+    assert (
+        PunRepository(source=source, cache_path=cache).get_random_pun() == "Bean there, done that"
+    )
+
+    def unexpected_parse(raw: bytes) -> list[str]:
+        raise AssertionError("the compiled cache should have been used")
+
+    monkeypatch.setattr(puns, "_parse_puns", unexpected_parse)
+
+    assert (
+        PunRepository(source=source, cache_path=cache).get_random_pun() == "Bean there, done that"
+    )
+
+
+def test_changed_csv_is_reloaded_after_the_check_interval(tmp_path: Path) -> None:
+    source = tmp_path / "puns.csv"
+    clock = FakeClock()
+    _write_csv(source, "old pun")
+    repository = PunRepository(source=source, reload_check_seconds=30, clock=clock)
+    assert repository.get_random_pun() == "old pun"
+
+    _write_csv(source, "new pun")
+    os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 1_000_000_000))
+    assert repository.get_random_pun() == "old pun"
+
+    clock.now += 30
+    assert repository.get_random_pun() == "new pun"
+
+
+def test_shuffle_bag_uses_every_pun_before_repeating(tmp_path: Path) -> None:
+    source = tmp_path / "puns.csv"
+    _write_csv(source, "one", "two", "three")
+    repository = PunRepository(source=source)
+
+    first_round = {repository.get_next_pun() for _ in range(3)}
+    second_round = {repository.get_next_pun() for _ in range(3)}
+
+    assert first_round == second_round == {"one", "two", "three"}
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
 from types import SimpleNamespace
 from typing import Any, cast
 
 import discord
 from pymongo.errors import OperationFailure
-from pytest import MonkeyPatch
+from pytest import LogCaptureFixture, MonkeyPatch
 
 from beanbot.discord.bot import BeanBot
+from beanbot.discord.instrumentation import BotMetrics
 from beanbot.features.role_menus import cog as role_menu_cog
-from beanbot.features.role_menus.cog import RoleMenusCog
+from beanbot.features.role_menus.cog import RestoreSummary, RoleMenusCog
 from beanbot.features.role_menus.models import RoleMenu, StoredRole
 from beanbot.features.role_menus.repository import RoleMenuRepository
 
@@ -54,6 +56,12 @@ class FakeBot:
         self.settings = object()
         self.channel = channel
         self.added_views: list[tuple[discord.ui.View, int]] = []
+        self.metrics = BotMetrics()
+        self.shard_count: int | None = 1
+        # The shard count automatic sharding settles on once shards launch.
+        self.launched_shard_count: int | None = None
+        self.local_shards: tuple[int, ...] = (0,)
+        self.intents = discord.Intents.default()
 
     def get_channel(self, channel_id: int) -> FakeChannel | None:
         return self.channel
@@ -65,6 +73,18 @@ class FakeBot:
     def add_view(self, view: discord.ui.View, *, message_id: int) -> None:
         self.added_views.append((view, message_id))
 
+    async def wait_until_ready(self) -> None:
+        return None
+
+    def shard_for_guild(self, guild_id: int) -> int:
+        return guild_id % (self.shard_count or 1)
+
+    async def ready_shards(self) -> AsyncIterator[int]:
+        if self.launched_shard_count is not None:
+            self.shard_count = self.launched_shard_count
+        for shard_id in self.local_shards:
+            yield shard_id
+
 
 class FakeRestoreRepository:
     def __init__(self, menu: RoleMenu) -> None:
@@ -78,6 +98,12 @@ class FakeRestoreRepository:
         return (self.menu,)
 
 
+async def _load_and_restore(cog: RoleMenusCog) -> RestoreSummary:
+    await cog.cog_load()
+    assert cog.restore_task is not None
+    return await cog.restore_task
+
+
 def test_startup_reconciliation_repairs_a_stored_menu_without_components() -> None:
     menu = _menu()
     message = FakeMessage()
@@ -86,11 +112,12 @@ def test_startup_reconciliation_repairs_a_stored_menu_without_components() -> No
     cog = RoleMenusCog(cast(BeanBot, bot))
     cog.repository = cast(RoleMenuRepository, repository)
 
-    asyncio.run(cog.cog_load())
+    summary = asyncio.run(_load_and_restore(cog))
 
     assert repository.initialized is True
     assert message.edited_view is not None
     assert bot.added_views == [(message.edited_view, menu.message_id)]
+    assert (summary.restored, summary.repaired, summary.failed) == (0, 1, 0)
 
 
 def test_startup_reconciliation_repairs_a_disabled_select() -> None:
@@ -109,12 +136,62 @@ def test_startup_reconciliation_repairs_a_disabled_select() -> None:
     cog = RoleMenusCog(cast(BeanBot, bot))
     cog.repository = cast(RoleMenuRepository, repository)
 
-    asyncio.run(cog.cog_load())
+    asyncio.run(_load_and_restore(cog))
 
     assert message.edited_view is not None
     assert bot.added_views == [(message.edited_view, menu.message_id)]
 
 
+def test_views_are_registered_before_reconciliation_and_failures_are_counted() -> None:
+    menu = _menu()
+    bot = FakeBot()
+
+    async def fetch_channel(channel_id: int) -> FakeChannel:
+        assert len(bot.added_views) == 1
+        response = SimpleNamespace(status=404, reason="Not Found")
+        raise discord.NotFound(cast(Any, response), "unknown channel")
+
+    bot.fetch_channel = fetch_channel  # type: ignore[method-assign]
+    cog = RoleMenusCog(cast(BeanBot, bot))
+    cog.repository = cast(RoleMenuRepository, FakeRestoreRepository(menu))
+
+    summary = asyncio.run(_load_and_restore(cog))
+
+    assert [message_id for _, message_id in bot.added_views] == [menu.message_id]
+    assert (summary.restored, summary.repaired, summary.failed) == (0, 0, 1)
+
+
+def test_reconciliation_skips_menus_owned_by_another_processes_shards() -> None:
+    menu = _menu()
+    message = FakeMessage()
+    bot = FakeBot(FakeChannel(message))
+    bot.shard_count = 2
+    bot.local_shards = (0,)
+    cog = RoleMenusCog(cast(BeanBot, bot))
+    cog.repository = cast(RoleMenuRepository, FakeRestoreRepository(menu))
+
+    summary = asyncio.run(_load_and_restore(cog))
+
+    assert message.edited_view is None
+    assert (summary.skipped, summary.shards, summary.channels) == (1, 0, 0)
+
+
+def test_reconciliation_groups_by_the_shard_count_known_once_shards_launch() -> None:
+    menu = _menu()
+    message = FakeMessage()
+    bot = FakeBot(FakeChannel(message))
+    bot.shard_count = None
+    bot.launched_shard_count = 2
+    bot.local_shards = (1,)
+    cog = RoleMenusCog(cast(BeanBot, bot))
+    cog.repository = cast(RoleMenuRepository, FakeRestoreRepository(menu))
+
+    summary = asyncio.run(_load_and_restore(cog))
+
+    assert message.edited_view is not None
+    assert (summary.skipped, summary.repaired, summary.shards) == (0, 1, 1)
+
+
 class FakeFailingRepository:
     def __init__(self) -> None:
         self.delete_attempted = False
@@ -231,3 +308,108 @@ def test_creation_cleanup_continues_when_repository_cleanup_fails() -> None:
     assert repository.delete_attempted is True
     assert message.delete_attempted is True
     assert followup.messages == [("I could not create that self-role menu.", True)]
+    assert cog.views == {}
+
+
+class FakeSavingRepository:
+    def __init__(self) -> None:
+        self.external_saves: list[RoleMenu] = []
+        self.menus: dict[int, RoleMenu] = {}
+        self.writing: set[int] = set()
+
+    async def save(self, menu: RoleMenu) -> None:
+        self.menus[menu.message_id] = menu
+
+    def is_writing(self, message_id: int) -> bool:
+        return message_id in self.writing
+
+    def holds(self, menu: RoleMenu) -> bool:
+        return self.menus.get(menu.message_id) == menu
+
+    def apply_external_save(self, menu: RoleMenu) -> None:
+        self.external_saves.append(menu)
+        self.menus[menu.message_id] = menu
+
+    def apply_external_delete(self, message_id: int) -> bool:
+        return self.menus.pop(message_id, None) is not None
+
+
+class EchoingMessage(FakeMessage):
+    """Deliver the watcher's report of the new menu while the message edit is in flight."""
+
+    def __init__(self, cog: RoleMenusCog) -> None:
+        super().__init__()
+        self.cog = cog
+
+    async def edit(self, *, view: discord.ui.View) -> None:
+        self.cog._apply_remote_save(_menu())
+        await super().edit(view=view)
+
+
+def test_own_insert_echoed_by_the_watcher_does_not_register_a_second_view() -> None:
+    bot = FakeBot()
+    cog = RoleMenusCog(cast(BeanBot, bot))
+    repository = FakeSavingRepository()
+    cog.repository = cast(RoleMenuRepository, repository)
+    message = EchoingMessage(cog)
+    interaction = cast(
+        discord.Interaction, cast(Any, type("Interaction", (), {"followup": FakeFollowup()})())
+    )
+
+    created = asyncio.run(
+        cog._persist_role_menu(
+            cast(RoleMenuRepository, repository),
+            interaction,
+            cast(discord.Message, message),
+            _menu(),
+            1,
+        )
+    )
+
+    assert created is True
+    assert bot.added_views == []
+    assert cog.views[3] is message.edited_view
+
+
+def test_echoes_of_own_writes_are_not_logged_as_remote_changes(
+    caplog: LogCaptureFixture,
+) -> None:
+    cog = RoleMenusCog(cast(BeanBot, FakeBot()))
+    repository = FakeSavingRepository()
+    cog.repository = cast(RoleMenuRepository, repository)
+    asyncio.run(repository.save(_menu()))
+    cog._register_view(_menu())
+    view = cog.views[3]
+
+    with caplog.at_level("INFO", logger=role_menu_cog.__name__):
+        # The stream reports a save after it settled, and a delete while it is in flight.
+        cog._apply_remote_save(_menu())
+        repository.writing.add(3)
+        cog._apply_remote_delete(3)
+        repository.writing.clear()
+        # A delete echo for a menu this process already dropped.
+        cog._apply_remote_delete(4)
+
+    assert caplog.records == []
+    assert repository.external_saves == []
+    assert cog.views == {3: view}
+
+
+def test_remote_changes_are_applied_and_logged(caplog: LogCaptureFixture) -> None:
+    cog = RoleMenusCog(cast(BeanBot, FakeBot()))
+    repository = FakeSavingRepository()
+    cog.repository = cast(RoleMenuRepository, repository)
+    renamed = RoleMenu(guild_id=1, channel_id=2, message_id=3, label="Renamed", roles=_menu().roles)
+
+    with caplog.at_level("INFO", logger=role_menu_cog.__name__):
+        cog._apply_remote_save(_menu())
+        cog._apply_remote_save(renamed)
+        cog._apply_remote_delete(3)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Applied role-menu change from another process: message=3",
+        "Applied role-menu change from another process: message=3",
+        "Applied role-menu deletion from another process: message=3",
+    ]
+    assert repository.external_saves == [_menu(), renamed]
+    assert cog.views == {}
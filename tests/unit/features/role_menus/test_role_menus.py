@@ -10,6 +10,7 @@ from pytest import MonkeyPatch
 
 from beanbot.features.role_menus import views
 from beanbot.features.role_menus.models import (
+    CachedRoleMenu,
     RoleMenu,
     StoredRole,
     menu_from_document,
@@ -21,12 +22,25 @@ from beanbot.features.role_menus.service import LegacyReactionRoleService, toggl
 from beanbot.features.role_menus.views import SelfRoleMenuView
 
 
+def _role(role_id: int, name: str) -> SimpleNamespace:
+    return SimpleNamespace(id=role_id, name=name, is_default=lambda: False)
+
+
 class FakeMember:
     def __init__(self, roles: list[Any]) -> None:
         self.id = 50
+        self.guild = SimpleNamespace(id=1)
         self.roles = roles
         self.added: tuple[Any, ...] = ()
         self.removed: tuple[Any, ...] = ()
+        self.edits: list[str] = []
+
+    async def edit(self, *, roles: list[Any], reason: str) -> None:
+        kept_ids = {role.id for role in roles}
+        self.added = tuple(role for role in roles if role not in self.roles)
+        self.removed = tuple(role for role in self.roles if role.id not in kept_ids)
+        self.roles = list(roles)
+        self.edits.append(reason)
 
     async def add_roles(self, *roles: Any, reason: str) -> None:
         self.added = roles
@@ -56,6 +70,7 @@ class FakeCollection:
         }
         self.dropped_indexes: list[str] = []
         self.fail_updates = False
+        self.bulk_writes: list[int] = []
 
     async def create_index(self, keys: Any, *, name: str, **options: Any) -> None:
         self.indexes.append(name)
@@ -110,6 +125,13 @@ class FakeCollection:
         if document is not None:
             document.update(update["$set"])
 
+    async def bulk_write(self, requests: list[Any], *, ordered: bool) -> None:
+        if self.fail_updates:
+            raise OperationFailure("touch failed")
+        self.bulk_writes.append(len(requests))
+        for request in requests:
+            await self.update_one(request._filter, request._doc)
+
     async def delete_one(self, query: dict[str, Any]) -> None:
         self.documents = [
             document
@@ -152,8 +174,8 @@ def test_role_menu_document_round_trip() -> None:
 
 
 def test_toggle_member_roles_adds_missing_and_removes_existing() -> None:
-    existing = SimpleNamespace(id=10, name="Existing")
-    missing = SimpleNamespace(id=11, name="Missing")
+    existing = _role(10, "Existing")
+    missing = _role(11, "Missing")
     member = FakeMember([existing])
 
     result = asyncio.run(
@@ -167,6 +189,7 @@ def test_toggle_member_roles_adds_missing_and_removes_existing() -> None:
     assert member.removed == (existing,)
     assert result.added == (missing,)
     assert result.removed == (existing,)
+    assert len(member.edits) == 1
 
 
 def test_mongo_repository_supports_select_and_migrated_reaction_menus() -> None:
@@ -203,6 +226,219 @@ def test_mongo_repository_supports_select_and_migrated_reaction_menus() -> None:
     assert collection.indexes == ["role_menu_message_id", "role_menu_migration_source"]
 
 
+def test_reaction_index_answers_without_querying_mongo() -> None:
+    collection = FakeCollection()
+    legacy = RoleMenu(
+        guild_id=1,
+        channel_id=2,
+        message_id=4,
+        label="Legacy",
+        roles=(StoredRole(role_id=11, role_name="Role 11", position=0, emoji_key="custom:99"),),
+        menu_type="reaction",
+    )
+    collection.documents.append(menu_to_document(legacy))
+    repository = RoleMenuRepository(
+        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus"
+    )
+
+    find_one = collection.find_one
+
+    async def find_one_without_menu_lookup(
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+    ) -> dict[str, Any] | None:
+        assert "menu_type" not in query, "indexed lookups must not query MongoDB"
+        return await find_one(query, projection)
+
+    async def exercise() -> None:
+        await repository.initialize()
+        collection.find_one = find_one_without_menu_lookup  # type: ignore[method-assign]
+        assert await repository.get_reaction_role_id(4, frozenset({"custom:99"})) == 11
+        assert await repository.get_reaction_role_id(5, frozenset({"custom:99"})) is None
+        await repository.delete(4)
+        assert await repository.get_reaction_role_id(4, frozenset({"custom:99"})) is None
+        await repository.save(legacy)
+        assert await repository.get_reaction_role_id(4, frozenset({"custom:99"})) == 11
+
+    asyncio.run(exercise())
+
+
+def test_cached_menu_prefers_the_earliest_listed_matching_role() -> None:
+    cached = CachedRoleMenu.from_menu(
+        RoleMenu(
+            guild_id=1,
+            channel_id=2,
+            message_id=4,
+            label="Legacy",
+            roles=(
+                StoredRole(role_id=11, role_name="A", position=0, emoji_key="name:bean"),
+                StoredRole(role_id=12, role_name="B", position=1, emoji_key="custom:99"),
+                StoredRole(role_id=13, role_name="C", position=2, emoji_key="custom:99"),
+            ),
+            menu_type="reaction",
+        )
+    )
+
+    assert cached.role_for_emoji(frozenset({"custom:99", "name:bean"})) == 11
+    assert cached.role_for_emoji(frozenset({"custom:99"})) == 12
+    assert cached.role_for_emoji(frozenset({"custom:1"})) is None
+    assert cached.role_ids == frozenset({11, 12, 13})
+
+
+def test_menu_cache_reads_through_evicts_lru_and_follows_saves() -> None:
+    collection = FakeCollection()
+    menus = [
+        RoleMenu(
+            guild_id=1,
+            channel_id=2,
+            message_id=message_id,
+            label="Games",
+            roles=(StoredRole(role_id=10, role_name="Raiders", position=0),),
+        )
+        for message_id in (3, 4, 5)
+    ]
+    collection.documents.extend(menu_to_document(menu) for menu in menus)
+    repository = RoleMenuRepository(
+        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus", menu_cache_size=2
+    )
+    lookups: list[int] = []
+    find_one = collection.find_one
+
+    async def counting_find_one(
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+    ) -> dict[str, Any] | None:
+        lookups.append(query["message_id"])
+        return await find_one(query, projection)
+
+    collection.find_one = counting_find_one  # type: ignore[method-assign]
+
+    async def exercise() -> None:
+        for message_id in (3, 4, 3, 5, 3, 4):
+            cached = await repository.get_menu(message_id)
+            assert cached is not None and cached.menu.message_id == message_id
+        renamed = RoleMenu(
+            guild_id=1,
+            channel_id=2,
+            message_id=3,
+            label="Games",
+            roles=(StoredRole(role_id=11, role_name="Tabletop", position=0),),
+        )
+        await repository.save(renamed)
+        cached = await repository.get_menu(3)
+        assert cached is not None and cached.role_ids == frozenset({11})
+        await repository.delete(3)
+        assert await repository.get_menu(3) is None
+
+    asyncio.run(exercise())
+
+    assert lookups == [3, 4, 5, 4, 3]
+
+
+def test_repository_reports_its_own_writes_while_they_are_in_flight() -> None:
+    collection = FakeCollection()
+    repository = RoleMenuRepository(
+        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus"
+    )
+    menu = RoleMenu(
+        guild_id=1,
+        channel_id=2,
+        message_id=3,
+        label="Games",
+        roles=(StoredRole(role_id=10, role_name="Raiders", position=0),),
+    )
+    seen_writing: list[bool] = []
+    replace_one = collection.replace_one
+    delete_one = collection.delete_one
+
+    async def observed_replace_one(
+        query: dict[str, Any], document: dict[str, Any], *, upsert: bool
+    ) -> None:
+        seen_writing.append(repository.is_writing(3))
+        await replace_one(query, document, upsert=upsert)
+
+    async def observed_delete_one(query: dict[str, Any]) -> None:
+        seen_writing.append(repository.is_writing(3))
+        await delete_one(query)
+
+    collection.replace_one = observed_replace_one  # type: ignore[method-assign]
+    collection.delete_one = observed_delete_one  # type: ignore[method-assign]
+
+    async def exercise() -> None:
+        await repository.save(menu)
+        assert repository.holds(menu) and not repository.is_writing(3)
+        await repository.delete(3)
+        assert not repository.holds(menu) and not repository.is_writing(3)
+
+    asyncio.run(exercise())
+
+    assert seen_writing == [True, True]
+    assert repository.apply_external_delete(3) is False
+
+
+def test_touches_are_coalesced_into_one_bulk_write() -> None:
+    collection = FakeCollection()
+    for message_id in (3, 4):
+        collection.documents.append(
+            menu_to_document(
+                RoleMenu(
+                    guild_id=1,
+                    channel_id=2,
+                    message_id=message_id,
+                    label="Games",
+                    roles=(StoredRole(role_id=10, role_name="Raiders", position=0),),
+                )
+            )
+        )
+        collection.documents[-1]["last_accessed"] = None
+    repository = RoleMenuRepository(
+        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus"
+    )
+
+    async def exercise() -> None:
+        for message_id in (3, 3, 4, 3):
+            await repository.touch(message_id)
+        assert collection.bulk_writes == []
+        await repository.close()
+
+    asyncio.run(exercise())
+
+    assert collection.bulk_writes == [2]
+    assert all(document["last_accessed"] is not None for document in collection.documents)
+
+
+def test_close_waits_for_a_flush_that_is_already_writing() -> None:
+    class SlowBulkCollection(FakeCollection):
+        def __init__(self) -> None:
+            super().__init__()
+            self.writing = asyncio.Event()
+            self.release = asyncio.Event()
+
+        async def bulk_write(self, requests: list[Any], *, ordered: bool) -> None:
+            self.writing.set()
+            await self.release.wait()
+            await super().bulk_write(requests, ordered=ordered)
+
+    async def exercise() -> None:
+        collection = SlowBulkCollection()
+        repository = RoleMenuRepository(
+            cast(Any, FakeClient(collection)),
+            "BeanBotPythonDB",
+            "roleMenus",
+            touch_flush_seconds=0.01,
+        )
+        await repository.touch(3)
+        await collection.writing.wait()
+        closing = asyncio.create_task(repository.close())
+        await asyncio.sleep(0)
+        assert not closing.done()
+        collection.release.set()
+        await closing
+        assert collection.bulk_writes == [1]
+
+    asyncio.run(exercise())
+
+
 def test_initialize_replaces_legacy_migration_index() -> None:
     collection = FakeCollection()
     collection.index_specs["role_menu_legacy_id"] = {
@@ -231,9 +467,12 @@ def test_select_menu_role_change_and_response_survive_touch_failure(
     collection = FakeCollection()
     collection.fail_updates = True
     repository = RoleMenuRepository(
-        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus"
+        cast(Any, FakeClient(collection)),
+        "BeanBotPythonDB",
+        "roleMenus",
+        touch_flush_seconds=0,
     )
-    role = SimpleNamespace(id=10, name="Raiders")
+    role = _role(10, "Raiders")
     member = FakeMember([])
     response = SimpleNamespace(messages=[])
 
@@ -275,7 +514,10 @@ def test_legacy_reaction_assignment_survives_touch_failure() -> None:
     )
     collection.documents.append(menu_to_document(menu))
     repository = RoleMenuRepository(
-        cast(Any, FakeClient(collection)), "BeanBotPythonDB", "roleMenus"
+        cast(Any, FakeClient(collection)),
+        "BeanBotPythonDB",
+        "roleMenus",
+        touch_flush_seconds=0,
     )
     role = SimpleNamespace(id=11, name="Role 11")
     member = FakeMember([])
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, cast
+
+import discord
+from pytest import MonkeyPatch
+
+from beanbot.features.role_menus import views
+from beanbot.features.role_menus.models import RoleMenu, StoredRole
+from beanbot.features.role_menus.scheduler import RoleMutationScheduler
+from beanbot.features.role_menus.service import RoleToggleResult
+from beanbot.features.role_menus.views import SelfRoleMenuView
+
+
+def _role(role_id: int, name: str) -> SimpleNamespace:
+    return SimpleNamespace(id=role_id, name=name, is_default=lambda: False)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int) -> None:
+        self.id = guild_id
+        self.members: dict[int, FakeMember] = {}
+        self.fetches = 0
+
+    def get_member(self, member_id: int) -> FakeMember | None:
+        return self.members.get(member_id)
+
+    async def fetch_member(self, member_id: int) -> FakeMember:
+        self.fetches += 1
+        return self.members[member_id]
+
+
+class FakeMember:
+    def __init__(self, member_id: int, roles: list[Any], *, guild_id: int = 1) -> None:
+        self.id = member_id
+        self.guild = FakeGuild(guild_id)
+        self.guild.members[member_id] = self
+        self.roles = roles
+        self.edits: list[str] = []
+        self.fail = False
+        self.fail_status = 403
+
+    async def edit(self, *, roles: list[Any], reason: str) -> None:
+        if self.fail:
+            raise discord.HTTPException(
+                cast(Any, SimpleNamespace(status=self.fail_status, reason="no")), "no"
+            )
+        self.roles = list(roles)
+        self.edits.append(reason)
+
+
+class FakeRepository:
+    def __init__(self) -> None:
+        self.touched: list[int] = []
+
+    async def get_menu(self, message_id: int) -> None:
+        raise AssertionError("selections must not wait on MongoDB before responding")
+
+    async def touch(self, message_id: int) -> None:
+        self.touched.append(message_id)
+
+
+def _member(member: FakeMember) -> discord.Member:
+    return cast(discord.Member, member)
+
+
+def _roles(*roles: SimpleNamespace) -> list[discord.Role]:
+    return cast(list[discord.Role], list(roles))
+
+
+def test_scheduler_merges_a_members_changes_into_one_edit() -> None:
+    everyone = SimpleNamespace(id=1, name="@everyone", is_default=lambda: True)
+    raiders = _role(10, "Raiders")
+    tabletop = _role(11, "Tabletop")
+    news = _role(12, "News")
+    member = FakeMember(50, [everyone, news])
+    scheduler = RoleMutationScheduler(settle_seconds=0.01)
+
+    async def exercise() -> list[RoleToggleResult]:
+        futures = [
+            scheduler.submit(_member(member), _roles(raiders), "toggle", reason="Selection"),
+            scheduler.submit(_member(member), _roles(tabletop), "add", reason="Reaction added"),
+            scheduler.submit(
+                _member(member), _roles(tabletop), "remove", reason="Reaction removed"
+            ),
+            scheduler.submit(_member(member), _roles(news), "toggle", reason="Selection"),
+        ]
+        return list(await asyncio.gather(*(future for future in futures if future is not None)))
+
+    results = asyncio.run(exercise())
+
+    assert member.edits == ["Selection; Reaction added; Reaction removed"]
+    assert member.roles == [raiders]
+    assert len(results) == 4
+    assert all(result.added == (raiders,) and result.removed == (news,) for result in results)
+    stats = scheduler.stats()
+    assert (stats.enqueued, stats.merged, stats.applied, stats.queued) == (4, 3, 1, 0)
+
+
+def test_add_then_remove_flapping_costs_no_request() -> None:
+    role = _role(10, "Raiders")
+    member = FakeMember(50, [])
+    scheduler = RoleMutationScheduler(settle_seconds=0.01)
+
+    async def exercise() -> RoleToggleResult:
+        scheduler.submit(_member(member), _roles(role), "add", reason="added")
+        future = scheduler.submit(_member(member), _roles(role), "remove", reason="removed")
+        assert future is not None
+        return await future
+
+    result = asyncio.run(exercise())
+
+    assert result == RoleToggleResult(added=(), removed=())
+    assert member.edits == []
+    assert scheduler.stats().unchanged == 1
+
+
+def test_full_guild_queue_drops_new_members_but_other_guilds_proceed() -> None:
+    role = _role(10, "Raiders")
+    first, second = FakeMember(50, []), FakeMember(51, [])
+    other_guild = FakeMember(52, [], guild_id=2)
+    scheduler = RoleMutationScheduler(max_pending_per_guild=1, settle_seconds=0.01)
+
+    async def exercise() -> None:
+        assert scheduler.submit(_member(first), _roles(role), "add", reason="r") is not None
+        assert scheduler.submit(_member(second), _roles(role), "add", reason="r") is None
+        assert scheduler.submit(_member(other_guild), _roles(role), "add", reason="r") is not None
+        await scheduler.close()
+
+    asyncio.run(exercise())
+
+    assert first.roles == [role]
+    assert second.roles == []
+    assert other_guild.roles == [role]
+    assert scheduler.stats().dropped == 1
+
+
+def test_scheduled_selection_defers_and_reports_through_followup(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    role = _role(10, "Raiders")
+    member = FakeMember(50, [])
+    member.fail = True
+    sent: list[tuple[str, bool]] = []
+    deferred: list[bool] = []
+
+    async def defer(*, ephemeral: bool, thinking: bool) -> None:
+        deferred.append(ephemeral)
+
+    async def send(content: str, *, ephemeral: bool) -> None:
+        sent.append((content, ephemeral))
+
+    interaction = SimpleNamespace(
+        guild=SimpleNamespace(id=1, get_role=lambda role_id: role),
+        user=member,
+        response=SimpleNamespace(defer=defer),
+        followup=SimpleNamespace(send=send),
+    )
+    menu = RoleMenu(
+        guild_id=1,
+        channel_id=2,
+        message_id=3,
+        label="Games",
+        roles=(StoredRole(role_id=10, role_name="Raiders", position=0),),
+    )
+    scheduler = RoleMutationScheduler(settle_seconds=0)
+
+    async def exercise() -> None:
+        view = SelfRoleMenuView(cast(Any, FakeRepository()), menu, scheduler)
+        await view.apply_selection(cast(discord.Interaction, interaction), {10})
+        assert sent == []
+        await scheduler.close()
+
+    monkeypatch.setattr(views.discord, "Member", FakeMember)
+
+    asyncio.run(exercise())
+
+    assert deferred == [True]
+    assert sent == [
+        ("I could not update those roles. Check my role hierarchy and permissions.", True)
+    ]
+    assert scheduler.stats().failed == 1
+
+
+def test_each_member_gets_a_full_merge_window_in_a_busy_guild() -> None:
+    role = _role(10, "Raiders")
+    first, second = FakeMember(50, []), FakeMember(51, [])
+    scheduler = RoleMutationScheduler(settle_seconds=0.3)
+
+    async def exercise() -> None:
+        scheduler.submit(_member(first), _roles(role), "add", reason="first")
+        await asyncio.sleep(0.2)
+        later = scheduler.submit(_member(second), _roles(role), "add", reason="added")
+        await asyncio.sleep(0.2)
+        assert first.edits == ["first"]
+        assert second.edits == []
+        scheduler.submit(_member(second), _roles(role), "remove", reason="removed")
+        assert later is not None
+        assert await later == RoleToggleResult(added=(), removed=())
+
+    asyncio.run(exercise())
+
+    assert second.edits == []
+
+
+def test_close_applies_queued_changes_without_waiting_for_their_window() -> None:
+    role = _role(10, "Raiders")
+    member = FakeMember(50, [])
+    scheduler = RoleMutationScheduler(settle_seconds=60)
+
+    async def exercise() -> None:
+        scheduler.submit(_member(member), _roles(role), "add", reason="added")
+        await asyncio.wait_for(scheduler.close(), 1)
+
+    asyncio.run(exercise())
+
+    assert member.roles == [role]
+
+
+def test_edits_start_from_the_submitted_member_without_a_fetch() -> None:
+    raiders = _role(10, "Raiders")
+    moderator = _role(20, "Moderator")
+    member = FakeMember(50, [moderator])
+    scheduler = RoleMutationScheduler(settle_seconds=0)
+
+    async def exercise() -> None:
+        future = scheduler.submit(_member(member), _roles(raiders), "add", reason="added")
+        assert future is not None
+        assert await future == RoleToggleResult(added=tuple(_roles(raiders)), removed=())
+
+    asyncio.run(exercise())
+
+    assert member.roles == [moderator, raiders]
+    assert member.guild.fetches == 0
+
+
+def test_rejected_edit_is_rebuilt_from_the_fetched_member() -> None:
+    raiders = _role(10, "Raiders")
+    moderator = _role(20, "Moderator")
+    queued = FakeMember(50, [])
+    queued.fail, queued.fail_status = True, 400
+    current = FakeMember(50, [moderator])
+    queued.guild.members[50] = current
+    scheduler = RoleMutationScheduler(settle_seconds=0)
+
+    async def exercise() -> None:
+        future = scheduler.submit(_member(queued), _roles(raiders), "add", reason="added")
+        assert future is not None
+        assert await future == RoleToggleResult(added=tuple(_roles(raiders)), removed=())
+
+    asyncio.run(exercise())
+
+    assert current.roles == [moderator, raiders]
+    assert queued.guild.fetches == 1
+
+
+def test_cached_member_is_used_when_member_updates_are_streamed() -> None:
+    role = _role(10, "Raiders")
+    member = FakeMember(50, [])
+    scheduler = RoleMutationScheduler(settle_seconds=0, member_cache_is_current=True)
+
+    async def exercise() -> None:
+        future = scheduler.submit(_member(member), _roles(role), "add", reason="added")
+        assert future is not None
+        await future
+
+    asyncio.run(exercise())
+
+    assert member.roles == [role]
+    assert member.guild.fetches == 0
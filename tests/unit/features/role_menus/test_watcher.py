@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, cast
+
+from pymongo.errors import OperationFailure
+
+from beanbot.features.role_menus.models import RoleMenu, StoredRole, menu_to_document
+from beanbot.features.role_menus.watcher import RoleMenuWatcher
+
+
+def _document(document_id: int, message_id: int, role_id: int = 10) -> dict[str, Any]:
+    menu = RoleMenu(
+        guild_id=1,
+        channel_id=2,
+        message_id=message_id,
+        label="Games",
+        roles=(StoredRole(role_id=role_id, role_name="Raiders", position=0),),
+    )
+    return {"_id": document_id, **menu_to_document(menu)}
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict[str, Any]]) -> None:
+        self.documents = documents
+
+    async def to_list(self, length: int | None) -> list[dict[str, Any]]:
+        return list(self.documents)
+
+
+class FakeStream:
+    def __init__(self, changes: list[dict[str, Any]]) -> None:
+        self.changes = changes
+        self.resume_token: dict[str, Any] | None = None
+
+    async def __aenter__(self) -> FakeStream:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    def __aiter__(self) -> FakeStream:
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        if not self.changes:
+            raise OperationFailure("stream closed", code=6)
+        change = self.changes.pop(0)
+        self.resume_token = {"_data": change["_id"]}
+        return change
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.operation_time = 1
+
+    async def command(self, name: str) -> dict[str, Any]:
+        return {"ok": 1, "operationTime": self.operation_time}
+
+
+class FakeCollection:
+    def __init__(self, documents: list[dict[str, Any]]) -> None:
+        self.documents = documents
+        self.database = FakeDatabase()
+        self.streams: list[FakeStream] = []
+        self.resume_tokens: list[Any] = []
+        self.start_times: list[Any] = []
+        self.supports_change_streams = True
+
+    def find(self, query: dict[str, Any]) -> FakeCursor:
+        return FakeCursor(self.documents)
+
+    async def watch(
+        self, *, full_document: str, resume_after: Any, start_at_operation_time: Any
+    ) -> FakeStream:
+        if not self.supports_change_streams:
+            raise OperationFailure(
+                "The $changeStream stage is only supported on replica sets", 40573
+            )
+        self.resume_tokens.append(resume_after)
+        self.start_times.append(start_at_operation_time)
+        return self.streams.pop(0) if self.streams else FakeStream([])
+
+
+def _watcher(
+    collection: FakeCollection,
+) -> tuple[RoleMenuWatcher, list[int], list[int]]:
+    saved: list[int] = []
+    deleted: list[int] = []
+    watcher = RoleMenuWatcher(
+        cast(Any, collection),
+        lambda menu: saved.append(menu.message_id),
+        deleted.append,
+        poll_seconds=0.01,
+        retry_seconds=0.01,
+    )
+    return watcher, saved, deleted
+
+
+def test_change_stream_applies_changes_skips_touches_and_resumes() -> None:
+    collection = FakeCollection([_document(1, 100)])
+    collection.streams.append(
+        FakeStream(
+            [
+                {
+                    "_id": "t1",
+                    "operationType": "update",
+                    "documentKey": {"_id": 1},
+                    "updateDescription": {"updatedFields": {"last_accessed": 0}},
+                    "fullDocument": _document(1, 100),
+                },
+                {
+                    "_id": "t2",
+                    "operationType": "insert",
+                    "documentKey": {"_id": 2},
+                    "fullDocument": _document(2, 200),
+                },
+                {
+                    "_id": "t3",
+                    "operationType": "replace",
+                    "documentKey": {"_id": 1},
+                    "fullDocument": _document(1, 100, role_id=11),
+                },
+            ]
+        )
+    )
+    collection.streams.append(
+        FakeStream([{"_id": "t4", "operationType": "delete", "documentKey": {"_id": 2}}])
+    )
+    watcher, saved, deleted = _watcher(collection)
+
+    async def exercise() -> None:
+        watcher.start()
+        for _ in range(50):
+            if deleted:
+                break
+            await asyncio.sleep(0.01)
+        await watcher.close()
+
+    asyncio.run(exercise())
+
+    assert saved == [200, 100]
+    assert deleted == [200]
+    assert collection.resume_tokens[:2] == [None, {"_data": "t3"}]
+    assert collection.start_times[:2] == [1, None]
+    assert watcher.mode == "change_stream"
+
+
+def test_standalone_server_falls_back_to_polling() -> None:
+    collection = FakeCollection([_document(1, 100), _document(2, 200)])
+    collection.supports_change_streams = False
+    watcher, saved, deleted = _watcher(collection)
+
+    async def exercise() -> None:
+        watcher.start()
+        await asyncio.sleep(0.02)
+        collection.documents = [_document(1, 100, role_id=11), _document(3, 300)]
+        for _ in range(50):
+            if deleted:
+                break
+            await asyncio.sleep(0.01)
+        await watcher.close()
+
+    asyncio.run(exercise())
+
+    assert watcher.mode == "polling"
+    assert sorted(saved) == [100, 300]
+    assert deleted == [200]
+
+
+def test_changes_after_the_snapshot_are_replayed_from_its_cluster_time() -> None:
+    collection = FakeCollection([_document(1, 100)])
+    collection.database.operation_time = 42
+    watcher, saved, deleted = _watcher(collection)
+
+    async def exercise() -> None:
+        await watcher.prime()
+        # Written after the snapshot but before the stream opened; the stream replays it.
+        collection.documents.append(_document(2, 200))
+        collection.streams.append(
+            FakeStream(
+                [
+                    {
+                        "_id": "t1",
+                        "operationType": "insert",
+                        "documentKey": {"_id": 2},
+                        "fullDocument": _document(2, 200),
+                    }
+                ]
+            )
+        )
+        watcher.start()
+        for _ in range(50):
+            if saved:
+                break
+            await asyncio.sleep(0.01)
+        await watcher.close()
+
+    asyncio.run(exercise())
+
+    assert saved == [200]
+    assert deleted == []
+    assert collection.start_times[0] == 42
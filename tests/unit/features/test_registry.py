@@ -2,7 +2,13 @@ from __future__ import annotations
 
 import importlib
 
-from beanbot.features.registry import FEATURE_EXTENSIONS
+from beanbot.discord.memory import CACHE_NEEDS
+from beanbot.discord.startup import STARTUP_RESOURCES
+from beanbot.features.registry import (
+    FEATURE_CACHE_NEEDS,
+    FEATURE_EXTENSIONS,
+    FEATURE_REQUIREMENTS,
+)
 
 
 def test_every_registered_feature_extension_is_importable() -> None:
@@ -10,3 +16,13 @@ def test_every_registered_feature_extension_is_importable() -> None:
 
     assert len(imported) == len(FEATURE_EXTENSIONS)
     assert all(module.__name__.startswith("beanbot.features.") for module in imported)
+
+
+def test_feature_requirements_name_registered_extensions_and_known_resources() -> None:
+    assert set(FEATURE_REQUIREMENTS) <= set(FEATURE_EXTENSIONS)
+    assert all(needs <= STARTUP_RESOURCES for needs in FEATURE_REQUIREMENTS.values())
+
+
+def test_feature_cache_needs_name_registered_extensions_and_known_caches() -> None:
+    assert set(FEATURE_CACHE_NEEDS) <= set(FEATURE_EXTENSIONS)
+    assert all(needs <= CACHE_NEEDS for needs in FEATURE_CACHE_NEEDS.values())
@@ -3,20 +3,25 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
-from pymongo.errors import DuplicateKeyError, OperationFailure
+import pytest
+from pymongo.errors import BulkWriteError, OperationFailure
 from pytest import MonkeyPatch
 
 from beanbot.migrations import migrate_role_settings
 
 
 class FakeCursor:
-    def __init__(self, documents: list[dict[str, Any]]) -> None:
+    def __init__(self, documents: list[dict[str, Any]], delay: float = 0) -> None:
         self._iterator = iter(documents)
+        self._delay = delay
 
     def __aiter__(self) -> FakeCursor:
         return self
 
     async def __anext__(self) -> dict[str, Any]:
+        if self._delay:
+            await asyncio.sleep(self._delay)
+            self._delay = 0
         try:
             return next(self._iterator)
         except StopIteration as error:
@@ -32,6 +37,35 @@ def _nested_value(document: dict[str, Any], path: str) -> Any:
     return value
 
 
+def _matches(document: dict[str, Any], query: dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        value = _nested_value(document, key)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif isinstance(condition, dict) and "$gt" in condition:
+            if value is None or value <= condition["$gt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _duplicate_key_write_error(index: int, document: dict[str, Any]) -> dict[str, Any]:
+    message_id = document["message_id"]
+    return {
+        "index": index,
+        "code": 11000,
+        "errmsg": (
+            "E11000 duplicate key error collection: BeanBotPythonDB.roleMenus "
+            f"index: role_menu_message_id dup key: {{ message_id: {message_id} }}"
+        ),
+        "keyPattern": {"message_id": 1},
+        "keyValue": {"message_id": message_id},
+        "op": document,
+    }
+
+
 class FakeCollection:
     def __init__(self, documents: list[dict[str, Any]] | None = None) -> None:
         self.documents = list(documents or [])
@@ -41,21 +75,36 @@ class FakeCollection:
         }
         self.fail_on_insert_number: int | None = None
         self.insert_attempts = 0
+        self.insert_batches: list[int] = []
+        self.find_calls = 0
+        self.find_one_calls = 0
+
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+        **options: Any,
+    ) -> FakeCursor:
+        self.find_calls += 1
+        documents = [document for document in self.documents if _matches(document, query)]
+        for key, direction in reversed(options.get("sort", [])):
+            documents.sort(key=lambda document: document[key], reverse=direction < 0)
+        return FakeCursor(documents)
 
-    def find(self, query: dict[str, Any]) -> FakeCursor:
-        return FakeCursor(self.documents)
+    async def estimated_document_count(self) -> int:
+        return len(self.documents)
+
+    async def count_documents(self, query: dict[str, Any]) -> int:
+        return sum(1 for document in self.documents if _matches(document, query))
 
     async def find_one(
         self,
         query: dict[str, Any],
         projection: dict[str, int] | None = None,
     ) -> dict[str, Any] | None:
+        self.find_one_calls += 1
         return next(
-            (
-                document
-                for document in self.documents
-                if all(_nested_value(document, key) == value for key, value in query.items())
-            ),
+            (document for document in self.documents if _matches(document, query)),
             None,
         )
 
@@ -70,21 +119,106 @@ class FakeCollection:
     async def drop_index(self, name: str) -> None:
         self.index_specs.pop(name, None)
 
-    async def insert_one(self, document: dict[str, Any], *, session: FakeSession) -> None:
-        self.insert_attempts += 1
-        if session.insert_error is not None:
-            raise session.insert_error
-        if self.fail_on_insert_number == self.insert_attempts:
-            raise DuplicateKeyError("late duplicate")
+    async def insert_many(
+        self,
+        documents: list[dict[str, Any]],
+        *,
+        ordered: bool,
+        session: FakeSession,
+    ) -> None:
+        self.insert_batches.append(len(documents))
+        write_errors: list[dict[str, Any]] = []
+        for index, document in enumerate(documents):
+            self.insert_attempts += 1
+            if session.insert_error is not None:
+                raise session.insert_error
+            if self.fail_on_insert_number == self.insert_attempts:
+                write_errors.append(_duplicate_key_write_error(index, document))
+                continue
+            session.pending.append((self, document))
+        if write_errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": write_errors,
+                    "writeConcernErrors": [],
+                    "nInserted": len(documents) - len(write_errors),
+                    "nUpserted": 0,
+                    "nMatched": 0,
+                    "nModified": 0,
+                    "nRemoved": 0,
+                    "upserted": [],
+                }
+            )
+
+    async def update_one(
+        self,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool,
+        session: FakeSession,
+    ) -> None:
+        existing = next((document for document in self.documents if _matches(document, query)), {})
+        document = {**query, **existing, **update.get("$set", {})}
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
         session.pending.append((self, document))
 
+    def commit(self, document: dict[str, Any]) -> None:
+        if "_id" in document:
+            self.documents = [
+                existing for existing in self.documents if existing.get("_id") != document["_id"]
+            ]
+        self.documents.append(document)
+
+
+class SlowLookupCollection(FakeCollection):
+    """Answers earlier chunks' lookups last so workers finish out of order."""
+
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+        **options: Any,
+    ) -> FakeCursor:
+        cursor = super().find(query, projection, **options)
+        legacy_ids = query.get("migration.legacy_id", {}).get("$in", [])
+        if legacy_ids:
+            cursor._delay = 0.005 * (10 - int(legacy_ids[0]))
+        return cursor
+
+
+class FailingLookupCollection(FakeCollection):
+    """Fails the first chunk's lookup while remembering how far the source was read."""
+
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+        **options: Any,
+    ) -> FakeCursor:
+        if "0" in query.get("migration.legacy_id", {}).get("$in", []):
+            raise OperationFailure("lookup failed")
+        return super().find(query, projection, **options)
+
+
+class RecordingCursorCollection(FakeCollection):
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
+        **options: Any,
+    ) -> FakeCursor:
+        self.cursor = super().find(query, projection, **options)
+        return self.cursor
+
 
 class FakeDatabase:
     def __init__(self, collections: dict[str, FakeCollection]) -> None:
         self.collections = collections
 
     def __getitem__(self, name: str) -> FakeCollection:
-        return self.collections[name]
+        return self.collections.setdefault(name, FakeCollection())
 
 
 class FakeAdmin:
@@ -102,7 +236,7 @@ class FakeTransaction:
     async def __aexit__(self, error_type: Any, error: Any, traceback: Any) -> None:
         if error_type is None:
             for collection, document in self.session.pending:
-                collection.documents.append(document)
+                collection.commit(document)
         self.session.pending.clear()
 
 
@@ -180,6 +314,12 @@ def _run_migration(
     *,
     source_database: str = "BeanBotDB",
     source_collection: str = "roleSettings",
+    target_collection: str = "roleMenus",
+    batch_size: int = migrate_role_settings.DEFAULT_BATCH_SIZE,
+    streaming: bool = False,
+    resume: bool = False,
+    workers: int = migrate_role_settings.DEFAULT_WORKERS,
+    progress: migrate_role_settings.ProgressCallback | None = None,
 ) -> migrate_role_settings.MigrationSummary:
     monkeypatch.setattr(migrate_role_settings, "AsyncMongoClient", lambda uri: client)
     return asyncio.run(
@@ -188,8 +328,13 @@ def _run_migration(
             source_database=source_database,
             source_collection=source_collection,
             target_database="BeanBotPythonDB",
-            target_collection="roleMenus",
+            target_collection=target_collection,
             apply=True,
+            batch_size=batch_size,
+            streaming=streaming,
+            resume=resume,
+            workers=workers,
+            progress=progress,
         )
     )
 
@@ -221,6 +366,160 @@ def test_apply_inserts_into_new_database_after_clean_preflight(monkeypatch: Monk
     assert target.indexes == ["role_menu_message_id", "role_menu_migration_source"]
 
 
+def test_lookups_and_inserts_run_once_per_batch(monkeypatch: MonkeyPatch) -> None:
+    source = FakeCollection([_legacy_document(str(number)) for number in range(5)])
+    target = FakeCollection(
+        [
+            {
+                "message_id": 3099,
+                "migration": {
+                    "source_database": "BeanBotDB",
+                    "source_collection": "roleSettings",
+                    "legacy_id": "0",
+                },
+            }
+        ]
+    )
+
+    summary = _run_migration(monkeypatch, _client(source, target), batch_size=2)
+
+    assert summary.discovered == 5
+    assert summary.already_migrated == 1
+    assert summary.inserted == 4
+    assert target.find_one_calls == 0
+    assert target.find_calls == 6
+    assert target.insert_batches == [2, 2]
+    assert set(summary.phase_seconds) == set(migrate_role_settings.MIGRATION_PHASES)
+
+
+def test_streaming_run_resumes_after_the_last_committed_chunk(monkeypatch: MonkeyPatch) -> None:
+    source = FakeCollection([_legacy_document(str(number)) for number in (4, 0, 3, 1, 2)])
+    target = FakeCollection()
+    target.fail_on_insert_number = 3
+    client = _client(source, target)
+
+    interrupted = _run_migration(monkeypatch, client, batch_size=2, streaming=True)
+
+    assert interrupted.chunks_committed == 1
+    assert interrupted.inserted == 2
+    assert interrupted.conflicts == 1
+    checkpoints = client["BeanBotPythonDB"][migrate_role_settings.CHECKPOINT_COLLECTION]
+    assert checkpoints.documents[0]["last_source_id"] == "1"
+
+    target.fail_on_insert_number = None
+    resumed = _run_migration(monkeypatch, client, batch_size=2, resume=True)
+
+    assert resumed.resumed_after == "1"
+    assert resumed.discovered == 3
+    assert resumed.inserted == 3
+    assert resumed.chunks_committed == 2
+    assert sorted(document["migration"]["legacy_id"] for document in target.documents) == [
+        "0",
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+    assert checkpoints.documents[0]["last_source_id"] == "4"
+    assert checkpoints.documents[0]["inserted"] == 5
+
+
+def test_streaming_checkpoints_are_kept_per_target_collection(monkeypatch: MonkeyPatch) -> None:
+    source = FakeCollection([_legacy_document(str(number)) for number in range(3)])
+    client = _client(source, FakeCollection())
+
+    _run_migration(monkeypatch, client, batch_size=2, streaming=True)
+    second = _run_migration(
+        monkeypatch, client, target_collection="roleMenusCopy", batch_size=2, resume=True
+    )
+
+    assert second.resumed_after is None
+    assert second.inserted == 3
+    checkpoints = client["BeanBotPythonDB"][migrate_role_settings.CHECKPOINT_COLLECTION]
+    assert sorted(document["_id"] for document in checkpoints.documents) == [
+        "role_settings:BeanBotDB.roleSettings->roleMenus",
+        "role_settings:BeanBotDB.roleSettings->roleMenusCopy",
+    ]
+
+
+def test_parallel_workers_commit_chunks_in_source_order_and_report_progress(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    source = FakeCollection([_legacy_document(str(number)) for number in range(6)])
+    target = SlowLookupCollection()
+    reports: list[migrate_role_settings.MigrationProgress] = []
+
+    summary = _run_migration(
+        monkeypatch,
+        _client(source, target),
+        batch_size=1,
+        streaming=True,
+        workers=3,
+        progress=reports.append,
+    )
+
+    assert summary.inserted == 6
+    assert [document["migration"]["legacy_id"] for document in target.documents] == [
+        "0",
+        "1",
+        "2",
+        "3",
+        "4",
+        "5",
+    ]
+    assert [report.processed for report in reports] == [1, 2, 3, 4, 5, 6]
+    assert {report.total for report in reports} == {6}
+    assert reports[-1].eta_seconds is None
+
+
+def test_a_failed_worker_stops_the_run_before_the_source_is_exhausted(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    source = RecordingCursorCollection([_legacy_document(str(number)) for number in range(200)])
+
+    with pytest.raises(OperationFailure):
+        _run_migration(
+            monkeypatch,
+            _client(source, FailingLookupCollection()),
+            batch_size=1,
+            streaming=True,
+            workers=2,
+        )
+
+    assert next(source.cursor._iterator, None) is not None
+
+
+def test_resumed_progress_counts_only_the_remaining_documents(monkeypatch: MonkeyPatch) -> None:
+    source = FakeCollection([_legacy_document(str(number)) for number in range(5)])
+    client = _client(source, FakeCollection())
+    checkpoints = client["BeanBotPythonDB"][migrate_role_settings.CHECKPOINT_COLLECTION]
+    checkpoints.documents.append(
+        {"_id": "role_settings:BeanBotDB.roleSettings->roleMenus", "last_source_id": "1"}
+    )
+    reports: list[migrate_role_settings.MigrationProgress] = []
+
+    _run_migration(monkeypatch, client, batch_size=1, resume=True, progress=reports.append)
+
+    assert [(report.processed, report.total) for report in reports] == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_streaming_apply_stops_before_a_chunk_with_invalid_documents(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    source = FakeCollection(
+        [_legacy_document("1"), _legacy_document("2"), {"_id": "3"}, _legacy_document("4")]
+    )
+    target = FakeCollection()
+
+    summary = _run_migration(monkeypatch, _client(source, target), batch_size=2, streaming=True)
+
+    assert summary.chunks_committed == 1
+    assert summary.inserted == 2
+    assert summary.invalid == 1
+    assert summary.failure_reason is not None
+    assert len(target.documents) == 2
+
+
 def test_same_legacy_id_from_two_source_namespaces_migrates_independently(
     monkeypatch: MonkeyPatch,
 ) -> None:
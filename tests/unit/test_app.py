@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+from typing import Any, cast
+
+import pytest
+
+from beanbot.app import close_on_sigterm
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.closes = 0
+
+    async def close(self) -> None:
+        self.closes += 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM handlers need a Unix event loop")
+def test_sigterm_closes_the_bot_once() -> None:
+    bot = FakeBot()
+
+    async def exercise() -> None:
+        closing = close_on_sigterm(cast(Any, bot))
+        os.kill(os.getpid(), signal.SIGTERM)
+        os.kill(os.getpid(), signal.SIGTERM)
+        while not closing:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*closing)
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+
+    asyncio.run(exercise())
+
+    assert bot.closes == 1